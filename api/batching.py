@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+import numpy as np
+from prometheus_client import Histogram
+
+BATCH_SIZE = Histogram(
+    "predict_batch_size",
+    "Rows per micro-batched predict_proba call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+QUEUE_WAIT = Histogram(
+    "predict_queue_wait_seconds",
+    "Time a request waits in the micro-batch queue",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-row requests into one vectorized call.
+    A batch is flushed when it reaches max_batch_size or max_wait_s after its
+    first row arrived; predict_fn(X) -> scores runs in a worker thread so the
+    event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_s: float = 0.002,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, x: np.ndarray) -> float:
+        """Queue one feature vector and wait for its score."""
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher.start() was not awaited")
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((x, fut, time.perf_counter()))
+        return await fut
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            now = time.perf_counter()
+            BATCH_SIZE.observe(len(batch))
+            for _, _, queued_at in batch:
+                QUEUE_WAIT.observe(now - queued_at)
+
+            X = np.stack([x for x, _, _ in batch])
+            try:
+                scores = await asyncio.to_thread(self.predict_fn, X)
+            except Exception as exc:  # fan the failure out to every caller
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            for (_, fut, _), score in zip(batch, scores):
+                if not fut.done():  # caller may have gone away
+                    fut.set_result(float(score))
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator, Optional
+
+import anyio
+import numpy as np
+import pandas as pd
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from src.contract_spec import to_utc
+from src.features import FEATURE_SOURCE_COLUMNS, build_feature_matrix
+from src.model import LoadedModel
+from src.validator import validate_dataframe
+
+NDJSON = "application/x-ndjson"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+PICKUP, DROPOFF = "tpep_pickup_datetime", "tpep_dropoff_datetime"
+# /predict-shaped records carry no dropoff; a stand-in this long after pickup
+# passes the contract's duration rule, so only request-time fields are judged
+PLACEHOLDER_DURATION = pd.Timedelta(minutes=1)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that keeps reading the request body while it streams.
+    On ASGI < 2.4 Starlette's version also awaits receive() to watch for a
+    disconnect, which would steal body messages from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+def _frame(records: list, offset: int) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(records)
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    return df
+
+
+async def iter_ndjson_chunks(
+    body: AsyncIterator[bytes], chunk_rows: int
+) -> AsyncIterator[pd.DataFrame]:
+    """Parse newline-delimited JSON as it arrives into frames of chunk_rows."""
+    buffer = b""
+    records: list = []
+    offset = 0
+    async for piece in body:
+        buffer += piece
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                records.append(json.loads(line))
+            if len(records) == chunk_rows:
+                yield _frame(records, offset)
+                offset += len(records)
+                records = []
+    if buffer.strip():
+        records.append(json.loads(buffer))
+    if records:
+        yield _frame(records, offset)
+
+
+class _BlockingBody:
+    """
+    Blocking read(n) over an async request body, for readers (Arrow IPC)
+    that want a file. Must be used from a worker thread started by anyio:
+    each read pulls just enough body pieces from the event loop.
+    """
+
+    def __init__(self, body: AsyncIterator[bytes]):
+        self._body = body.__aiter__()
+        self._pending = b""
+        self._done = False
+        self.closed = False
+
+    async def _next_piece(self) -> Optional[bytes]:
+        try:
+            return await self._body.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read(self, n: int = -1) -> bytes:
+        while not self._done and (n < 0 or len(self._pending) < n):
+            piece = anyio.from_thread.run(self._next_piece)
+            if piece is None:
+                self._done = True
+            else:
+                self._pending += piece
+        if n < 0:
+            n = len(self._pending)
+        out, self._pending = self._pending[:n], self._pending[n:]
+        return out
+
+
+def _next_batch(reader):
+    try:
+        return reader.read_next_batch()
+    except StopIteration:
+        return None
+
+
+async def iter_arrow_chunks(
+    body: AsyncIterator[bytes], chunk_rows: int
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    Read an Arrow IPC stream into frames of at most chunk_rows as record
+    batches arrive. The IPC reader is blocking, so it runs in a worker
+    thread that pulls the body on demand; at most one batch is buffered.
+    """
+    import pyarrow as pa
+
+    reader = await anyio.to_thread.run_sync(pa.ipc.open_stream, _BlockingBody(body))
+    offset = 0
+    while (batch := await anyio.to_thread.run_sync(_next_batch, reader)) is not None:
+        for start in range(0, batch.num_rows, chunk_rows):
+            df = batch.slice(start, chunk_rows).to_pandas()
+            df.index = pd.RangeIndex(offset, offset + len(df))
+            offset += len(df)
+            yield df
+
+
+def _fill_dropoff(raw: pd.DataFrame) -> None:
+    """Give rows without a dropoff (the /predict payload) a placeholder one."""
+    missing = raw[DROPOFF].isna() if DROPOFF in raw.columns else None
+    if missing is not None and not missing.any():
+        return
+    placeholder = to_utc(raw[PICKUP]) + PLACEHOLDER_DURATION
+    if missing is None:
+        raw[DROPOFF] = placeholder
+    else:
+        raw[DROPOFF] = to_utc(raw[DROPOFF]).mask(missing, placeholder)
+
+
+def score_chunk(model: LoadedModel, raw: pd.DataFrame) -> bytes:
+    """
+    Validate + featurize + score one chunk; one NDJSON line per input row.
+    Rows dropped by validation get score null and an error message.
+    """
+    for column in FEATURE_SOURCE_COLUMNS:  # optional fields may be omitted
+        if column not in raw.columns:
+            raw[column] = None
+    if PICKUP in raw.columns:
+        _fill_dropoff(raw)
+    valid, _ = validate_dataframe(raw, copy=False, dedup=False)  # every row gets a score
+    scores = model.predict(build_feature_matrix(valid)) if len(valid) else []
+    by_row = dict(zip(valid.index.tolist(), np.asarray(scores, dtype=float).tolist()))
+    anomalies = dict(zip(valid.index.tolist(), valid["is_anomaly"].tolist()))
+
+    lines = []
+    for row in raw.index.tolist():
+        if row in by_row:
+            out = {"row": row, "score": by_row[row], "is_anomaly": anomalies[row]}
+        else:
+            out = {"row": row, "score": None, "error": "dropped by validation"}
+        lines.append(json.dumps(out))
+    return ("\n".join(lines) + "\n").encode()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from prometheus_client import Counter
+
+log = logging.getLogger(__name__)
+
+CAPTURED = Counter(
+    "capture_records_total", "Sampled /predict requests offered to the capture writer", ["outcome"]
+)
+
+_STOP = object()
+
+
+class RequestCapture:
+    """
+    Appends a sample of /predict requests (payload, score, latency) to
+    rotating JSONL files in `directory` for later replay (benchmarks.replay).
+    offer() only samples and enqueues; JSON encoding and disk writes happen
+    in one background thread. When the queue is full new records are
+    dropped, never waited on. A file is rotated after max_bytes and only
+    the newest max_files are kept.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = "captures",
+        sample_rate: float = 0.01,
+        max_bytes: int = 64 * 1024**2,
+        max_files: int = 20,
+        max_pending: int = 10_000,
+        flush_interval_s: float = 1.0,
+        seed: Optional[int] = None,
+    ):
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.flush_interval_s = flush_interval_s
+        self._rng = random.Random(seed)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._file = None
+        self._bytes = 0
+        self._seq = 0
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+
+    def offer(self, payload: Any, score: float, latency_s: float, model: Optional[str] = None) -> None:
+        """
+        Sample one request; `payload` is a pydantic model (dumped in the
+        writer thread) or a plain dict.
+        """
+        if self._rng.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((time.time(), payload, score, latency_s, model))
+        except queue.Full:
+            CAPTURED.labels("dropped").inc()
+
+    def close(self) -> None:
+        """Write what is queued, then stop the writer."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval_s)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                try:
+                    self._write(item)
+                    CAPTURED.labels("written").inc()
+                except Exception:
+                    CAPTURED.labels("error").inc()
+                    log.exception("request capture failed")
+            if self._file is not None and time.monotonic() - last_flush >= self.flush_interval_s:
+                self._file.flush()
+                last_flush = time.monotonic()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, item: tuple) -> None:
+        ts, payload, score, latency_s, model = item
+        if hasattr(payload, "model_dump"):
+            payload = payload.model_dump(mode="json")
+        line = json.dumps(
+            {"ts": ts, "model": model, "score": score, "latency_ms": latency_s * 1e3, "payload": payload}
+        )
+        if self._file is None or self._bytes >= self.max_bytes:
+            self._rotate()
+        self._file.write(line + "\n")
+        self._bytes += len(line) + 1  # json.dumps output is ASCII
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        self._seq += 1
+        path = self.directory / f"capture-{stamp}-{self._seq:04d}.jsonl"
+        self._file = open(path, "a", buffering=1024**2)
+        self._bytes = 0
+        for old in capture_files(self.directory)[: -self.max_files]:
+            old.unlink(missing_ok=True)
+
+
+def capture_files(path: str | Path) -> list[Path]:
+    """Capture files in `path` (a directory or one file), oldest first."""
+    path = Path(path)
+    if path.is_file():
+        return [path]
+    return sorted(path.glob("capture-*.jsonl"))
+
+
+def iter_captures(path: str | Path) -> Iterator[dict]:
+    """Captured records in write order; a partially written last line is skipped."""
+    for file in capture_files(path):
+        with open(file) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+from prometheus_client import Gauge, Histogram
+
+from src.drift import MAX_BINS, SCORE_EDGES, js_divergence
+
+# Raw request fields that may be missing (defaults are filled in the vector)
+NULLABLE_FIELDS = ("passenger_count", "trip_distance", "RatecodeID", "payment_type")
+
+DRIFT_JS = Gauge(
+    "drift_js_divergence",
+    "JS divergence of the rolling window vs the training reference",
+    ["feature"],
+)
+NULL_RATE = Gauge("input_null_rate", "Share of requests missing a field", ["feature"])
+SCORE_HIST = Histogram(
+    "score_histogram", "Scores returned by /predict", buckets=tuple(SCORE_EDGES) + (1.0,)
+)
+AVG_SCORE = Gauge("avg_score", "Mean score over the rolling window")
+PREDICTION_RATE = Gauge("prediction_rate", "Share of window scores >= 0.5")
+WINDOW_ROWS = Gauge("drift_window_rows", "Requests in the drift window")
+
+_POSITIVE_BIN = int(np.searchsorted(SCORE_EDGES, 0.5, side="right"))
+
+
+class DriftMonitor:
+    """
+    Rolling-window histograms of request features and scores, compared
+    with the model's training reference (src.drift).
+    The window is a ring of `buckets` time slices. observe() only counts
+    nulls and copies the vector and score into a small pending buffer;
+    the buffer is binned in one vectorized step every `flush_rows` requests
+    (or when the slice changes). Everything runs on the event loop, so no
+    locks are taken; refresh() flushes, sums the live slices and sets the
+    gauges when /metrics is scraped. A model with another reference
+    restarts the window.
+    """
+
+    def __init__(
+        self,
+        window_s: float = 86_400.0,
+        buckets: int = 24,
+        flush_rows: int = 256,
+        null_fields: Sequence[str] = NULLABLE_FIELDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.slice_s = window_s / buckets
+        self.buckets = buckets
+        self.flush_rows = flush_rows
+        self.null_fields = tuple(null_fields)
+        self.clock = clock
+        self._reset(None)
+
+    def _reset(self, reference) -> None:
+        k = self.buckets
+        n_features = len(reference.feature_names) if reference is not None else 0
+        self._reference = reference
+        self._epochs = [-1] * k
+        self._rows = np.zeros(k, dtype=np.int64)
+        self._nulls = np.zeros((k, len(self.null_fields)), dtype=np.int64)
+        self._scores = np.zeros((k, len(SCORE_EDGES) + 1), dtype=np.int64)
+        self._score_sum = np.zeros(k)
+        self._features = np.zeros((k, n_features, MAX_BINS), dtype=np.int64)
+        self._pending_x = np.zeros((self.flush_rows, n_features), dtype=np.float32)
+        self._pending_scores = np.zeros(self.flush_rows)
+        self._pending_nulls = [0] * len(self.null_fields)
+        self._pending = 0
+        self._pending_slot = 0
+
+    def flush(self) -> None:
+        """Bin the pending rows into their slice."""
+        n, k = self._pending, self._pending_slot
+        if not n:
+            return
+        self._rows[k] += n
+        self._nulls[k] += self._pending_nulls
+        self._pending_nulls = [0] * len(self.null_fields)
+        scores = self._pending_scores[:n]
+        self._scores[k] += np.bincount(
+            np.searchsorted(SCORE_EDGES, scores, side="right"), minlength=len(SCORE_EDGES) + 1
+        )
+        self._score_sum[k] += scores.sum()
+        reference = self._reference
+        if reference is not None:
+            bins = (self._pending_x[:n, :, None] >= reference.edges).sum(axis=2)
+            flat = (np.arange(bins.shape[1]) * MAX_BINS + bins).ravel()
+            self._features[k] += np.bincount(flat, minlength=self._features[k].size).reshape(-1, MAX_BINS)
+        self._pending = 0
+
+    def observe(self, model, x: np.ndarray, score: float, record: Any = None) -> None:
+        """One scored request: feature vector x, its score, and the raw record."""
+        if model.reference is not self._reference:
+            self.flush()
+            self._reset(model.reference)
+        epoch = int(self.clock() // self.slice_s)
+        k = epoch % self.buckets
+        stale = self._epochs[k] != epoch
+        if stale or k != self._pending_slot or self._pending == self.flush_rows:
+            self.flush()
+            self._pending_slot = k
+        if stale:  # slice reused: drop what it held
+            self._rows[k] = 0
+            self._nulls[k] = 0
+            self._scores[k] = 0
+            self._score_sum[k] = 0.0
+            self._features[k] = 0
+            self._epochs[k] = epoch
+
+        if record is not None:
+            nulls = self._pending_nulls
+            for j, field in enumerate(self.null_fields):
+                if getattr(record, field, None) is None:
+                    nulls[j] += 1
+        i = self._pending
+        if self._reference is not None:
+            self._pending_x[i] = x[: self._pending_x.shape[1]]
+        self._pending_scores[i] = score
+        self._pending = i + 1
+        SCORE_HIST.observe(score)
+
+    def window(self) -> dict:
+        """Summed counts of the slices still inside the window."""
+        self.flush()
+        now = int(self.clock() // self.slice_s)
+        live = np.array([now - self.buckets < e <= now for e in self._epochs])
+        return {
+            "rows": int(self._rows[live].sum()),
+            "nulls": self._nulls[live].sum(axis=0),
+            "scores": self._scores[live].sum(axis=0),
+            "score_sum": float(self._score_sum[live].sum()),
+            "features": self._features[live].sum(axis=0),
+        }
+
+    def refresh(self) -> Optional[dict]:
+        """Set the gauges from the current window; returns the JS divergences."""
+        w = self.window()
+        WINDOW_ROWS.set(w["rows"])
+        if not w["rows"]:
+            return None
+        for field, nulls in zip(self.null_fields, w["nulls"]):
+            NULL_RATE.labels(field).set(nulls / w["rows"])
+        AVG_SCORE.set(w["score_sum"] / w["rows"])
+        PREDICTION_RATE.set(w["scores"][_POSITIVE_BIN:].sum() / w["rows"])
+        reference = self._reference
+        if reference is None:
+            return None
+        divergence = dict(zip(reference.feature_names, js_divergence(w["features"], reference.counts).tolist()))
+        divergence["score"] = float(js_divergence(w["scores"], reference.score_counts))
+        for feature, value in divergence.items():
+            DRIFT_JS.labels(feature).set(value)
+        return divergence
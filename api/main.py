@@ -1,39 +1,247 @@
-from fastapi import FastAPI
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import Response
 from prometheus_client import (CONTENT_TYPE_LATEST, Counter, Histogram,
                                generate_latest)
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="NYC Taxi Inference API (skeleton)")
+from api.batching import MicroBatcher
+from api.capture import RequestCapture
+from api.drift import DriftMonitor
+from api.model_store import ModelSlot, ModelWatcher
+from api.prediction_cache import PredictionCache
+from api.shadow import ShadowScorer
+# pandas / pyarrow (api.bulk) and sklearn (pickled models) are imported on
+# first use; /predict itself only needs numpy
+from src.feature_vector import build_feature_vector
+from src.model import LoadedModel
+from src.profiling import add_observer, remove_observer, span
+
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+MODEL_NAME = os.getenv("MODEL_NAME", "churn_baseline")
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "2"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "64"))
+BULK_CHUNK_ROWS = int(os.getenv("BULK_CHUNK_ROWS", "5000"))
+# Poll MODEL_DIR (a models/ folder or a local MLflow run) for new artifacts; 0 = off
+MODEL_POLL_SECONDS = float(os.getenv("MODEL_POLL_SECONDS", "5"))
+# Optional candidate model scored on a sample of /predict traffic
+SHADOW_MODEL_NAME = os.getenv("SHADOW_MODEL_NAME")
+SHADOW_MODEL_DIR = os.getenv("SHADOW_MODEL_DIR")  # defaults to MODEL_DIR
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+# /predict score cache keyed on the feature vector; size 0 = off
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL_S = float(os.getenv("PREDICTION_CACHE_TTL_S", "300"))
+# Rolling drift window vs the model's training histograms; 0 = off
+DRIFT_WINDOW_S = float(os.getenv("DRIFT_WINDOW_S", "86400"))
+DRIFT_BUCKETS = int(os.getenv("DRIFT_BUCKETS", "24"))
+# Sampled /predict payloads + scores as rotating JSONL for benchmarks.replay; 0 = off
+CAPTURE_SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", "0"))
+CAPTURE_DIR = os.getenv("CAPTURE_DIR", "captures")
+CAPTURE_MAX_MB = float(os.getenv("CAPTURE_MAX_MB", "64"))
+CAPTURE_MAX_FILES = int(os.getenv("CAPTURE_MAX_FILES", "20"))
 
 REQUESTS = Counter("requests_total", "Total requests", ["endpoint"])
 LATENCY = Histogram("request_latency_seconds", "Request latency", ["endpoint"])
+# Filled from src.profiling spans (NYC_PROFILE=1); stages run in microseconds
+STAGE_LATENCY = Histogram(
+    "stage_latency_seconds",
+    "Per-stage latency of profiled spans",
+    ["stage"],
+    buckets=(1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.05, 0.25, 1.0, 5.0),
+)
+
+
+def _observe_stage(stage: str, seconds: float) -> None:
+    STAGE_LATENCY.labels(stage).observe(seconds)
+
+
+class State:
+    primary: Optional[ModelSlot] = None
+    shadow: Optional[ShadowScorer] = None
+    watcher: Optional[ModelWatcher] = None
+    batcher: Optional[MicroBatcher] = None
+    cache: Optional[PredictionCache] = None
+    drift: Optional[DriftMonitor] = None
+    capture: Optional[RequestCapture] = None
+
+    @property
+    def model(self) -> Optional[LoadedModel]:
+        # read once per request / batch: a hot swap replaces the whole model
+        return self.primary.model if self.primary else None
+
+
+state = State()
+
+
+def _predict(X):
+    scores = state.model.predict(X)
+    if state.shadow is not None:
+        state.shadow.offer(X, scores)  # non-blocking
+    return scores
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load once at startup; the API still starts (model_loaded=False) without
+    # one and picks it up from MODEL_DIR once it appears
+    state.primary = ModelSlot(MODEL_DIR, MODEL_NAME)
+    state.primary.reload()
+    slots = [state.primary]
+    if SHADOW_MODEL_NAME:
+        shadow_slot = ModelSlot(SHADOW_MODEL_DIR or MODEL_DIR, SHADOW_MODEL_NAME, label="shadow")
+        shadow_slot.reload()
+        state.shadow = ShadowScorer(shadow_slot, sample_rate=SHADOW_SAMPLE_RATE)
+        slots.append(shadow_slot)
+    if MODEL_POLL_SECONDS > 0:
+        state.watcher = ModelWatcher(slots, interval_s=MODEL_POLL_SECONDS)
+        state.watcher.start()
+    state.batcher = MicroBatcher(
+        _predict, max_batch_size=MAX_BATCH_SIZE, max_wait_s=BATCH_WINDOW_MS / 1000
+    )
+    await state.batcher.start()
+    state.cache = None
+    if PREDICTION_CACHE_SIZE > 0:
+        state.cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S)
+    state.drift = None
+    if DRIFT_WINDOW_S > 0:
+        state.drift = DriftMonitor(DRIFT_WINDOW_S, DRIFT_BUCKETS)
+    if CAPTURE_SAMPLE_RATE > 0:
+        state.capture = RequestCapture(
+            CAPTURE_DIR,
+            sample_rate=CAPTURE_SAMPLE_RATE,
+            max_bytes=int(CAPTURE_MAX_MB * 1024**2),
+            max_files=CAPTURE_MAX_FILES,
+        )
+    add_observer(_observe_stage)  # only called while profiling is enabled
+    yield
+    remove_observer(_observe_stage)
+    if state.capture is not None:
+        state.capture.close()
+        state.capture = None
+    await state.batcher.stop()
+    if state.watcher is not None:
+        state.watcher.stop()
+        state.watcher = None
+    if state.shadow is not None:
+        state.shadow.close()
+        state.shadow = None
 
-class Payload(BaseModel):
-    # placeholder schema; adjust after you define features
-    feature1: float = Field(ge=0)
-    feature2: float = Field(ge=0)
+
+app = FastAPI(title="NYC Taxi Inference API", lifespan=lifespan)
+
+
+class Trip(BaseModel):
+    # raw trip fields available at request time (see src.features)
+    VendorID: int
+    tpep_pickup_datetime: datetime
+    PULocationID: int = Field(ge=0)
+    DOLocationID: int = Field(ge=0)
+    passenger_count: Optional[int] = None
+    trip_distance: Optional[float] = None
+    RatecodeID: Optional[int] = None
+    payment_type: Optional[int] = None
 
 
 @app.get("/health")
 def health():
     REQUESTS.labels("/health").inc()
-    return {"status": "ok", "model_loaded": False}
+    model = state.model
+    return {
+        "status": "ok",
+        "model_loaded": model is not None,
+        "model_name": model.name if model else None,
+        "model_format": model.kind if model else None,
+        "load_seconds": model.load_seconds if model else None,
+        "loaded_at": model.loaded_at if model else None,
+        "load_error": state.primary.load_error if state.primary else None,
+        "shadow_model_loaded": state.shadow is not None and state.shadow.slot.model is not None,
+    }
 
 
 @app.get("/metrics")
-def metrics():
+async def metrics():
+    # on the event loop, like DriftMonitor.observe, so neither needs a lock
+    if state.drift is not None:
+        state.drift.refresh()
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.post("/predict")
-def predict(p: Payload):
-    import time
-
+async def predict(trip: Trip):
     start = time.time()
     REQUESTS.labels("/predict").inc()
-    # placeholder score for skeleton
-    score = float(p.feature1 * 0.1 + p.feature2 * 0.2)
-    LATENCY.labels("/predict").observe(time.time() - start)
+    model = state.model
+    if model is None:
+        raise HTTPException(status_code=503, detail="model not loaded")
+    with span("api.features"):
+        x = build_feature_vector(trip)
+    with span("api.cache"):
+        score = state.cache.get(model, x) if state.cache is not None else None
+    if score is None:
+        with span("api.batch"):  # queueing + the batch's model.predict
+            score = await state.batcher.submit(x)
+        if state.cache is not None:
+            state.cache.put(model, x, score)
+    if state.drift is not None:
+        with span("api.drift"):
+            state.drift.observe(model, x, score, trip)
+    elapsed = time.time() - start
+    LATENCY.labels("/predict").observe(elapsed)
+    if state.capture is not None:
+        state.capture.offer(trip, score, elapsed, model.name)
     return {"score": score}
+
+
+@app.post("/predict_batch")
+async def predict_batch(request: Request):
+    """
+    Bulk scoring: newline-delimited JSON or an Arrow IPC stream of raw trip
+    records in, NDJSON scores out ({"row", "score", "is_anomaly"} per input
+    row), produced chunk by chunk so memory stays bounded.
+    """
+    from api.bulk import (ARROW_STREAM, NDJSON, DuplexStreamingResponse,
+                          iter_arrow_chunks, iter_ndjson_chunks, score_chunk)
+
+    REQUESTS.labels("/predict_batch").inc()
+    if state.model is None:
+        raise HTTPException(status_code=503, detail="model not loaded")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == NDJSON:
+        chunks = iter_ndjson_chunks(request.stream(), BULK_CHUNK_ROWS)
+    elif content_type == ARROW_STREAM:
+        chunks = iter_arrow_chunks(request.stream(), BULK_CHUNK_ROWS)
+    else:
+        raise HTTPException(
+            status_code=415, detail=f"use {NDJSON} or {ARROW_STREAM}"
+        )
+
+    model = state.model  # one model for the whole request
+    start = time.time()
+    # score the first chunk up front so a malformed payload is a 400, not a
+    # 200 whose only line is an error
+    try:
+        first = await chunks.__anext__()
+        head = await run_in_threadpool(score_chunk, model, first)
+    except StopAsyncIteration:
+        head = None
+    except (KeyError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    async def scores():
+        try:
+            if head is not None:
+                yield head
+            async for chunk in chunks:
+                yield await run_in_threadpool(score_chunk, model, chunk)
+        except (KeyError, ValueError) as exc:  # bad later chunk: report and stop
+            yield (json.dumps({"error": str(exc)}) + "\n").encode()
+        LATENCY.labels("/predict_batch").observe(time.time() - start)
+
+    return DuplexStreamingResponse(scores(), media_type=NDJSON)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from prometheus_client import Counter
+
+from src.feature_vector import FEATURE_NAMES
+from src.model import LoadedModel, load_model
+
+log = logging.getLogger(__name__)
+
+RELOADS = Counter(
+    "model_reloads_total", "Model (re)load attempts", ["slot", "result"]
+)
+
+Signature = tuple
+
+
+def resolve_model_dir(path: str | Path) -> Path:
+    """A models/ directory, or a local MLflow run (its artifacts/ folder)."""
+    path = Path(path)
+    if (path / "artifacts").is_dir():
+        return path / "artifacts"
+    return path
+
+
+def artifact_signature(model_dir: Path, name: str) -> Signature:
+    """(file, mtime, size) of every artifact load_model may read."""
+    files = [
+        model_dir / f"{name}_feature_schema.json",
+        model_dir / f"{name}.pkl",
+        model_dir / f"{name}_zones.npy",
+        model_dir / f"{name}_reference.json",
+    ]
+    forest = model_dir / f"{name}.forest"
+    if forest.is_dir():
+        files += sorted(forest.iterdir())
+    sig = []
+    for f in files:
+        try:
+            st = f.stat()
+        except FileNotFoundError:
+            continue
+        sig.append((f.name, st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+class ModelSlot:
+    """
+    Holds the current model for (model_dir, name). reload() loads and
+    validates a new model on the calling thread and only then replaces
+    `model` with a single assignment, so readers that grabbed the old
+    model keep using it and nobody sees a half-loaded one.
+    """
+
+    def __init__(self, model_dir: str | Path, name: str, label: str = "primary"):
+        self.model_dir = resolve_model_dir(model_dir)
+        self.name = name
+        self.label = label
+        self.model: Optional[LoadedModel] = None
+        self.load_error: Optional[str] = None
+        self._loaded_sig: Optional[Signature] = None  # artifacts behind self.model
+        self._tried_sig: Optional[Signature] = None  # last attempt, ok or not
+        self._seen_sig: Optional[Signature] = None  # last poll
+        self._lock = threading.Lock()
+
+    def reload(self) -> bool:
+        """Load the artifacts on disk now; True if a new model was swapped in."""
+        with self._lock:
+            sig = artifact_signature(self.model_dir, self.name)
+            self._tried_sig = sig
+            try:
+                candidate = load_model(self.model_dir, self.name)
+                scores = candidate.predict(np.zeros((1, len(FEATURE_NAMES)), dtype=np.float32))
+                if np.shape(scores) != (1,) or not np.isfinite(scores).all():
+                    raise ValueError(f"smoke prediction returned {scores!r}")
+            except Exception as exc:  # keep serving the previous model
+                self.load_error = f"{type(exc).__name__}: {exc}"
+                RELOADS.labels(self.label, "failed").inc()
+                log.warning("%s model %s not loaded: %s", self.label, self.name, self.load_error)
+                return False
+            self.model = candidate
+            self._loaded_sig = sig
+            self.load_error = None
+            RELOADS.labels(self.label, "ok").inc()
+            log.info("%s model %s loaded in %.3fs", self.label, self.name, candidate.load_seconds)
+            return True
+
+    def poll(self) -> bool:
+        """
+        Reload if the artifacts changed and have stayed unchanged since the
+        previous poll (so a model that is still being written is not picked
+        up half way). A failed version is not retried until it changes again.
+        """
+        sig = artifact_signature(self.model_dir, self.name)
+        settled = sig == self._seen_sig
+        self._seen_sig = sig
+        if not sig or not settled or sig in (self._loaded_sig, self._tried_sig):
+            return False
+        return self.reload()
+
+
+class ModelWatcher:
+    """Background thread polling ModelSlots every `interval_s` seconds."""
+
+    def __init__(self, slots: list[ModelSlot], interval_s: float = 5.0):
+        self.slots = slots
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        for slot in self.slots:
+            slot._seen_sig = artifact_signature(slot.model_dir, slot.name)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            for slot in self.slots:
+                try:
+                    slot.poll()
+                except Exception:  # never let the watcher die
+                    log.exception("polling %s model failed", slot.label)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+CACHE_REQUESTS = Counter(
+    "prediction_cache_requests_total", "Prediction cache lookups", ["result"]
+)
+CACHE_EVICTIONS = Counter(
+    "prediction_cache_evictions_total", "Prediction cache evictions", ["reason"]
+)
+CACHE_ENTRIES = Gauge("prediction_cache_entries", "Entries in the prediction cache")
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of scores keyed on the canonical feature vector
+    (build_feature_vector output, so equal trips share an entry).
+    Entries expire after ttl_s; the least recently used entry is evicted
+    past max_entries. The cache is tied to one model object: a lookup with
+    a different model (after a hot swap) empties it, and stores for a model
+    that is no longer current are ignored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_s: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, float]] = OrderedDict()
+        self._model: Any = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _use_model(self, model: Any) -> None:
+        if model is not self._model:
+            if self._entries:
+                CACHE_EVICTIONS.labels("model").inc(len(self._entries))
+                self._entries.clear()
+                CACHE_ENTRIES.set(0)
+            self._model = model
+
+    def get(self, model: Any, x: np.ndarray) -> Optional[float]:
+        key = x.tobytes()
+        with self._lock:
+            self._use_model(model)
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, score = entry
+                if expires > self.clock():
+                    self._entries.move_to_end(key)
+                    CACHE_REQUESTS.labels("hit").inc()
+                    return score
+                del self._entries[key]
+                CACHE_EVICTIONS.labels("ttl").inc()
+                CACHE_ENTRIES.set(len(self._entries))
+        CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def put(self, model: Any, x: np.ndarray, score: float) -> None:
+        key = x.tobytes()
+        with self._lock:
+            if model is not self._model:
+                return  # scored by a model that has since been swapped out
+            self._entries[key] = (self.clock() + self.ttl_s, score)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels("size").inc()
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            CACHE_ENTRIES.set(0)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from prometheus_client import Counter, Histogram
+
+from api.model_store import ModelSlot
+
+log = logging.getLogger(__name__)
+
+SHADOW_ROWS = Counter(
+    "shadow_rows_total", "Rows scored by the shadow model", ["outcome"]
+)
+SHADOW_ABS_DIFF = Histogram(
+    "shadow_score_abs_diff",
+    "|primary score - shadow score| per sampled row",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0),
+)
+SHADOW_LATENCY = Histogram(
+    "shadow_predict_seconds",
+    "Shadow model predict time per sampled batch",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+
+class ShadowScorer:
+    """
+    Scores a sample of live traffic with a candidate model.
+    offer() only samples rows and hands them to a separate thread pool, so
+    the primary response never waits on the shadow model. When more than
+    max_pending batches are queued, new samples are dropped instead.
+    Outcomes are counted as agree / disagree (at `threshold`), dropped or
+    error, and score differences go to the shadow_score_abs_diff histogram.
+    """
+
+    def __init__(
+        self,
+        slot: ModelSlot,
+        sample_rate: float = 0.1,
+        threshold: float = 0.5,
+        max_workers: int = 1,
+        max_pending: int = 64,
+        seed: int | None = None,
+    ):
+        self.slot = slot
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shadow")
+        self._rng = np.random.default_rng(seed)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def offer(self, X: np.ndarray, primary: np.ndarray) -> None:
+        """Queue a sample of (X, primary scores) for shadow scoring."""
+        if self.slot.model is None or self.sample_rate <= 0:
+            return
+        with self._lock:
+            take = np.flatnonzero(self._rng.random(len(X)) < self.sample_rate)
+            if not take.size:
+                return
+            if self._pending >= self.max_pending:
+                SHADOW_ROWS.labels("dropped").inc(take.size)
+                return
+            self._pending += 1
+        self._pool.submit(self._score, X[take].copy(), np.asarray(primary)[take])
+
+    def _score(self, X: np.ndarray, primary: np.ndarray) -> None:
+        try:
+            model = self.slot.model
+            start = time.perf_counter()
+            shadow = model.predict(X)
+            SHADOW_LATENCY.observe(time.perf_counter() - start)
+            for diff in np.abs(primary - shadow):
+                SHADOW_ABS_DIFF.observe(float(diff))
+            agree = int(np.count_nonzero((primary >= self.threshold) == (shadow >= self.threshold)))
+            SHADOW_ROWS.labels("agree").inc(agree)
+            SHADOW_ROWS.labels("disagree").inc(len(X) - agree)
+        except Exception:
+            SHADOW_ROWS.labels("error").inc(len(X))
+            log.exception("shadow scoring failed")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
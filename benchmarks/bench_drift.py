@@ -0,0 +1,63 @@
+"""
+Per-request cost of the API drift monitor (api.drift.DriftMonitor).
+
+    python -m benchmarks.bench_drift --requests 50000
+
+Times observe() for single requests, as /predict calls it, and refresh()
+as run on each /metrics scrape. Exits 1 when observe() is over budget.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from api.drift import DriftMonitor
+from src.drift import build_reference
+from src.features import FEATURE_NAMES
+
+# observe() runs inline in /predict; keep it well under a millisecond
+OBSERVE_BUDGET_US = 50.0
+
+
+def run(requests: int, flush_rows: int) -> dict:
+    rng = np.random.default_rng(0)
+    X = rng.random((requests, len(FEATURE_NAMES))).astype(np.float32)
+    scores = rng.random(requests)
+    model = SimpleNamespace(reference=build_reference(X[:10_000], scores[:10_000]))
+    record = SimpleNamespace(passenger_count=None, trip_distance=1.0, RatecodeID=1, payment_type=None)
+    monitor = DriftMonitor(flush_rows=flush_rows)
+
+    start = time.perf_counter()
+    for x, score in zip(X, scores):
+        monitor.observe(model, x, float(score), record)
+    observe_s = (time.perf_counter() - start) / requests
+
+    start = time.perf_counter()
+    monitor.refresh()
+    return {
+        "requests": requests,
+        "flush_rows": flush_rows,
+        "observe_us": observe_s * 1e6,
+        "refresh_ms": (time.perf_counter() - start) * 1e3,
+        "within_budget": observe_s * 1e6 < OBSERVE_BUDGET_US,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--flush-rows", type=int, default=256)
+    args = parser.parse_args()
+    result = run(args.requests, args.flush_rows)
+    print(json.dumps(result, indent=2))
+    if not result["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Forest serving benchmark: pickled sklearn RandomForest vs src.forest.PackedForest.
+
+    python -m benchmarks.bench_forest --trees 200 --rows 20000
+"""
+from __future__ import annotations
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.features import FEATURE_NAMES
+from src.forest import pack_forest
+
+
+def _best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(trees: int, rows: int, repeat: int) -> tuple[dict, list[dict]]:
+    rng = np.random.default_rng(0)
+    X = rng.random((rows, len(FEATURE_NAMES))).astype(np.float32)
+    y = ((X[:, 0] + 0.3 * rng.random(rows)) > 0.6).astype(int)
+    # same settings as train_once(algo="rf")
+    model = RandomForestClassifier(
+        n_estimators=trees, max_depth=None, n_jobs=-1, random_state=0, class_weight="balanced"
+    ).fit(X, y)
+    packed = pack_forest(model)
+
+    blob = pickle.dumps(model)
+    sizes = {
+        "pickle_mb": len(blob) / 1e6,
+        "packed_mb": packed.nbytes / 1e6,
+        "unpickle_s": _best_of(lambda: pickle.loads(blob), 1),
+        "max_abs_diff": float(
+            np.abs(packed.predict_positive(X[:2000]) - model.predict_proba(X[:2000])[:, 1]).max()
+        ),
+    }
+
+    results = []
+    for batch in (1, 8, 64, 512, 5000):
+        xs = X[:batch]
+        old = _best_of(lambda: model.predict_proba(xs), repeat)
+        new = _best_of(lambda: packed.predict_positive(xs), repeat)
+        results.append({"batch": batch, "old_s": old, "new_s": new})
+    return sizes, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sizes, results = run(args.trees, args.rows, args.repeat)
+    for key, value in sizes.items():
+        print(f"{key:<14}{value:>12.4g}")
+    print(f"{'batch':<8}{'sklearn (ms)':>14}{'packed (ms)':>14}{'speedup':>10}")
+    for r in results:
+        speedup = r["old_s"] / r["new_s"] if r["new_s"] else float("inf")
+        print(f"{r['batch']:<8}{r['old_s'] * 1e3:>14.3f}{r['new_s'] * 1e3:>14.3f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Memory saved by the contract's compact storage dtypes (ColumnRule.storage).
+
+    python -m benchmarks.bench_memory --rows 1000000
+
+Validates one synthetic month twice, in the wide coerced dtypes
+(compact=False) and in the storage dtypes, and reports the deep memory of
+each column. Also checks that the two runs agree: the same report, kept
+rows and anomaly flags, labels, an identical feature matrix and identical
+build_features frames. Exits 1 if they do not.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+
+from src.data import add_label
+from src.features import build_feature_matrix, build_features
+from src.synthetic import generate_chunk
+from src.validator import validate_dataframe
+
+MB = 1024**2
+
+
+def _report(report) -> dict:
+    return {k: v for k, v in asdict(report).items() if k != "stage_timings"}
+
+
+def compare_outputs(wide: pd.DataFrame, compact: pd.DataFrame) -> list[str]:
+    """Differences between a wide and a compact validated frame that would change results."""
+    problems = []
+    if not wide.index.equals(compact.index):
+        return ["kept rows differ"]
+    if not np.array_equal(wide["is_anomaly"].to_numpy(), compact["is_anomaly"].to_numpy()):
+        problems.append("is_anomaly differs")
+    if not np.array_equal(add_label(wide)["HIGH_TOTAL"].to_numpy(), add_label(compact)["HIGH_TOTAL"].to_numpy()):
+        problems.append("labels differ")
+    if not np.array_equal(build_feature_matrix(wide), build_feature_matrix(compact)):
+        problems.append("feature matrix differs")
+    if not build_features(wide).equals(build_features(compact)):
+        problems.append("build_features differs")
+    for col in compact.columns:
+        a, b = wide[col], compact[col]
+        if pd.api.types.is_float_dtype(b.dtype):  # equal at the storage precision
+            same = np.array_equal(a.to_numpy(dtype=b.dtype), b.to_numpy(), equal_nan=True)
+        else:
+            null = a.isna().to_numpy()
+            same = np.array_equal(null, b.isna().to_numpy()) and np.array_equal(
+                a[~null].astype(str).to_numpy(), b[~null].astype(str).to_numpy()
+            )
+        if not same:
+            problems.append(f"{col} values differ")
+    return problems
+
+
+def run(rows: int, seed: int = 0) -> dict:
+    raw = generate_chunk("2025-03", rows, seed)
+    wide, wide_report = validate_dataframe(raw, month="2025-03", compact=False)
+    compact, report = validate_dataframe(raw, month="2025-03")
+
+    before = wide.memory_usage(deep=True, index=False) / MB
+    after = compact.memory_usage(deep=True, index=False) / MB
+    problems = compare_outputs(wide, compact)
+    if _report(wide_report) != _report(report):
+        problems.append("validation report differs")
+    return {
+        "rows": len(compact),
+        "wide_mb": float(before.sum()),
+        "compact_mb": float(after.sum()),
+        "saved": float(1 - after.sum() / before.sum()),
+        "columns": {
+            col: f"{wide[col].dtype} -> {compact[col].dtype}: {before[col]:.2f} -> {after[col]:.2f} MB"
+            for col in compact.columns
+        },
+        "problems": problems,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    result = run(args.rows, args.seed)
+    print(json.dumps(result, indent=2))
+    if result["problems"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+API cold start and per-worker memory: pickled forest vs memory-mapped packed forest.
+
+    python -m benchmarks.bench_startup --workers 4 --trees 200
+
+Starts --workers processes that each import api.main, load the model and
+score once (like uvicorn --workers N), then reads every worker's RSS and
+PSS from /proc while all are alive. PSS splits shared pages between the
+processes mapping them, so sum(PSS) is what the pod actually pays.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from joblib import dump
+from sklearn.ensemble import RandomForestClassifier
+
+from src.features import FEATURE_NAMES
+from src.forest import pack_forest
+
+WORKER = """
+import json, sys, time
+t0 = time.perf_counter()
+import api.main
+t1 = time.perf_counter()
+from src.model import load_model
+model = load_model(sys.argv[1], "bench", packed=sys.argv[2] == "packed")
+t2 = time.perf_counter()
+import numpy as np
+model.predict(np.zeros((1, len(model.feature_names)), dtype=np.float32))
+t3 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "load_s": t2 - t1, "first_predict_s": t3 - t2}), flush=True)
+sys.stdin.read()  # stay alive until the parent has measured memory
+"""
+
+
+def _smaps_mb(pid: int) -> dict:
+    """Rss / Pss of a process in MB (Linux)."""
+    out = {}
+    try:
+        text = Path(f"/proc/{pid}/smaps_rollup").read_text()
+    except OSError:
+        return out
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("Rss", "Pss"):
+            out[key.lower() + "_mb"] = int(rest.split()[0]) / 1024
+    return out
+
+
+def _save_model(model_dir: Path, trees: int, rows: int) -> None:
+    rng = np.random.default_rng(0)
+    X = rng.random((rows, len(FEATURE_NAMES))).astype(np.float32)
+    y = ((X[:, 0] + 0.3 * rng.random(rows)) > 0.6).astype(int)
+    model = RandomForestClassifier(
+        n_estimators=trees, max_depth=None, n_jobs=-1, random_state=0, class_weight="balanced"
+    ).fit(X, y)
+    dump(model, model_dir / "bench.pkl")
+    pack_forest(model).save(model_dir / "bench.forest")
+    schema = {"feature_names": FEATURE_NAMES, "n_features": len(FEATURE_NAMES)}
+    (model_dir / "bench_feature_schema.json").write_text(json.dumps(schema))
+
+
+def run(model_dir: Path, mode: str, workers: int) -> dict:
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, str(model_dir), mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    timings = [json.loads(p.stdout.readline()) for p in procs]
+    ready_s = time.perf_counter() - start
+    memory = [_smaps_mb(p.pid) for p in procs]
+    for p in procs:
+        p.communicate("")
+
+    def mean(rows, key):
+        values = [r[key] for r in rows if key in r]
+        return sum(values) / len(values) if values else float("nan")
+
+    return {
+        "mode": mode,
+        "all_ready_s": ready_s,
+        "import_s": mean(timings, "import_s"),
+        "load_s": mean(timings, "load_s"),
+        "first_predict_s": mean(timings, "first_predict_s"),
+        "rss_mb": mean(memory, "rss_mb"),
+        "pss_mb": mean(memory, "pss_mb"),
+        "pod_pss_mb": sum(m.get("pss_mb", 0.0) for m in memory),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = Path(tmp)
+        _save_model(model_dir, args.trees, args.rows)
+        results = [run(model_dir, mode, args.workers) for mode in ("pickle", "packed")]
+
+    keys = ["all_ready_s", "import_s", "load_s", "first_predict_s", "rss_mb", "pss_mb", "pod_pss_mb"]
+    print(f"{'':<16}" + "".join(f"{r['mode']:>12}" for r in results))
+    for key in keys:
+        print(f"{key:<16}" + "".join(f"{r[key]:>12.3f}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Timestamp parsing benchmark: generic pd.to_datetime (old path) vs to_utc.
+
+    python -m benchmarks.bench_timestamps --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.contract_spec import to_utc
+
+LAYOUTS = {
+    "iso_z": "%Y-%m-%dT%H:%M:%SZ",
+    "iso_space": "%Y-%m-%d %H:%M:%S",
+    "us_ampm": "%m/%d/%Y %I:%M:%S %p",
+}
+
+
+def _best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _generic(s: pd.Series) -> pd.Series:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pd.to_datetime(s, errors="coerce", utc=True)
+
+
+def run(rows: int, repeat: int, workdir: Path) -> list[dict]:
+    rng = np.random.default_rng(0)
+    stamps = pd.Timestamp("2025-03-01") + pd.to_timedelta(
+        rng.integers(0, 31 * 86400, rows), unit="s"
+    )
+    results = []
+
+    for name, fmt in LAYOUTS.items():
+        path = workdir / f"{name}.csv"
+        pd.DataFrame({"tpep_pickup_datetime": stamps.strftime(fmt)}).to_csv(
+            path, index=False
+        )
+        col = pd.read_csv(path)["tpep_pickup_datetime"]
+        if name == "us_ampm":
+            # generic parsing falls back to dateutil here; time both on a slice
+            col = col.iloc[: min(rows, 100_000)]
+        old = _best_of(lambda: _generic(col), 1)
+        new = _best_of(lambda: to_utc(col), repeat)
+        results.append({"input": f"csv:{name}", "old_s": old, "new_s": new})
+
+    path = workdir / "typed.parquet"
+    pd.DataFrame({"tpep_pickup_datetime": stamps}).to_parquet(path)
+    col = pd.read_parquet(path)["tpep_pickup_datetime"]
+    old = _best_of(lambda: _generic(col), repeat)
+    new = _best_of(lambda: to_utc(col), repeat)
+    results.append({"input": "parquet:timestamp", "old_s": old, "new_s": new})
+
+    # build_features used to re-parse the validated (already UTC) column
+    validated = to_utc(col)
+    old = _best_of(
+        lambda: pd.to_datetime(validated, utc=True, errors="coerce"), repeat
+    )
+    new = _best_of(lambda: to_utc(validated), repeat)
+    results.append({"input": "features:validated", "old_s": old, "new_s": new})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.rows, args.repeat, Path(tmp))
+
+    print(f"{'input':<22}{'old (s)':>10}{'new (s)':>10}{'speedup':>10}")
+    for r in results:
+        speedup = r["old_s"] / r["new_s"] if r["new_s"] else float("inf")
+        print(f"{r['input']:<22}{r['old_s']:>10.3f}{r['new_s']:>10.3f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Replay captured /predict traffic (api.capture) against a running API.
+
+    CAPTURE_SAMPLE_RATE=0.05 uvicorn api.main:app            # record
+    python -m benchmarks.replay captures/ --url http://127.0.0.1:8000 --concurrency 16 --rate 200
+
+Requests are sent open-loop at --rate per second (0 = as fast as
+--concurrency allows). Latency is measured from each request's scheduled
+send time, so a stalled server shows up as queueing delay instead of
+quietly lowering the offered load. Reports p50 / p95 / p99, throughput and
+errors; the exit code is 1 when p95 misses the target (300 ms, the alert in
+monitoring/metrics_spec.md).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from itertools import islice
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from api.capture import iter_captures
+
+P95_TARGET_MS = 300.0
+
+
+def load_payloads(path: str, limit: Optional[int] = None) -> list[dict]:
+    payloads = [r["payload"] for r in islice(iter_captures(path), limit)]
+    if not payloads:
+        raise ValueError(f"no captured requests in {path}")
+    return payloads
+
+
+async def replay(
+    payloads: list[dict],
+    send: Callable[[dict], Awaitable[bool]],
+    requests: int,
+    concurrency: int = 8,
+    rate: float = 0.0,
+    target_p95_ms: float = P95_TARGET_MS,
+) -> dict:
+    """
+    Send `requests` payloads (cycling through them) with at most
+    `concurrency` in flight; send(payload) returns True on success.
+    """
+    latencies = np.empty(requests)
+    errors = 0
+    issued = 0
+    start = time.perf_counter()
+
+    async def worker():
+        nonlocal errors, issued
+        while issued < requests:
+            i = issued
+            issued += 1
+            scheduled = start + i / rate if rate > 0 else time.perf_counter()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                ok = await send(payloads[i % len(payloads)])
+            except Exception:
+                ok = False
+            latencies[i] = time.perf_counter() - scheduled
+            errors += not ok
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "rate": rate,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "p95_target_ms": target_p95_ms,
+        "meets_target": bool(p95 <= target_p95_ms),
+    }
+
+
+async def replay_http(url: str, payloads: list[dict], **kwargs) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=kwargs.get("concurrency", 8))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+
+        async def send(payload: dict) -> bool:
+            response = await client.post("/predict", json=payload)
+            return response.status_code == 200
+
+        return await replay(payloads, send, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("captures", help="Capture directory (CAPTURE_DIR) or one capture-*.jsonl file")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=None, help="Requests to send (default: one per record)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests per second (0 = unthrottled)")
+    parser.add_argument("--limit", type=int, default=None, help="Read at most this many captured records")
+    parser.add_argument("--target-p95-ms", type=float, default=P95_TARGET_MS)
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.captures, args.limit)
+    result = asyncio.run(
+        replay_http(
+            args.url,
+            payloads,
+            requests=args.requests or len(payloads),
+            concurrency=args.concurrency,
+            rate=args.rate,
+            target_p95_ms=args.target_p95_ms,
+        )
+    )
+    print(json.dumps(result, indent=2))
+    if not result["meets_target"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
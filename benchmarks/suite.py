@@ -0,0 +1,222 @@
+"""
+End-to-end benchmark suite on synthetic data (src.synthetic).
+
+    python -m benchmarks.suite --rows 1000000
+    python -m benchmarks.suite --save-baseline        # refresh benchmarks/baseline.json
+
+Generates one seeded month as CSV and Parquet, then times each stage:
+reading both formats, validate_dataframe, build_feature_matrix, a random
+forest fit, batch scoring and single-row /predict calls through the API.
+Each stage reports the best of --repeat runs (rows/s), latency percentiles
+where it serves single requests, and peak RSS growth while it ran.
+Results are compared with the stored baseline (same --rows only); a stage
+slower, or using more memory, than the baseline by more than --tolerance
+is reported as a regression and the exit code is 1.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+BASELINE = Path(__file__).with_name("baseline.json")
+MONTH = "2025-03"
+
+
+class PeakRSS:
+    """Samples this process's RSS (Linux /proc) in a thread; peak growth in MB."""
+
+    def __init__(self, interval_s: float = 0.002):
+        self.interval_s = interval_s
+        self.start_mb = self.peak_mb = _rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.peak_mb = max(self.peak_mb, _rss_mb() or 0.0)
+
+    def __enter__(self):
+        if self.start_mb is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    @property
+    def growth_mb(self) -> Optional[float]:
+        if self.start_mb is None:
+            return None
+        return max(self.peak_mb, _rss_mb()) - self.start_mb
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:  # not Linux
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+def _stage(fn: Callable, rows: int, repeat: int) -> tuple[dict, object]:
+    """Best-of-repeat wall time and the largest RSS growth of any run."""
+    times, growth, result = [], [], None
+    for _ in range(repeat):
+        result = None
+        with PeakRSS() as rss:
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        growth.append(rss.growth_mb)
+    best = min(times)
+    stats = {"seconds": best, "rows_per_sec": rows / best if best > 0 else 0.0}
+    if growth[0] is not None:
+        stats["peak_rss_mb"] = max(growth)
+    return stats, result
+
+
+def _latencies(fn: Callable, n: int) -> dict:
+    samples = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples[i] = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1e3
+    return {"requests": n, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "rows_per_sec": n / samples.sum()}
+
+
+def run(rows: int, repeat: int, api_requests: int, seed: int = 0) -> dict:
+    import pandas as pd
+
+    import api.main as api_main
+    from fastapi.testclient import TestClient
+    from joblib import dump
+    from src.data import add_label, iter_raw_chunks, read_parquet
+    from src.features import FEATURE_NAMES, build_feature_matrix
+    from src.forest import pack_forest
+    from src.model import load_model
+    from src.synthetic import write_month
+    from src.train import make_model
+    from src.validator import validate_dataframe
+
+    stages = {}
+    with tempfile.TemporaryDirectory(prefix="bench-suite-") as tmp:
+        tmp = Path(tmp)
+        csv, parquet = tmp / f"{MONTH}.csv", tmp / f"{MONTH}.parquet"
+        stages["generate"], _ = _stage(lambda: write_month(parquet, MONTH, rows, seed), rows, 1)
+        write_month(csv, MONTH, rows, seed)
+
+        stages["read_csv"], _ = _stage(lambda: pd.concat(iter_raw_chunks(csv)), rows, repeat)
+        stages["read_parquet"], raw = _stage(lambda: read_parquet(parquet), rows, repeat)
+        stages["validate"], (clean, _) = _stage(lambda: validate_dataframe(raw, month=MONTH), rows, repeat)
+        labeled = add_label(clean)
+        stages["features"], X = _stage(lambda: build_feature_matrix(labeled), len(labeled), repeat)
+        y = labeled["HIGH_TOTAL"].to_numpy()
+
+        fit_rows = min(len(X), 200_000)
+        stages["train_fit"], model = _stage(
+            lambda: make_model("rf", random_state=0, class_weight="balanced", n_estimators=50).fit(
+                X[:fit_rows], y[:fit_rows]
+            ),
+            fit_rows,
+            1,
+        )
+        dump(model, tmp / "bench.pkl")
+        pack_forest(model).save(tmp / "bench.forest")
+        (tmp / "bench_feature_schema.json").write_text(json.dumps({"feature_names": FEATURE_NAMES}))
+
+        batch = load_model(tmp, "bench", packed=False)
+        stages["score_batch"], _ = _stage(lambda: batch.predict(X), len(X), repeat)
+
+        trips = raw.head(api_requests)
+        payloads = [
+            {
+                "VendorID": int(r.VendorID),
+                "tpep_pickup_datetime": r.tpep_pickup_datetime.isoformat(),
+                "PULocationID": int(r.PULocationID),
+                "DOLocationID": int(r.DOLocationID),
+                "trip_distance": float(r.trip_distance),
+                "payment_type": int(r.payment_type),
+            }
+            for r in trips.itertuples()
+            if not pd.isna(r.tpep_pickup_datetime)
+        ]
+        api_main.MODEL_DIR, api_main.MODEL_NAME = str(tmp), "bench"
+        api_main.PREDICTION_CACHE_SIZE = 0  # measure scoring, not cache hits
+        with TestClient(api_main.app) as client, PeakRSS() as rss:
+            stats = _latencies(lambda i: client.post("/predict", json=payloads[i % len(payloads)]), api_requests)
+        if rss.growth_mb is not None:
+            stats["peak_rss_mb"] = rss.growth_mb
+        stages["api_predict"] = stats
+
+    return {
+        "config": {"rows": rows, "repeat": repeat, "api_requests": api_requests, "seed": seed},
+        "machine": {"python": platform.python_version(), "cpus": os.cpu_count(), "platform": platform.platform()},
+        "stages": stages,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, rss_slack_mb: float = 32.0) -> list[str]:
+    """Regressions of results vs baseline: lower throughput, higher p95 / peak RSS."""
+    if results["config"]["rows"] != baseline["config"]["rows"]:
+        return []
+    regressions = []
+    for stage, base in baseline["stages"].items():
+        new = results["stages"].get(stage)
+        if new is None:
+            continue
+        if new["rows_per_sec"] < base["rows_per_sec"] * (1 - tolerance):
+            regressions.append(f"{stage}: {new['rows_per_sec']:.0f} rows/s vs {base['rows_per_sec']:.0f}")
+        if "p95_ms" in base and new["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{stage}: p95 {new['p95_ms']:.2f} ms vs {base['p95_ms']:.2f}")
+        if "peak_rss_mb" in base and "peak_rss_mb" in new:
+            if new["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance) + rss_slack_mb:
+                regressions.append(f"{stage}: peak RSS +{new['peak_rss_mb']:.0f} MB vs +{base['peak_rss_mb']:.0f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--api-requests", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite --baseline with this run")
+    parser.add_argument("--out", help="Also write the results JSON here")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat, args.api_requests, args.seed)
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(results, indent=2) + "\n")
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    results["regressions"] = compare(results, baseline, args.tolerance) if baseline else []
+    if baseline and results["config"]["rows"] != baseline["config"]["rows"]:
+        results["note"] = f"baseline was recorded with --rows {baseline['config']['rows']}; not compared"
+    print(json.dumps(results, indent=2))
+    if results["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import pandas as pd
+
+from .contract_spec import COLUMNS, ColumnRule
+from .validator import ValidationReport
+
+# Bump when validator behaviour changes without a COLUMNS change
+CACHE_VERSION = 3
+DEFAULT_MAX_BYTES = 20 * 1024**3
+
+
+def contract_fingerprint(columns: Sequence[ColumnRule] = COLUMNS) -> str:
+    """Stable hash of the ColumnRule definitions (+ CACHE_VERSION)."""
+    payload = json.dumps(
+        {"version": CACHE_VERSION, "columns": [asdict(c) for c in columns]},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def file_digest(path: str | Path, block_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ValidatedCache:
+    """
+    On-disk cache of validated months.
+    Each entry is a directory holding frame.parquet, report.json and
+    meta.json; meta.json's mtime is the last access time for LRU eviction.
+    Entries written under another contract fingerprint are dropped on put().
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        fingerprint: Optional[str] = None,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint or contract_fingerprint()
+
+    def key(self, path: str | Path, **options: Any) -> str:
+        """Key = file content hash + contract fingerprint + load options."""
+        payload = json.dumps(
+            {
+                "file": file_digest(path),
+                "contract": self.fingerprint,
+                "options": options,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[tuple[pd.DataFrame, ValidationReport]]:
+        entry = self.root / key
+        meta_path = entry / "meta.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta.get("contract") != self.fingerprint:
+                shutil.rmtree(entry, ignore_errors=True)
+                return None
+            df = pd.read_parquet(entry / "frame.parquet")
+            report = ValidationReport(**json.loads((entry / "report.json").read_text()))
+            os.utime(meta_path)  # mark as recently used
+        except OSError:  # missing, or evicted by another process while reading
+            return None
+        report.stage_timings = None  # timings belong to the run that filled the entry
+        return df, report
+
+    def put(self, key: str, df: pd.DataFrame, report: ValidationReport) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = self.root / key
+        tmp = self.root / f".{key}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        df.to_parquet(tmp / "frame.parquet")
+        (tmp / "report.json").write_text(json.dumps(asdict(report), indent=2))
+        (tmp / "meta.json").write_text(json.dumps({"contract": self.fingerprint}))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)  # readers never see a half-written entry
+        self.prune_stale()
+        self.evict()
+
+    # Several processes (load_months workers) may share one root, so an
+    # entry can be replaced or evicted by another writer mid-scan: those are
+    # skipped. ".<key>.tmp" directories are other writers' entries in progress.
+    def _entries(self) -> list[Path]:
+        try:
+            children = list(self.root.iterdir())
+        except FileNotFoundError:
+            return []
+        return [p for p in children if not p.name.startswith(".") and (p / "meta.json").exists()]
+
+    def prune_stale(self) -> None:
+        """Remove entries written under a different contract fingerprint."""
+        for entry in self._entries():
+            try:
+                meta = json.loads((entry / "meta.json").read_text())
+            except OSError:
+                continue
+            if meta.get("contract") != self.fingerprint:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    @staticmethod
+    def _usage(entry: Path) -> Optional[tuple[float, int, Path]]:
+        try:
+            used = (entry / "meta.json").stat().st_mtime
+            return used, sum(f.stat().st_size for f in entry.iterdir()), entry
+        except OSError:
+            return None
+
+    def evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits max_bytes."""
+        entries = [u for u in map(self._usage, self._entries()) if u is not None]
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda t: t[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
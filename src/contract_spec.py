@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from typing import Any, Optional, Sequence
 
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
 
 UTC = "UTC"
 
@@ -21,15 +23,18 @@ class ColumnRule:
     default_if_null: Optional[Any] = None
     on_bad: str = "flag"  # "flag" | "drop" | "coerce_null" | "cap"
     notes: str = ""
+    storage: Optional[str] = None  # compact dtype of the validated column (see to_storage)
 
 
 # Contract columns (18 initial)
 COLUMNS: list[ColumnRule] = [
-    ColumnRule("VendorID", True, "int", False, allowed=[1, 2, 6, 7], on_bad="flag"),
+    ColumnRule(
+        "VendorID", True, "int", False, allowed=[1, 2, 6, 7], on_bad="flag", storage="int8"
+    ),
     ColumnRule("tpep_pickup_datetime", True, "timestamp", False, notes="UTC"),
     ColumnRule("tpep_dropoff_datetime", True, "timestamp", False, notes="UTC"),
-    ColumnRule("PULocationID", True, "int", False),
-    ColumnRule("DOLocationID", True, "int", False),
+    ColumnRule("PULocationID", True, "int", False, storage="int16"),
+    ColumnRule("DOLocationID", True, "int", False, storage="int16"),
     ColumnRule(
         "passenger_count",
         False,
@@ -38,9 +43,17 @@ COLUMNS: list[ColumnRule] = [
         min_val=0,
         max_val=8,
         on_bad="coerce_null",
+        storage="Int8",
     ),
+    # float64 kept: a model feature, and build_features returns it as stored
     ColumnRule(
-        "trip_distance", False, "float", True, min_val=0.0, max_val=200.0, on_bad="flag"
+        "trip_distance",
+        False,
+        "float",
+        True,
+        min_val=0.0,
+        max_val=200.0,
+        on_bad="flag",
     ),
     ColumnRule(
         "RatecodeID",
@@ -49,6 +62,7 @@ COLUMNS: list[ColumnRule] = [
         True,
         allowed=[1, 2, 3, 4, 5, 6, 99],
         default_if_null=99,
+        storage="Int8",
     ),
     ColumnRule(
         "store_and_fwd_flag",
@@ -57,16 +71,25 @@ COLUMNS: list[ColumnRule] = [
         True,
         allowed=["Y", "N"],
         default_if_null="N",
+        storage="category",
+    ),
+    ColumnRule(
+        "payment_type", False, "int", True, allowed=[0, 1, 2, 3, 4, 5, 6], storage="Int8"
+    ),
+    ColumnRule(
+        "fare_amount", False, "decimal", True, min_val=0.0, on_bad="coerce_null", storage="float32"
+    ),
+    ColumnRule(
+        "extra", False, "decimal", True, min_val=0.0, on_bad="coerce_null", storage="float32"
+    ),
+    ColumnRule(
+        "mta_tax", False, "decimal", True, min_val=0.0, on_bad="coerce_null", storage="float32"
     ),
-    ColumnRule("payment_type", False, "int", True, allowed=[0, 1, 2, 3, 4, 5, 6]),
     ColumnRule(
-        "fare_amount", False, "decimal", True, min_val=0.0, on_bad="coerce_null"
+        "tip_amount", False, "decimal", True, min_val=0.0, on_bad="coerce_null", storage="float32"
     ),
-    ColumnRule("extra", False, "decimal", True, min_val=0.0, on_bad="coerce_null"),
-    ColumnRule("mta_tax", False, "decimal", True, min_val=0.0, on_bad="coerce_null"),
-    ColumnRule("tip_amount", False, "decimal", True, min_val=0.0, on_bad="coerce_null"),
     ColumnRule(
-        "tolls_amount", False, "decimal", True, min_val=0.0, on_bad="coerce_null"
+        "tolls_amount", False, "decimal", True, min_val=0.0, on_bad="coerce_null", storage="float32"
     ),
     ColumnRule(
         "improvement_surcharge",
@@ -75,6 +98,7 @@ COLUMNS: list[ColumnRule] = [
         True,
         min_val=0.0,
         on_bad="coerce_null",
+        storage="float32",
     ),
     ColumnRule(
         "congestion_surcharge",
@@ -83,14 +107,60 @@ COLUMNS: list[ColumnRule] = [
         True,
         min_val=0.0,
         on_bad="coerce_null",
+        storage="float32",
     ),
+    # float64 kept: add_label thresholds it, float32 rounding could flip labels
     ColumnRule("total_amount", False, "decimal", True, min_val=0.0, on_bad="flag"),
 ]
 
 REQUIRED = {c.name for c in COLUMNS if c.required}
 
 
+# TLC timestamp layouts with a fixed-format fast path; checked against the
+# first non-null value, anything else goes through pandas' generic parser.
+_ISO_Z = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$")
+TLC_TIMESTAMP_FORMATS = [
+    (re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$"), "%Y-%m-%d %H:%M:%S"),
+    (re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}$"), "%Y-%m-%dT%H:%M:%S"),
+    (
+        re.compile(r"^\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2} [AP]M$"),
+        "%m/%d/%Y %I:%M:%S %p",
+    ),
+]
+
+
+def _parse_iso_z(ts: pd.Series) -> pd.Series:
+    # "...Z" is much cheaper to parse as a naive fixed format than via %z;
+    # rows without the Z suffix go through the %z format pandas would infer
+    has_z = ts.str.endswith("Z").fillna(False).astype(bool)
+    naive = pd.to_datetime(
+        ts.str.slice(0, -1), format="%Y-%m-%dT%H:%M:%S", errors="coerce"
+    )
+    out = naive.dt.tz_localize(UTC).where(has_z)
+    rest = ~has_z & ts.notna()
+    if rest.any():
+        out[rest] = pd.to_datetime(
+            ts[rest], format="%Y-%m-%dT%H:%M:%S%z", errors="coerce", utc=True
+        )
+    return out
+
+
 def to_utc(ts: pd.Series) -> pd.Series:
+    if is_datetime64_any_dtype(ts.dtype):
+        # already parsed (Parquet timestamps, validated frames): no re-parse
+        if ts.dt.tz is None:
+            return ts.dt.tz_localize(UTC)
+        return ts if str(ts.dt.tz) == UTC else ts.dt.tz_convert(UTC)
+
+    notna = ts.notna().to_numpy()
+    first = ts.iat[int(notna.argmax())] if notna.any() else None
+    if isinstance(first, str):
+        if _ISO_Z.match(first):
+            return _parse_iso_z(ts)
+        for pattern, fmt in TLC_TIMESTAMP_FORMATS:
+            if pattern.match(first):
+                return pd.to_datetime(ts, format=fmt, errors="coerce", utc=True)
+
     s = pd.to_datetime(ts, errors="coerce", utc=True)
     return s
 
@@ -109,6 +179,40 @@ def coerce_dtype(df: pd.DataFrame, col: ColumnRule) -> pd.Series:
     return s.astype("string")
 
 
+def to_storage(
+    s: pd.Series, storage: Optional[str], categories: Optional[Sequence[Any]] = None
+) -> pd.Series:
+    """
+    Cast a validated column to its compact storage dtype: "category" (fixed
+    `categories`), a float width, or an int width. Int columns holding nulls
+    get the nullable variant (int16 -> Int16); values that do not fit the
+    width leave the column as it is, never wrapped.
+    """
+    if storage is None or str(s.dtype) == storage:
+        return s
+    if storage == "category":
+        return s.astype(pd.CategoricalDtype(list(categories) if categories is not None else None))
+    target = np.dtype(storage.lower())
+    if target.kind == "f":
+        return s.astype(target)
+    info = np.iinfo(target)
+    lo, hi = s.min(), s.max()
+    if pd.notna(lo) and (lo < info.min or hi > info.max):
+        return s
+    nullable = storage[0].isupper() or s.hasnans
+    return s.astype(target.name.capitalize() if nullable else target)
+
+
+def compact_dtypes(df: pd.DataFrame, columns: Sequence[ColumnRule] = COLUMNS) -> pd.DataFrame:
+    """df with every contract column present cast to its ColumnRule.storage."""
+    casts = {
+        col.name: to_storage(df[col.name], col.storage, col.allowed)
+        for col in columns
+        if col.storage is not None and col.name in df.columns
+    }
+    return df.assign(**casts) if casts else df
+
+
 def apply_rule(series: pd.Series, rule: ColumnRule) -> tuple[pd.Series, pd.Series]:
     """Returns (possibly modified series, violation_mask)"""
     s = series.copy()
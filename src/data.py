@@ -1,40 +1,438 @@
 # TODO: implement loaders & schema checks based on the contract
 from __future__ import annotations
 
+import glob
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional, Set
+from typing import Iterator, Optional, Sequence, Set
 
 import pandas as pd
 
-from .validator import validate_dataframe
+from .cache import ValidatedCache
+from .contract_spec import COLUMNS, REQUIRED, to_utc
+from .dedup import INGEST_ROWID, KeySet, duplicate_keys, has_full_key
+from .features import FEATURE_SOURCE_COLUMNS
+from .profiling import collect, merge_timings, span
+from .validator import (ValidationReport, freshness, merge_reports,
+                        month_window, validate_chunks, validate_dataframe)
+
+# Rows per chunk in streaming mode (~a few hundred MB of raw TLC columns)
+DEFAULT_CHUNKSIZE = 500_000
+
+PICKUP = "tpep_pickup_datetime"
+MONTH_RE = re.compile(r"(\d{4}-\d{2})")
+
+# Contract columns each caller actually needs (column projection)
+CONTRACT_COLUMNS = [c.name for c in COLUMNS]
+_SCORING = REQUIRED | set(FEATURE_SOURCE_COLUMNS)
+COLUMN_SETS = {
+    "validation": CONTRACT_COLUMNS,
+    # plus the ingest row id (when the source has one) for the full dedup key
+    "training": [c for c in CONTRACT_COLUMNS if c in _SCORING | {"total_amount"}] + [INGEST_ROWID],
+    "scoring": [c for c in CONTRACT_COLUMNS if c in _SCORING],
+}
+
+
+def resolve_columns(columns: str | Sequence[str] | None) -> Optional[list[str]]:
+    """None -> all columns; "training" etc. -> COLUMN_SETS entry; else as given."""
+    if columns is None:
+        return None
+    if isinstance(columns, str):
+        if columns not in COLUMN_SETS:
+            raise ValueError(f"columns must be one of {sorted(COLUMN_SETS)}")
+        return list(COLUMN_SETS[columns])
+    return list(columns)
+
+
+def _usecols(cols: Optional[list[str]]):
+    # callable so contract columns missing from the file are simply skipped
+    if cols is None:
+        return None
+    wanted = set(cols)
+    return lambda c: c in wanted
+
+
+# ---- Parquet reader (projection, month pushdown, parallel row groups) ----
+
+
+def _pickup_bounds(pf, month: str):
+    """Arrow scalars for the month window, or None if pickup is not a timestamp."""
+    import pyarrow as pa
+
+    names = pf.schema_arrow.names
+    if PICKUP not in names:
+        return None
+    field_type = pf.schema_arrow.field(PICKUP).type
+    if not pa.types.is_timestamp(field_type):
+        return None
+    start, end = month_window(month)
+    if field_type.tz is None:  # naive TLC timestamps are UTC wall time
+        start, end = start.tz_convert(None), end.tz_convert(None)
+    return (
+        pa.scalar(start.to_pydatetime(), type=field_type),
+        pa.scalar(end.to_pydatetime(), type=field_type),
+    )
+
+
+def select_row_groups(pf, month: Optional[str]) -> list[int]:
+    """
+    Row groups whose pickup statistics overlap the month window.
+    Groups without statistics are always kept.
+    """
+    groups = list(range(pf.num_row_groups))
+    bounds = _pickup_bounds(pf, month) if month else None
+    if bounds is None:
+        return groups
+    lo, hi = (b.as_py() for b in bounds)
+    col = pf.schema_arrow.names.index(PICKUP)
+    selected = []
+    for i in groups:
+        stats = pf.metadata.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            selected.append(i)
+        elif not (stats.max < lo or stats.min >= hi):
+            selected.append(i)
+    return selected
+
+
+def _filter_table(table, bounds):
+    import pyarrow.compute as pc
+
+    lo, hi = bounds
+    pickup = table[PICKUP]
+    return table.filter(pc.and_(pc.greater_equal(pickup, lo), pc.less(pickup, hi)))
+
+
+def _in_month(raw: pd.DataFrame, month: str) -> pd.DataFrame:
+    """Generic month filter on the raw pickup column (CSV / string timestamps)."""
+    start, end = month_window(month)
+    pickup = to_utc(raw[PICKUP])
+    return raw.loc[((pickup >= start) & (pickup < end)).to_numpy()]
+
+
+def read_parquet(
+    path: str | Path,
+    columns: str | Sequence[str] | None = None,
+    month: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Read a Parquet month decoding only what is needed:
+    - only `columns` (missing ones are skipped, validation reports them),
+    - with `month`, only row groups overlapping the month window and only
+      rows whose pickup falls inside it,
+    - selected row groups decoded in parallel on a thread pool.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    cols = resolve_columns(columns)
+    if cols is not None:
+        cols = [c for c in cols if c in pf.schema_arrow.names]
+    bounds = _pickup_bounds(pf, month) if month else None
+    groups = select_row_groups(pf, month)
+
+    def read_group(i: int):
+        table = pq.ParquetFile(path).read_row_group(i, columns=cols, use_threads=False)
+        return _filter_table(table, bounds) if bounds is not None else table
+
+    if not groups:
+        table = pf.schema_arrow.empty_table()
+        if cols is not None:
+            table = table.select(cols)
+    else:
+        workers = max_workers or min(len(groups), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            table = pa.concat_tables(list(pool.map(read_group, groups)))
+
+    df = table.to_pandas()
+    if month and bounds is None and PICKUP in df.columns:
+        df = _in_month(df, month).reset_index(drop=True)
+    return df
+
 
 # ---- Public API (used by training & batch scoring) ----
 
 
+def iter_raw_chunks(
+    path: str | Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: str | Sequence[str] | None = None,
+    month: Optional[str] = None,  # keep only pickups inside this month
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield raw (unvalidated) frames of at most `chunksize` rows.
+    CSV is read with pandas' chunked reader, Parquet batch by batch within
+    row groups. The index keeps counting across chunks, so concatenating the
+    chunks gives the same frame as reading the whole file at once.
+    """
+    path = Path(path)
+    cols = resolve_columns(columns)
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(path)
+        if cols is not None:
+            cols = [c for c in cols if c in pf.schema_arrow.names]
+        bounds = _pickup_bounds(pf, month) if month else None
+        empty = pf.schema_arrow.empty_table()
+        empty = (empty.select(cols) if cols is not None else empty).to_pandas()
+        batches = pf.iter_batches(
+            batch_size=chunksize, row_groups=select_row_groups(pf, month), columns=cols
+        )
+        chunks = (
+            (_filter_table(b, bounds) if bounds is not None else b).to_pandas()
+            for b in batches
+        )
+        generic_filter = month is not None and bounds is None
+    else:
+        usecols = _usecols(cols)
+        empty = pd.read_csv(path, nrows=0, usecols=usecols)
+        chunks = pd.read_csv(path, chunksize=chunksize, usecols=usecols)
+        generic_filter = month is not None
+
+    offset = 0
+    yielded = False
+    for chunk in chunks:
+        if generic_filter and PICKUP in chunk.columns:
+            chunk = _in_month(chunk, month)
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yielded = True
+        yield chunk
+    if not yielded:
+        # keep a (possibly empty) frame flowing so callers still get a report
+        yield empty
+
+
+def iter_month(
+    path: str | Path,
+    month: Optional[str] = None,
+    taxi_zone_ids: Optional[Set[int]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: str | Sequence[str] | None = None,
+    filter_month: bool = False,
+    dedup: bool = False,
+    keys: Optional[KeySet] = None,  # share to dedup across months
+) -> Iterator[tuple[pd.DataFrame, ValidationReport]]:
+    """
+    Streaming counterpart of load_month: yields (clean_chunk, chunk_report)
+    with peak memory bounded by `chunksize`. Combine the chunk reports with
+    validator.merge_reports to get the month report.
+    """
+    raw = iter_raw_chunks(
+        path, chunksize, columns=columns, month=month if filter_month else None
+    )
+    yield from validate_chunks(
+        raw, month=month, taxi_zone_ids=taxi_zone_ids, dedup=dedup, keys=keys
+    )
+
+
 def load_month(
     path: str | Path,
     month: Optional[str] = None,  # "YYYY-MM" for freshness window
     taxi_zone_ids: Optional[Set[int]] = None,  # pass known IDs if you have them
-) -> pd.DataFrame:
+    chunksize: Optional[int] = None,  # validate in chunks to bound peak memory
+    return_report: bool = False,
+    columns: str | Sequence[str] | None = None,  # e.g. "training" or a list
+    filter_month: bool = False,  # drop pickups outside `month` before validating
+    max_workers: Optional[int] = None,  # Parquet row-group decode threads
+    cache: Optional[ValidatedCache] = None,  # reuse validated months on disk
+    dedup: bool = False,  # check repeated primary keys (validate_dataframe)
+) -> pd.DataFrame | tuple[pd.DataFrame, ValidationReport]:
     """
     Load one month of NYC Yellow Taxi data (CSV or Parquet),
     validate against the contract, and return a clean frame with
     duration + is_anomaly columns preserved.
+    With `chunksize`, the raw file is never held in memory at once; only the
+    clean chunks are concatenated. Pass return_report=True to also get the
+    (month-level) ValidationReport.
+    `columns` projects the read to what the caller needs (see COLUMN_SETS);
+    `filter_month` keeps only pickups inside `month` (pushed down to Parquet
+    row groups when the pickup column is a timestamp).
+    With `cache`, a month validated before with the same file contents,
+    contract and options is read back from disk instead.
+    With src.profiling enabled the report's stage_timings include the raw
+    read ("load.read") next to the validation steps.
+    `path` may also be a glob or a "{month}" template (see load_months); then
+    `month` selects one "YYYY-MM" or a "YYYY-MM:YYYY-MM" range (a glob
+    without `month` loads every match), the report is merged, and
+    `max_workers` is the number of month processes.
     """
+    if is_multi_month(path):
+        if month and ":" in month:
+            months = month_range(*month.split(":"))
+        else:
+            months = [month] if month else None
+        df, reports = load_months(
+            str(path),
+            months=months,
+            max_workers=max_workers,
+            taxi_zone_ids=taxi_zone_ids,
+            chunksize=chunksize,
+            columns=columns,
+            filter_month=filter_month,
+            cache=cache,
+            dedup=dedup,
+        )
+        return (df, merge_reports(reports.values())) if return_report else df
+
     path = Path(path)
-    if path.suffix.lower() == ".parquet":
-        raw = pd.read_parquet(path)
-    else:
-        raw = pd.read_csv(path)
+    window = month if filter_month else None
 
-    df, report = validate_dataframe(raw, month=month, taxi_zone_ids=taxi_zone_ids)
+    key = None
+    if cache is not None:
+        key = cache.key(
+            path,
+            month=month,
+            taxi_zone_ids=sorted(taxi_zone_ids) if taxi_zone_ids is not None else None,
+            columns=resolve_columns(columns),
+            filter_month=filter_month,
+            **({"dedup": True} if dedup else {}),  # default keeps existing keys
+        )
+        hit = cache.get(key)
+        if hit is not None:
+            return hit if return_report else hit[0]
 
-    # You can log/report here if desired; for now, keep simple:
-    # print("Validation:", report)
+    if chunksize:
+        frames, reports = [], []
+        for chunk, chunk_report in iter_month(
+            path, month, taxi_zone_ids, chunksize, columns, filter_month, dedup
+        ):
+            frames.append(chunk)
+            reports.append(chunk_report)
+        df = pd.concat(frames)
+        report = merge_reports(reports)
+    else:
+        with collect() as read_timings, span("load.read"):
+            if path.suffix.lower() == ".parquet":
+                if columns is None and window is None:
+                    raw = pd.read_parquet(path)
+                else:
+                    raw = read_parquet(path, columns, window, max_workers)
+            else:
+                raw = pd.read_csv(path, usecols=_usecols(resolve_columns(columns)))
+                if window is not None:
+                    raw = _in_month(raw, window).reset_index(drop=True)
+        df, report = validate_dataframe(
+            raw, month=month, taxi_zone_ids=taxi_zone_ids, dedup=dedup
+        )
+        report.stage_timings = merge_timings(read_timings, report.stage_timings)
+
+    if cache is not None:
+        cache.put(key, df, report)
 
+    if return_report:
+        return df, report
     return df
 
 
+def is_multi_month(path: str | Path) -> bool:
+    """True for a glob ("*", "?", "[") or a "{month}" path template."""
+    return any(ch in str(path) for ch in "*?[") or "{month}" in str(path)
+
+
+def month_range(first: str, last: str) -> list[str]:
+    """Inclusive list of "YYYY-MM" months, e.g. ("2025-01", "2025-03")."""
+    months = pd.period_range(first, last, freq="M")
+    return [str(m) for m in months]
+
+
+def resolve_month_paths(
+    pattern: str, months: Optional[Sequence[str]] = None
+) -> list[tuple[str, Optional[str]]]:
+    """
+    Expand a multi-month spec into (path, month) pairs.
+    - "data/yellow_{month}.parquet" + months -> one path per month;
+    - a glob -> matching files, month parsed from the file name (YYYY-MM),
+      optionally restricted to `months`.
+    """
+    if "{month}" in pattern:
+        if not months:
+            raise ValueError("a {month} template needs a month range")
+        return [(pattern.format(month=m), m) for m in months]
+
+    pairs = []
+    for path in sorted(glob.glob(pattern)):
+        found = MONTH_RE.search(Path(path).name)
+        month = found.group(1) if found else None
+        if months is None or month in months:
+            pairs.append((path, month))
+    if not pairs:
+        raise FileNotFoundError(f"No files match {pattern!r}")
+    return pairs
+
+
+def _load_one(path: str, month: Optional[str], kwargs: dict):
+    return load_month(path, month=month, return_report=True, **kwargs)
+
+
+def load_months(
+    pattern: str,
+    months: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+    **kwargs,
+) -> tuple[pd.DataFrame, dict[str, ValidationReport]]:
+    """
+    Load and validate several months in a process pool (one month per task)
+    and concatenate them in month order.
+    Returns (training frame, {month or file stem: ValidationReport}).
+    Extra keyword arguments are passed to load_month for every file.
+    With dedup=True the workers do not dedup; keys are checked here instead,
+    in month order over the whole load, as validate_dataframe would.
+    """
+    dedup = kwargs.pop("dedup", False)
+    pairs = resolve_month_paths(pattern, months)
+    workers = max_workers or min(len(pairs), os.cpu_count() or 1)
+
+    if workers == 1:
+        results = [_load_one(p, m, kwargs) for p, m in pairs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_load_one, p, m, kwargs) for p, m in pairs]
+            results = [f.result() for f in futures]
+
+    keys = KeySet() if dedup else None
+    frames, reports = [], {}
+    for (path, month), (frame, report) in zip(pairs, results):
+        if keys is not None:
+            frame, report = _dedup_month(frame, report, month, keys)
+        frames.append(frame)
+        reports[month or Path(path).stem] = report
+    df = pd.concat(frames, ignore_index=True)
+    return df, reports
+
+
+def _dedup_month(
+    df: pd.DataFrame, report: ValidationReport, month: Optional[str], keys: KeySet
+) -> tuple[pd.DataFrame, ValidationReport]:
+    """validate_dataframe's dedup step, applied to a validated month."""
+    duplicate = duplicate_keys(df, keys)
+    count = int(duplicate.sum())
+    if not count:
+        return df, report
+    by_rule = dict(report.anomalies_by_rule)
+    by_rule["duplicate_key"] = count
+    if has_full_key(df):
+        df = df.loc[~duplicate]
+    else:
+        df = df.assign(is_anomaly=df["is_anomaly"].where(~duplicate, 1))
+    freshness_ok, latest_dropoff = freshness(df, month)
+    return df, replace(
+        report,
+        rows=len(df),
+        anomaly_rate=float(df["is_anomaly"].mean()) if len(df) else 0.0,
+        anomalous_rows=int(df["is_anomaly"].sum()),
+        anomalies_by_rule=by_rule,
+        freshness_ok=freshness_ok,
+        latest_dropoff=latest_dropoff,
+    )
+
+
 def add_label(df: pd.DataFrame) -> pd.DataFrame:
     """
     Create a simple classification target suitable for Day-5 baseline.
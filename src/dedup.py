@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+# Best-effort primary key from the data contract; _ingest_rowid is only
+# used when the source carries it
+INGEST_ROWID = "_ingest_rowid"
+PRIMARY_KEY = ["VendorID", "tpep_pickup_datetime", "PULocationID", INGEST_ROWID]
+
+
+def key_hashes(df: pd.DataFrame, columns: Sequence[str] = PRIMARY_KEY) -> np.ndarray:
+    """
+    One uint64 per row over the key columns present in df. Ints and
+    timestamps are normalized (int64, UTC microseconds) first, so the same
+    trip hashes the same whatever width or unit the frame stores it in.
+    """
+    parts = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if isinstance(s.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_dtype(s.dtype):
+            parts[col] = s.dt.as_unit("us").array.asi8
+        elif pd.api.types.is_integer_dtype(s.dtype):
+            parts[col] = s.to_numpy(dtype=np.int64, na_value=-1)
+        else:
+            parts[col] = s
+    if not parts:
+        raise ValueError(f"none of the key columns {list(columns)} are present")
+    return pd.util.hash_pandas_object(pd.DataFrame(parts, copy=False), index=False).to_numpy()
+
+
+class KeySet:
+    """
+    Set of 64-bit key hashes seen so far, held as a few sorted uint64 runs
+    (8 bytes per unique key, no per-row state). add() returns which rows
+    repeat a key, either earlier in the same batch or from a previous one.
+    Runs are merged like a binary counter, so an insert costs amortized
+    O(log n) merges and a lookup one searchsorted per run.
+    """
+
+    def __init__(self):
+        self._runs: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(r) for r in self._runs)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(r.nbytes for r in self._runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            pos = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+            seen |= run[pos] == hashes
+        return seen
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """Record hashes; True where a row duplicates an already seen key."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique, first = np.unique(hashes, return_index=True)
+        duplicate = np.ones(len(hashes), dtype=bool)
+        duplicate[first] = False
+        if self._runs and len(unique):
+            seen = self.contains(unique)
+            duplicate[first[seen]] = True
+            unique = unique[~seen]
+        if len(unique):
+            self._insert(unique)
+        return duplicate
+
+    def _insert(self, run: np.ndarray) -> None:
+        while self._runs and len(self._runs[-1]) <= len(run):
+            run = _merge_disjoint(self._runs.pop(), run)
+        self._runs.append(run)
+
+
+def _merge_disjoint(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Merge two sorted arrays without common values in O(len(a) + len(b))."""
+    out = np.empty(len(a) + len(b), dtype=a.dtype)
+    at = np.searchsorted(a, b) + np.arange(len(b))
+    from_b = np.zeros(len(out), dtype=bool)
+    from_b[at] = True
+    out[at] = b
+    out[~from_b] = a
+    return out
+
+
+def has_full_key(df: pd.DataFrame, columns: Sequence[str] = PRIMARY_KEY) -> bool:
+    """
+    True when df carries every key column. Only then does a repeated key
+    mean a re-delivered row: without _ingest_rowid two cabs of one vendor
+    picking up in the same zone and second share a key.
+    """
+    return all(col in df.columns for col in columns)
+
+
+def duplicate_keys(df: pd.DataFrame, keys: KeySet, columns: Sequence[str] = PRIMARY_KEY) -> np.ndarray:
+    """True where a row repeats a key seen before (in `keys` or earlier in df); records the rest."""
+    if df.empty:
+        return np.zeros(0, dtype=bool)
+    return keys.add(key_hashes(df, columns))
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from src.feature_vector import FEATURE_NAMES
+
+FORMAT_VERSION = 1
+MAX_BINS = 10
+# Interior edges of the fixed score bins: 20 bins of width 0.05 on [0, 1]
+SCORE_EDGES = np.linspace(0.0, 1.0, 21)[1:-1]
+REFERENCE_SAMPLE = 100_000  # rows used to place the feature bin edges
+
+
+def feature_edges(values: np.ndarray, max_bins: int = MAX_BINS) -> np.ndarray:
+    """
+    Interior bin edges for one feature: midpoints between the values of a
+    discrete feature (one-hots, hour, ...), training quantiles otherwise.
+    """
+    distinct = np.unique(values)
+    if len(distinct) <= max_bins:
+        return (distinct[1:] + distinct[:-1]) / 2.0
+    qs = np.quantile(values, np.linspace(0.0, 1.0, max_bins + 1)[1:-1])
+    return np.unique(qs)
+
+
+def js_divergence(p: np.ndarray, q: np.ndarray, eps: float = 1e-9) -> np.ndarray:
+    """Jensen-Shannon divergence (base 2, in [0, 1]) between count rows."""
+    p = np.asarray(p, dtype=np.float64) + eps
+    q = np.asarray(q, dtype=np.float64) + eps
+    p /= p.sum(axis=-1, keepdims=True)
+    q /= q.sum(axis=-1, keepdims=True)
+    m = (p + q) / 2.0
+    return 0.5 * (p * np.log2(p / m)).sum(axis=-1) + 0.5 * (q * np.log2(q / m)).sum(axis=-1)
+
+
+@dataclass(frozen=True)
+class DriftReference:
+    """
+    Fixed-bin training histograms: per feature (FEATURE_NAMES order) and for
+    the positive-class score. edges is padded with +inf to MAX_BINS - 1
+    columns so one row is binned with a single broadcast comparison.
+    """
+
+    feature_names: list[str]
+    edges: np.ndarray  # (n_features, MAX_BINS - 1)
+    counts: np.ndarray  # (n_features, MAX_BINS)
+    score_counts: np.ndarray  # (len(SCORE_EDGES) + 1,)
+
+    def bin_row(self, x: np.ndarray) -> np.ndarray:
+        """Bin index of every feature of one vector."""
+        return (x[:, None] >= self.edges).sum(axis=1)
+
+    def save(self, path: str | Path) -> None:
+        payload = {
+            "format_version": FORMAT_VERSION,
+            "feature_names": self.feature_names,
+            "edges": [e[np.isfinite(e)].tolist() for e in self.edges],
+            "counts": self.counts.tolist(),
+            "score_edges": SCORE_EDGES.tolist(),
+            "score_counts": self.score_counts.tolist(),
+        }
+        Path(path).write_text(json.dumps(payload))
+
+
+def _padded(edges: list) -> np.ndarray:
+    out = np.full((len(edges), MAX_BINS - 1), np.inf)
+    for j, e in enumerate(edges):
+        out[j, : len(e)] = e
+    return out
+
+
+def build_reference(X: np.ndarray, scores: np.ndarray, seed: int = 0) -> DriftReference:
+    """Reference histograms from held-out rows (FEATURE_NAMES columns first) and their scores."""
+    X = np.asarray(X)[:, : len(FEATURE_NAMES)]
+    sample = X
+    if len(X) > REFERENCE_SAMPLE:
+        sample = X[np.random.default_rng(seed).choice(len(X), REFERENCE_SAMPLE, replace=False)]
+    edges = _padded([feature_edges(sample[:, j]) for j in range(X.shape[1])])
+    counts = np.zeros((X.shape[1], MAX_BINS), dtype=np.int64)
+    for j in range(X.shape[1]):
+        bins = np.searchsorted(edges[j], X[:, j], side="right")
+        counts[j] = np.bincount(bins, minlength=MAX_BINS)
+    score_bins = np.searchsorted(SCORE_EDGES, scores, side="right")
+    return DriftReference(
+        feature_names=list(FEATURE_NAMES),
+        edges=edges,
+        counts=counts,
+        score_counts=np.bincount(score_bins, minlength=len(SCORE_EDGES) + 1).astype(np.int64),
+    )
+
+
+def load_reference(path: str | Path) -> DriftReference:
+    payload = json.loads(Path(path).read_text())
+    if payload["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"{path} has format {payload['format_version']}, expected {FORMAT_VERSION}")
+    return DriftReference(
+        feature_names=payload["feature_names"],
+        edges=_padded(payload["edges"]),
+        counts=np.asarray(payload["counts"], dtype=np.int64),
+        score_counts=np.asarray(payload["score_counts"], dtype=np.int64),
+    )
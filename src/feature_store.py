@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .cache import ValidatedCache, contract_fingerprint, file_digest
+from .data import (PICKUP, add_label, is_multi_month, load_month, month_range,
+                   resolve_month_paths)
+from .features import FEATURE_NAMES, build_feature_matrix
+from .validator import ValidationReport
+
+# Bump when build_features changes without a FEATURE_NAMES change
+# (2: row ids moved to a per-day sidecar)
+FEATURE_SCHEMA_VERSION = 2
+MANIFEST = "manifest.json"
+# Stored next to the features: source row id, pickup time, flags and label
+KEY_COLUMNS = ["row", PICKUP, "is_anomaly", "HIGH_TOTAL"]
+# Source row ids are positional, so a backfill that inserts or removes rows
+# shifts them for every later day. They live in a small per-day sidecar
+# that can be rewritten without touching the feature partition.
+ROWS_FILE = "rows.parquet"
+
+
+def feature_schema_fingerprint() -> str:
+    """Hash of FEATURE_NAMES, FEATURE_SCHEMA_VERSION and the data contract."""
+    payload = json.dumps(
+        {
+            "version": FEATURE_SCHEMA_VERSION,
+            "features": list(FEATURE_NAMES),
+            "contract": contract_fingerprint(),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _partition(root: Path, key: str, day: str) -> Path:
+    return root / f"month={key}" / f"day={day}" / "part.parquet"
+
+
+def _canonical(df: pd.DataFrame) -> tuple[pd.DataFrame, str]:
+    """
+    df's rows in a canonical order (by per-row content hash) and a hash of
+    its content: columns and values, not the positional row ids or the
+    order the rows arrived in.
+    """
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    order = np.argsort(rows, kind="stable")
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(list(df.columns)).encode())
+    h.update(rows[order].tobytes())
+    return df.iloc[order], h.hexdigest()
+
+
+def _ids_hash(ids: np.ndarray) -> str:
+    return hashlib.blake2b(np.ascontiguousarray(ids, dtype=np.int64).tobytes(), digest_size=16).hexdigest()
+
+
+def load_manifest(root: str | Path) -> dict:
+    path = Path(root) / MANIFEST
+    if not path.exists():
+        return {"schema": None, "schema_version": None, "sources": {}}
+    return json.loads(path.read_text())
+
+
+def _write_manifest(root: Path, manifest: dict) -> None:
+    tmp = root / f".{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, root / MANIFEST)
+
+
+def _write_partition(frame: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _write_rows(ids: np.ndarray, partition: Path) -> None:
+    _write_partition(pd.DataFrame({"row": ids}), partition.with_name(ROWS_FILE))
+
+
+def _feature_frame(df: pd.DataFrame) -> pd.DataFrame:
+    labeled = add_label(df)
+    X = build_feature_matrix(labeled)
+    keys = pd.DataFrame(
+        {
+            "row": labeled.index.to_numpy(),
+            PICKUP: labeled[PICKUP].to_numpy(),
+            "is_anomaly": labeled["is_anomaly"].to_numpy(),
+            "HIGH_TOTAL": labeled["HIGH_TOTAL"].to_numpy(),
+        }
+    )
+    return pd.concat([keys, pd.DataFrame(X, columns=FEATURE_NAMES)], axis=1)
+
+
+def materialize(
+    sources: Sequence[tuple[str | Path, Optional[str]]],
+    root: str | Path = "features",
+    chunksize: Optional[int] = None,
+    filter_month: bool = False,
+    cache: Optional[ValidatedCache] = None,
+    force: bool = False,
+) -> dict:
+    """
+    Write build_features output for (path, month) sources to
+    root/month=<month>/day=<YYYY-MM-DD>/part.parquet and record in
+    root/manifest.json each source's file digest, validation report and a
+    hash of every day's validated input rows.
+    A source whose file digest is unchanged is skipped. A changed source
+    (a backfill) is revalidated, but only the days whose input hash changed
+    are featurized and rewritten; days that vanished are removed. The hash
+    covers the day's rows as a set, so rows inserted or removed on other
+    days only refresh this day's row-id sidecar. A new feature schema
+    invalidates the whole store.
+    Returns a summary of what was written, skipped and removed.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(root)
+    schema = feature_schema_fingerprint()
+    if manifest["schema"] != schema:
+        for stale in root.glob("month=*"):
+            shutil.rmtree(stale, ignore_errors=True)
+        manifest = {"schema": schema, "schema_version": FEATURE_SCHEMA_VERSION, "sources": {}}
+
+    summary = {
+        "sources_skipped": [],
+        "days_written": [],
+        "days_unchanged": 0,
+        "days_reindexed": [],
+        "days_removed": [],
+    }
+    for path, month in sources:
+        key = month or Path(path).stem
+        digest = file_digest(path)
+        entry = manifest["sources"].get(key)
+        if entry and entry["digest"] == digest and not force:
+            summary["sources_skipped"].append(key)
+            continue
+
+        df, report = load_month(
+            path,
+            month=month,
+            chunksize=chunksize,
+            return_report=True,
+            columns="training",
+            filter_month=filter_month and month is not None,
+            cache=cache,
+        )
+        old_days = (entry or {}).get("days", {})
+        days = {}
+        for day, rows in df.groupby(df[PICKUP].dt.strftime("%Y-%m-%d")).indices.items():
+            part, input_hash = _canonical(df.iloc[rows])
+            ids = part.index.to_numpy()
+            days[day] = {"input_hash": input_hash, "rows_hash": _ids_hash(ids), "rows": len(part)}
+            old = old_days.get(day, {})
+            target = _partition(root, key, day)
+            if not force and old.get("input_hash") == input_hash and target.exists():
+                if old.get("rows_hash") == days[day]["rows_hash"]:
+                    summary["days_unchanged"] += 1
+                else:
+                    _write_rows(ids, target)
+                    summary["days_reindexed"].append(f"{key}/{day}")
+                continue
+            _write_partition(_feature_frame(part).drop(columns="row"), target)
+            _write_rows(ids, target)
+            summary["days_written"].append(f"{key}/{day}")
+        for day in sorted(set(old_days) - set(days)):
+            shutil.rmtree(_partition(root, key, day).parent, ignore_errors=True)
+            summary["days_removed"].append(f"{key}/{day}")
+
+        manifest["sources"][key] = {
+            "path": str(path),
+            "digest": digest,
+            "month": month,
+            "report": asdict(report),
+            "days": days,
+        }
+        # after every source, so an interrupted run keeps finished months
+        _write_manifest(root, manifest)
+    _write_manifest(root, manifest)
+    return summary
+
+
+def read_features(
+    root: str | Path = "features", months: Optional[Sequence[str]] = None
+) -> tuple[pd.DataFrame, dict[str, ValidationReport]]:
+    """
+    Materialized features (KEY_COLUMNS + FEATURE_NAMES) for the given
+    month keys (all by default) in month/day order, plus the validation
+    report recorded for each month. Raises if the store was written under
+    another feature schema.
+    """
+    root = Path(root)
+    manifest = load_manifest(root)
+    if manifest["schema"] != feature_schema_fingerprint():
+        raise ValueError(
+            f"{root} was materialized under another feature schema "
+            f"({manifest['schema']}); rerun src.feature_store"
+        )
+    keys = sorted(manifest["sources"]) if months is None else list(months)
+    missing = [k for k in keys if k not in manifest["sources"]]
+    if missing:
+        raise KeyError(f"months not materialized in {root}: {missing}")
+
+    frames, reports = [], {}
+    for key in keys:
+        entry = manifest["sources"][key]
+        reports[key] = ValidationReport(**entry["report"])
+        for day in sorted(entry["days"]):
+            target = _partition(root, key, day)
+            ids = pd.read_parquet(target.with_name(ROWS_FILE))["row"].to_numpy()
+            frames.append(pd.read_parquet(target).assign(row=ids)[KEY_COLUMNS + list(FEATURE_NAMES)])
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLUMNS + list(FEATURE_NAMES)), reports
+    return pd.concat(frames, ignore_index=True), reports
+
+
+def features_xy(frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """Feature matrix (FEATURE_NAMES order) and label from read_features output."""
+    X = np.ascontiguousarray(frame[list(FEATURE_NAMES)].to_numpy(dtype=np.float32))
+    return X, frame["HIGH_TOTAL"].astype(int).to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Materialize features to month/day-partitioned Parquet"
+    )
+    parser.add_argument(
+        "--data",
+        required=True,
+        help="CSV/Parquet month file, a glob, or a template with {month}",
+    )
+    parser.add_argument("--month", help="YYYY-MM for a single file")
+    parser.add_argument("--months", help="Month range FIRST:LAST for globs / templates")
+    parser.add_argument("--out", default="features", help="Feature store directory")
+    parser.add_argument(
+        "--filter-month",
+        action="store_true",
+        help="Drop pickups outside each month before validating",
+    )
+    parser.add_argument("--chunksize", type=int, default=None, help="Validate in chunks")
+    parser.add_argument(
+        "--force", action="store_true", help="Rewrite every partition of the sources"
+    )
+    args = parser.parse_args()
+
+    if is_multi_month(args.data):
+        months = month_range(*args.months.split(":")) if args.months else None
+        sources = resolve_month_paths(args.data, months)
+    else:
+        sources = [(args.data, args.month)]
+    summary = materialize(
+        sources,
+        args.out,
+        chunksize=args.chunksize,
+        filter_month=args.filter_month,
+        force=args.force,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import numpy as np
+
+# Categorical “vocabulary” is fixed to avoid train/serve skew
+VENDOR_VOCAB = [1, 2, 6, 7]
+RATECODE_VOCAB = [1, 2, 3, 4, 5, 6, 99]
+PAYMENT_VOCAB = [0, 1, 2, 3, 4, 5, 6]
+
+# Clipping shared by build_features and the single-record path
+TRIP_DISTANCE_RANGE = (0.0, 200.0)
+PASSENGER_RANGE = (0, 8)
+
+# Raw contract columns read by build_features (used for column projection)
+FEATURE_SOURCE_COLUMNS = [
+    "VendorID",
+    "tpep_pickup_datetime",
+    "PULocationID",
+    "DOLocationID",
+    "passenger_count",
+    "trip_distance",
+    "RatecodeID",
+    "payment_type",
+]
+
+
+# (source column, vocab, prefix) for the one-hot blocks, in schema order
+ONE_HOT_BLOCKS = [
+    ("VendorID", VENDOR_VOCAB, "vendor"),
+    ("RatecodeID", RATECODE_VOCAB, "rate"),
+    ("payment_type", PAYMENT_VOCAB, "pay"),
+]
+NUMERIC_FEATURES = [
+    "trip_distance",
+    "passenger_count",
+    "pickup_hour",
+    "pickup_dow",
+    "PU_id",
+    "DO_id",
+]
+# Column order recorded in models/*_feature_schema.json
+FEATURE_NAMES = NUMERIC_FEATURES + [
+    f"{prefix}_{v}" for _, vocab, prefix in ONE_HOT_BLOCKS for v in vocab
+]
+
+# (source column, {code: feature index}) for the single-record path
+_ROW_ONE_HOT = [
+    (column, {v: FEATURE_NAMES.index(f"{prefix}_{v}") for v in vocab})
+    for column, vocab, prefix in ONE_HOT_BLOCKS
+]
+
+
+# ---- Single-record path (online serving, no pandas) ----
+
+
+def _pickup_utc(value: Any) -> datetime:
+    if isinstance(value, str):
+        try:
+            ts = datetime.fromisoformat(value)
+        except ValueError:
+            ts = datetime.strptime(value, "%m/%d/%Y %I:%M:%S %p")
+    elif isinstance(value, datetime):
+        ts = value
+    else:
+        raise ValueError(f"tpep_pickup_datetime must be a timestamp, got {value!r}")
+    if ts.tzinfo is None:  # naive TLC timestamps are UTC
+        return ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+def _number(value: Any, default: float) -> float:
+    if value is None:
+        return default
+    value = float(value)
+    return default if math.isnan(value) else value
+
+
+def _code(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else None
+
+
+def build_feature_vector(
+    record: Any, out: Optional[np.ndarray] = None, dtype=np.float32
+) -> np.ndarray:
+    """
+    One trip (plain dict or Pydantic model) -> feature vector in
+    FEATURE_NAMES order, without pandas. Uses the same vocabularies and
+    clipping as build_features, so a row of build_feature_matrix and this
+    vector are identical. Pass `out` to fill a preallocated vector.
+    """
+    if isinstance(record, Mapping):
+        get = record.get
+    else:
+        def get(key, default=None):
+            return getattr(record, key, default)
+
+    if out is None:
+        out = np.zeros(len(FEATURE_NAMES), dtype=dtype)
+    else:
+        out[:] = 0
+
+    lo, hi = TRIP_DISTANCE_RANGE
+    out[0] = min(max(_number(get("trip_distance"), 0.0), lo), hi)
+    lo, hi = PASSENGER_RANGE
+    out[1] = min(max(int(_number(get("passenger_count"), 0)), lo), hi)
+
+    pickup = _pickup_utc(get("tpep_pickup_datetime"))
+    out[2] = pickup.hour
+    out[3] = pickup.weekday()  # 0=Mon
+    out[4] = int(get("PULocationID"))
+    out[5] = int(get("DOLocationID"))
+
+    for column, index in _ROW_ONE_HOT:
+        j = index.get(_code(get(column)))
+        if j is not None:
+            out[j] = 1
+    return out
@@ -4,58 +4,190 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-# Categorical “vocabulary” is fixed to avoid train/serve skew
-VENDOR_VOCAB = [1, 2, 6, 7]
-RATECODE_VOCAB = [1, 2, 3, 4, 5, 6, 99]
-PAYMENT_VOCAB = [0, 1, 2, 3, 4, 5, 6]
+from .contract_spec import to_utc
+# Vocabularies, schema order and the pandas-free single-record path live in
+# feature_vector so the API can serve without importing pandas
+from .feature_vector import (FEATURE_NAMES, FEATURE_SOURCE_COLUMNS,  # noqa: F401
+                             NUMERIC_FEATURES, ONE_HOT_BLOCKS, PASSENGER_RANGE,
+                             PAYMENT_VOCAB, RATECODE_VOCAB, TRIP_DISTANCE_RANGE,
+                             VENDOR_VOCAB, build_feature_vector)
+from .profiling import span
+from .zone_stats import ZONE_FEATURES, zone_features
+
+
+def _vocab_lut(vocab: list[int]) -> np.ndarray:
+    """Lookup table code -> position in vocab (-1 = not in vocab)."""
+    lut = np.full(max(vocab) + 1, -1, dtype=np.intp)
+    lut[vocab] = np.arange(len(vocab))
+    return lut
+
+
+_LUTS = {prefix: _vocab_lut(vocab) for _, vocab, prefix in ONE_HOT_BLOCKS}
+
+# build_features returns these in the wide dtypes whatever the frame's
+# storage (contract_spec ColumnRule.storage), so compact frames give the
+# same DataFrame
+_WIDE_NUMERIC = {
+    "trip_distance": np.float64,
+    "passenger_count": np.int64,
+    "pickup_hour": np.int64,
+    "pickup_dow": np.int64,
+    "PU_id": np.int64,
+    "DO_id": np.int64,
+}
+
+
+def _codes(series: pd.Series) -> np.ndarray:
+    # ints of any width (nullable or not) -> int64 with -1 for NA (never in a vocab)
+    if not pd.api.types.is_integer_dtype(series.dtype):
+        series = series.astype("Int64")
+    return series.to_numpy(dtype=np.int64, na_value=-1)
+
+
+def _values(series: pd.Series, na_value=None) -> np.ndarray:
+    """NumPy values in the column's own width (compact storage stays compact)."""
+    dtype = getattr(series.dtype, "numpy_dtype", series.dtype)
+    if na_value is None:
+        return series.to_numpy(dtype=dtype)
+    return series.to_numpy(dtype=dtype, na_value=na_value)
+
+
+def _vocab_positions(codes: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """Position of each code in the vocab, -1 for unknown / NA."""
+    in_range = (codes >= 0) & (codes < len(lut))
+    return np.where(in_range, lut[np.where(in_range, codes, 0)], -1)
 
 
 def _one_hot(series: pd.Series, vocab: list[int], prefix: str) -> pd.DataFrame:
-    # normalize unknowns to a reserved bucket if needed
-    s = series.copy()
-    s = s.where(s.isin(vocab), np.nan)  # unknowns -> NaN (drop columns later)
-    dummies = pd.get_dummies(s, prefix=prefix, dtype=int)
-    # ensure all expected columns exist (even if absent in this batch)
-    for v in vocab:
-        col = f"{prefix}_{v}"
-        if col not in dummies.columns:
-            dummies[col] = 0
-    # return in vocab order (stable column order)
-    return dummies[[f"{prefix}_{v}" for v in vocab]]
-
-
-def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    # unknowns / NA get an all-zero row; columns always in vocab order
+    pos = _vocab_positions(_codes(series), _LUTS.get(prefix, _vocab_lut(vocab)))
+    out = np.zeros((len(series), len(vocab)), dtype=int)
+    hit = np.flatnonzero(pos >= 0)
+    out[hit, pos[hit]] = 1
+    return pd.DataFrame(
+        out, index=series.index, columns=[f"{prefix}_{v}" for v in vocab]
+    )
+
+
+def _numeric_columns(df: pd.DataFrame) -> list[np.ndarray]:
+    """NUMERIC_FEATURES as arrays, with the same cleaning as build_features."""
+    # read in the validated storage dtypes; no upcast before the matrix write.
+    # Nulls become 0 here (build_features' fillna), so neither path emits NaN
+    pickup = to_utc(df["tpep_pickup_datetime"])  # no-op once validated
+    distance = df["trip_distance"]
+    if not pd.api.types.is_float_dtype(distance.dtype):
+        distance = distance.astype(float)
+    return [
+        np.clip(_values(distance, na_value=0.0), *TRIP_DISTANCE_RANGE),
+        np.clip(_values(df["passenger_count"], na_value=0), *PASSENGER_RANGE),
+        _values(pickup.dt.hour, na_value=0),
+        _values(pickup.dt.dayofweek, na_value=0),  # 0=Mon
+        _values(df["PULocationID"], na_value=0),
+        _values(df["DOLocationID"], na_value=0),
+    ]
+
+
+def build_feature_matrix(
+    df: pd.DataFrame, dtype=np.float32, sparse: bool = False, zone_table=None
+):
+    """
+    Same features as build_features, written straight into one preallocated
+    C-contiguous matrix (FEATURE_NAMES order) instead of a DataFrame.
+    One-hot blocks are filled through the vocab lookup tables.
+    sparse=True returns a scipy.sparse CSR matrix built without a dense copy.
+    With a zone_table (src.zone_stats) the ZONE_FEATURES columns are appended.
+    `dtype` must be a float type: zone IDs and distances do not fit small ints.
+    """
+    if not np.issubdtype(np.dtype(dtype), np.floating):
+        raise ValueError(f"feature matrix dtype must be floating, got {np.dtype(dtype)}")
+    n = len(df)
+    with span("features.numeric"):
+        numeric = _numeric_columns(df)
+    width = len(FEATURE_NAMES)
+    zones = None
+    if zone_table is not None:
+        with span("features.zones"):
+            zones = zone_features(zone_table, numeric[4], numeric[5])
+        width += len(ZONE_FEATURES)
+    hot_rows, hot_cols = [], []
+    offset = len(NUMERIC_FEATURES)
+    with span("features.one_hot"):
+        for column, vocab, prefix in ONE_HOT_BLOCKS:
+            pos = _vocab_positions(_codes(df[column]), _LUTS[prefix])
+            rows = np.flatnonzero(pos >= 0)
+            hot_rows.append(rows)
+            hot_cols.append(offset + pos[rows])
+            offset += len(vocab)
+
+    if sparse:
+        with span("features.assemble"):
+            return _assemble_sparse(n, width, numeric, hot_rows, hot_cols, zones, dtype)
+
+    with span("features.assemble"):
+        out = np.zeros((n, width), dtype=dtype)
+        for j, col in enumerate(numeric):
+            out[:, j] = col
+        if zones is not None:
+            out[:, len(FEATURE_NAMES):] = zones
+        flat = out.reshape(-1)  # view; flat indices beat 2-D fancy indexing
+        for rows, cols in zip(hot_rows, hot_cols):
+            flat[rows * out.shape[1] + cols] = 1
+    return out
+
+
+def _assemble_sparse(n, width, numeric, hot_rows, hot_cols, zones, dtype):
+    from scipy.sparse import coo_matrix
+
+    rows, cols, data = list(hot_rows), list(hot_cols), []
+    for j, col in enumerate(numeric):
+        nz = np.flatnonzero(col)
+        rows.append(nz)
+        cols.append(np.full(len(nz), j))
+        data.append(col[nz])
+    data = [np.ones(len(r)) for r in hot_rows] + data
+    if zones is not None:
+        r, c = np.nonzero(zones)
+        rows.append(r)
+        cols.append(len(FEATURE_NAMES) + c)
+        data.append(zones[r, c])
+    return coo_matrix(
+        (
+            np.concatenate(data).astype(dtype),
+            (np.concatenate(rows), np.concatenate(cols)),
+        ),
+        shape=(n, width),
+    ).tocsr()
+
+
+def build_features(df: pd.DataFrame, zone_table=None) -> pd.DataFrame:
     """
     Transform validated trips into serving-safe numeric features.
     NOTE: We purposely avoid any columns that won't exist at inference time.
     Allowed source columns include pickup time, PU/DO zones, vendor/ratecode/payment,
     passenger_count, trip_distance. We DO NOT use total_amount or tip for features.
+    Pass a zone_table (src.zone_stats) to append the zone-pair aggregates.
     """
-    x = pd.DataFrame(index=df.index)
-
-    # Basic numerics
-    x["trip_distance"] = (
-        df["trip_distance"].fillna(0.0).astype(float).clip(lower=0.0, upper=200.0)
-    )
-    x["passenger_count"] = (
-        df["passenger_count"].fillna(0).astype(int).clip(lower=0, upper=8)
-    )
-
-    # Time features from pickup time (available at request time)
-    pickup = pd.to_datetime(df["tpep_pickup_datetime"], utc=True, errors="coerce")
-    x["pickup_hour"] = pickup.dt.hour.astype(int)
-    x["pickup_dow"] = pickup.dt.dayofweek.astype(int)  # 0=Mon
-
-    # Zone features (IDs are stable ints; we keep as is)
-    x["PU_id"] = df["PULocationID"].astype(int)
-    x["DO_id"] = df["DOLocationID"].astype(int)
+    # Basic numerics, time features from pickup time (available at request
+    # time) and zone IDs (stable ints; we keep as is)
+    with span("features.numeric"):
+        numeric = zip(NUMERIC_FEATURES, _numeric_columns(df))
+        x = pd.DataFrame(
+            {name: col.astype(_WIDE_NUMERIC.get(name, col.dtype), copy=False) for name, col in numeric},
+            index=df.index,
+        )
 
     # Categorical encodings (one-hots with fixed vocab)
-    x_vendor = _one_hot(df["VendorID"].astype("Int64"), VENDOR_VOCAB, "vendor")
-    x_rate = _one_hot(df["RatecodeID"].astype("Int64"), RATECODE_VOCAB, "rate")
-    x_payment = _one_hot(df["payment_type"].astype("Int64"), PAYMENT_VOCAB, "pay")
+    with span("features.one_hot"):
+        x_vendor = _one_hot(df["VendorID"], VENDOR_VOCAB, "vendor")
+        x_rate = _one_hot(df["RatecodeID"], RATECODE_VOCAB, "rate")
+        x_payment = _one_hot(df["payment_type"], PAYMENT_VOCAB, "pay")
 
-    x = pd.concat([x, x_vendor, x_rate, x_payment], axis=1)
+    with span("features.assemble"):
+        x = pd.concat([x, x_vendor, x_rate, x_payment], axis=1)
+    if zone_table is not None:
+        with span("features.zones"):
+            zones = zone_features(zone_table, x["PU_id"].to_numpy(), x["DO_id"].to_numpy())
+            x = pd.concat([x, pd.DataFrame(zones, index=x.index, columns=ZONE_FEATURES)], axis=1)
 
     # Guardrail: no NaNs
     x = x.fillna(0)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARRAYS = ("feature", "threshold", "right", "value", "roots")
+
+# Rows x trees walked together; keeps the working arrays cache-sized
+BLOCK_CELLS = 1 << 16
+# Drop finished (row, tree) pairs every few levels rather than every level
+COMPACT_EVERY = 4
+
+
+@dataclass(frozen=True)
+class PackedForest:
+    """
+    A fitted tree ensemble flattened into parallel node arrays.
+    Nodes are stored in pre-order, so an internal node's left child is the
+    next node: node i goes to i + 1 when X[:, feature[i]] <= threshold[i]
+    and to right[i] otherwise. Leaves have threshold -inf and right[i] == i,
+    so walking past a leaf stays on it. value[i] is the leaf's positive-class
+    probability; the forest score is the mean over trees.
+    """
+
+    feature: np.ndarray  # int32
+    threshold: np.ndarray  # float64, as in sklearn
+    right: np.ndarray  # int32, global node ids
+    value: np.ndarray  # float64, positive-class proba (0 for internal nodes)
+    roots: np.ndarray  # int32, root node id per tree
+    n_features: int
+    max_depth: int
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    def predict_positive(self, X: np.ndarray) -> np.ndarray:
+        """Positive-class probability per row (same as predict_proba[:, 1])."""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"expected X with {self.n_features} columns, got {X.shape}")
+        n = len(X)
+        out = np.empty(n, dtype=np.float64)
+        step = max(1, BLOCK_CELLS // self.n_trees)
+        flat = X.ravel()
+        for lo in range(0, n, step):
+            hi = min(n, lo + step)
+            out[lo:hi] = self._leaf_values(flat, lo, hi).mean(axis=1)
+        return out
+
+    def _leaf_values(self, flat: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        # Walk all (row, tree) pairs of rows lo:hi one level at a time.
+        # Pairs sitting on a leaf are dropped from the working set every
+        # COMPACT_EVERY levels, so work follows the actual path lengths.
+        rows, trees = hi - lo, self.n_trees
+        values = np.empty(rows * trees, dtype=np.float64)
+        pos = np.arange(rows * trees)
+        node = np.tile(self.roots.astype(np.intp), rows)
+        base = np.repeat(np.arange(lo, hi) * self.n_features, trees)
+        level = 0
+        while True:
+            if level % COMPACT_EVERY == 0:
+                leaf = self.threshold[node] == -np.inf
+                if leaf.any():
+                    values[pos[leaf]] = self.value[node[leaf]]
+                    keep = ~leaf
+                    pos, node, base = pos[keep], node[keep], base[keep]
+                if not pos.size:
+                    break
+            x = flat[base + self.feature[node]]
+            node = np.where(x <= self.threshold[node], node + 1, self.right[node])
+            level += 1
+        return values.reshape(rows, trees)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """sklearn-compatible (n, 2) probabilities."""
+        p = self.predict_positive(X)
+        return np.column_stack([1.0 - p, p])
+
+    def save(self, path: str | Path) -> Path:
+        """Write one .npy per array plus meta.json into directory `path`."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            np.save(path / f"{name}.npy", getattr(self, name))
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "n_features": self.n_features,
+            "max_depth": self.max_depth,
+            "n_trees": self.n_trees,
+            "n_nodes": len(self.feature),
+        }
+        (path / "meta.json").write_text(json.dumps(meta, indent=2))
+        return path
+
+
+def load_forest(path: str | Path, mmap: bool = True) -> PackedForest:
+    """
+    Load a saved PackedForest. With mmap=True the arrays are read-only
+    memory maps, so worker processes serving the same model share one copy
+    in the page cache and loading does not read the files up front.
+    """
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text())
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported packed forest format {meta.get('format_version')}")
+    mode = "r" if mmap else None
+    # np.asarray drops the np.memmap subclass (cheaper indexing), not the mapping
+    arrays = {name: np.asarray(np.load(path / f"{name}.npy", mmap_mode=mode)) for name in ARRAYS}
+    return PackedForest(**arrays, n_features=meta["n_features"], max_depth=meta["max_depth"])
+
+
+def _preorder(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Node ids of one sklearn tree in pre-order (left subtree first)."""
+    order = []
+    stack = [0]
+    while stack:
+        i = stack.pop()
+        order.append(i)
+        if left[i] >= 0:
+            stack.append(right[i])
+            stack.append(left[i])
+    return np.array(order, dtype=np.intp)
+
+
+def pack_forest(model) -> PackedForest:
+    """
+    Flatten a fitted binary sklearn forest (RandomForestClassifier,
+    ExtraTreesClassifier) into a PackedForest.
+    """
+    if len(getattr(model, "classes_", [])) != 2:
+        raise ValueError("pack_forest supports binary classifiers only")
+
+    features, thresholds, rights, values, roots = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for est in model.estimators_:
+        tree = est.tree_
+        n = tree.node_count
+        # Renumber in pre-order (a no-op for sklearn's depth-first builder)
+        order = _preorder(tree.children_left, tree.children_right)
+        new_id = np.empty(n, dtype=np.intp)
+        new_id[order] = np.arange(n)
+        left = tree.children_left[order]
+        leaf = left < 0
+
+        # sklearn stores per-node class weights (or fractions); normalize
+        counts = tree.value[order, 0, :]
+        totals = counts.sum(axis=1)
+        proba = np.divide(counts[:, 1], totals, out=np.zeros(n), where=totals > 0)
+
+        ids = np.arange(offset, offset + n)
+        right = np.where(leaf, ids, new_id[np.maximum(tree.children_right[order], 0)] + offset)
+        features.append(np.where(leaf, 0, tree.feature[order]))
+        thresholds.append(np.where(leaf, -np.inf, tree.threshold[order]))
+        rights.append(right)
+        values.append(np.where(leaf, proba, 0.0))
+        roots.append(offset)
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n
+
+    return PackedForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=np.int32),
+        n_features=int(model.n_features_in_),
+        max_depth=int(max_depth),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export a pickled RandomForest to the packed serving format"
+    )
+    parser.add_argument("model", help="Path to models/<name>.pkl")
+    parser.add_argument("--out", help="Output directory (default: models/<name>.forest)")
+    args = parser.parse_args()
+
+    from joblib import load
+
+    src = Path(args.model)
+    packed = pack_forest(load(src))
+    out = packed.save(args.out or src.with_suffix(".forest"))
+    print(f"[Saved] {out} ({packed.n_trees} trees, {len(packed.feature)} nodes, {packed.nbytes / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from .data import DEFAULT_CHUNKSIZE, add_label, iter_month
+from .dedup import KeySet
+from .features import build_feature_matrix
+from .validator import ValidationReport, merge_reports
+
+
+class Reservoir:
+    """
+    Uniform sample of at most `capacity` rows from a stream of batches
+    (Algorithm R, vectorized per batch). Memory is fixed up front.
+    """
+
+    def __init__(self, capacity: int, n_features: int, seed: int = 42):
+        self.capacity = capacity
+        self.X = np.empty((capacity, n_features), dtype=np.float32)
+        self.y = np.empty(capacity, dtype=np.int64)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, X: np.ndarray, y: np.ndarray) -> None:
+        n = len(X)
+        if n == 0:
+            return
+        t = self.seen + np.arange(n)  # stream position of each row
+        slot = np.where(t < self.capacity, t, self._rng.integers(0, t + 1))
+        keep = slot < self.capacity
+        # duplicates: the later row wins, as in the sequential algorithm
+        self.X[slot[keep]] = X[keep]
+        self.y[slot[keep]] = y[keep]
+        self.seen += n
+
+    def sample(self) -> tuple[np.ndarray, np.ndarray]:
+        n = min(self.seen, self.capacity)
+        return self.X[:n], self.y[:n]
+
+
+def iter_xy_chunks(
+    sources: Sequence[tuple[str | Path, Optional[str]]],
+    test_size: float = 0.2,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    random_state: int = 42,
+    filter_month: bool = False,
+    reports: Optional[dict[str, list[ValidationReport]]] = None,
+    zone_table: Optional[np.ndarray] = None,
+    dedup: bool = False,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Stream (X, y, is_test) per validated chunk over (path, month) sources,
+    in order. The train/test routing is seeded by (random_state, source,
+    chunk), so every pass over the same sources splits rows the same way.
+    Chunk reports are appended to `reports[month or file stem]` if given.
+    With dedup, primary keys are checked across all sources of the pass.
+    """
+    keys = KeySet() if dedup else None
+    for i, (path, month) in enumerate(sources):
+        chunks = iter_month(
+            path,
+            month=month,
+            chunksize=chunksize,
+            columns="training",
+            filter_month=filter_month and month is not None,
+            dedup=dedup,
+            keys=keys,
+        )
+        for j, (clean, report) in enumerate(chunks):
+            if reports is not None:
+                reports.setdefault(month or Path(path).stem, []).append(report)
+            if clean.empty:
+                continue
+            clean = add_label(clean)
+            X = build_feature_matrix(clean, zone_table=zone_table)
+            y = clean["HIGH_TOTAL"].astype(int).to_numpy()
+            is_test = np.random.default_rng((random_state, i, j)).random(len(X)) < test_size
+            yield X, y, is_test
+
+
+def merge_chunk_reports(
+    reports: dict[str, list[ValidationReport]]
+) -> dict[str, ValidationReport]:
+    return {key: merge_reports(chunks) for key, chunks in reports.items()}
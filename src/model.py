@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from src.drift import DriftReference, load_reference
+from src.feature_vector import FEATURE_NAMES
+from src.forest import load_forest
+from src.profiling import span
+from src.zone_stats import ZONE_FEATURES, add_zone_features, load_zone_table
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """A model plus the feature schema it was trained with."""
+
+    name: str
+    model: Any
+    feature_names: list[str]
+    column_order: Optional[np.ndarray]  # FEATURE_NAMES -> schema order, if different
+    load_seconds: float
+    loaded_at: float
+    kind: str = "pickle"  # "pickle" (joblib/sklearn) | "packed" (src.forest)
+    zone_table: Optional[np.ndarray] = None  # src.zone_stats table, if trained with one
+    reference: Optional[DriftReference] = None  # training histograms for drift checks
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Positive-class scores for rows built in FEATURE_NAMES order; the
+        zone-pair columns are looked up here for models that use them.
+        """
+        with span("model.predict"):
+            if self.zone_table is not None:
+                X = add_zone_features(X, self.zone_table)
+            if self.column_order is not None:
+                X = X[:, self.column_order]
+            return self.model.predict_proba(X)[:, 1]
+
+
+def load_model(model_dir: str | Path, name: str, packed: bool = True) -> LoadedModel:
+    """
+    Load models/<name>.pkl and models/<name>_feature_schema.json.
+    With packed=True, models/<name>.forest (see src.forest) is used instead
+    of the pickle when it exists.
+    A schema with ZONE_FEATURES names its zone table ("zone_table", relative
+    to model_dir), which is memory-mapped alongside the model.
+    models/<name>_reference.json (src.drift), if present, is loaded too.
+    Fails if the schema asks for a feature src.features cannot build.
+    """
+    start = time.perf_counter()
+    model_dir = Path(model_dir)
+    schema = json.loads((model_dir / f"{name}_feature_schema.json").read_text())
+    feature_names = list(schema["feature_names"])
+    zone_table, available = None, list(FEATURE_NAMES)
+    if schema.get("zone_table"):
+        zone_table = load_zone_table(model_dir / schema["zone_table"])
+        available += ZONE_FEATURES
+    unknown = [f for f in feature_names if f not in available]
+    if unknown:
+        raise ValueError(f"Model {name!r} expects unknown features: {unknown}")
+
+    order = None
+    if feature_names != available:
+        order = np.array([available.index(f) for f in feature_names])
+
+    forest_dir = model_dir / f"{name}.forest"
+    if packed and (forest_dir / "meta.json").exists():
+        model, kind = load_forest(forest_dir), "packed"
+        if model.n_features != len(feature_names):
+            raise ValueError(f"{forest_dir} has {model.n_features} features, schema has {len(feature_names)}")
+    else:
+        from joblib import load  # sklearn is only imported for pickled models
+
+        model, kind = load(model_dir / f"{name}.pkl"), "pickle"
+    reference_path = model_dir / f"{name}_reference.json"
+    reference = load_reference(reference_path) if reference_path.exists() else None
+    return LoadedModel(
+        name=name,
+        model=model,
+        feature_names=feature_names,
+        column_order=order,
+        load_seconds=time.perf_counter() - start,
+        loaded_at=time.time(),
+        kind=kind,
+        zone_table=zone_table,
+        reference=reference,
+    )
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, Optional
+
+# NYC_PROFILE=1 records span timings, NYC_PROFILE=mem also the traced
+# (Python + NumPy) heap peak of each span; unset, span() is a no-op.
+_MODE = os.getenv("NYC_PROFILE", "").strip().lower()
+ENABLED = _MODE not in ("", "0", "false", "off")
+TRACE_MEMORY = _MODE == "mem"
+
+_NOOP = nullcontext()
+# Collectors receiving spans in this context (innermost last); a tuple so
+# async tasks and threads that copy the context never share a mutable stack
+_COLLECTORS: contextvars.ContextVar[tuple[dict, ...]] = contextvars.ContextVar("collectors", default=())
+# Called with (name, seconds) for every span, e.g. a Prometheus histogram
+_OBSERVERS: list[Callable[[str, float], None]] = []
+# Heap peak bookkeeping for nested spans (memory mode, one thread at a time)
+_PEAKS: list[int] = []
+
+
+def enable(memory: bool = False) -> None:
+    """Turn profiling on at runtime (tests, notebooks)."""
+    global ENABLED, TRACE_MEMORY
+    ENABLED, TRACE_MEMORY = True, memory
+
+
+def disable() -> None:
+    global ENABLED, TRACE_MEMORY
+    ENABLED = TRACE_MEMORY = False
+
+
+def add_observer(fn: Callable[[str, float], None]) -> None:
+    if fn not in _OBSERVERS:
+        _OBSERVERS.append(fn)
+
+
+def remove_observer(fn: Callable[[str, float], None]) -> None:
+    if fn in _OBSERVERS:
+        _OBSERVERS.remove(fn)
+
+
+def _record(name: str, seconds: float, peak_mb: Optional[float]) -> None:
+    for collector in _COLLECTORS.get():
+        entry = collector.setdefault(name, {"seconds": 0.0, "calls": 0})
+        entry["seconds"] += seconds
+        entry["calls"] += 1
+        if peak_mb is not None:
+            entry["peak_mb"] = max(entry.get("peak_mb", 0.0), peak_mb)
+    for observe in _OBSERVERS:
+        observe(name, seconds)
+
+
+@contextmanager
+def _span(name: str) -> Iterator[None]:
+    base = None
+    if TRACE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        if _PEAKS:  # keep the enclosing span's peak before resetting it
+            _PEAKS[-1] = max(_PEAKS[-1], peak)
+        tracemalloc.reset_peak()
+        base = current
+        _PEAKS.append(current)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak_mb = None
+        if base is not None:
+            peak = max(_PEAKS.pop(), tracemalloc.get_traced_memory()[1])
+            if _PEAKS:
+                _PEAKS[-1] = max(_PEAKS[-1], peak)
+            peak_mb = (peak - base) / 1024**2
+        _record(name, seconds, peak_mb)
+
+
+def span(name: str):
+    """
+    Time a block (and its heap peak over the start, in memory mode) into
+    every active collect() and observer. A shared no-op when disabled.
+    """
+    return _span(name) if ENABLED else _NOOP
+
+
+@contextmanager
+def collect() -> Iterator[dict]:
+    """
+    Gather the spans recorded inside the block into the yielded dict
+    ({name: {"seconds", "calls"[, "peak_mb"]}}); yields None when disabled.
+    """
+    if not ENABLED:
+        yield None
+        return
+    timings: dict = {}
+    token = _COLLECTORS.set(_COLLECTORS.get() + (timings,))
+    try:
+        yield timings
+    finally:
+        _COLLECTORS.reset(token)
+
+
+def merge_timings(*timings: Optional[dict]) -> Optional[dict]:
+    """Sum seconds / calls and take the max peak per span name."""
+    merged: dict = {}
+    for t in timings:
+        for name, entry in (t or {}).items():
+            out = merged.setdefault(name, {"seconds": 0.0, "calls": 0})
+            out["seconds"] += entry["seconds"]
+            out["calls"] += entry["calls"]
+            if "peak_mb" in entry:
+                out["peak_mb"] = max(out.get("peak_mb", 0.0), entry["peak_mb"])
+    return merged or None
+
+
+def as_metrics(timings: Optional[dict], prefix: str = "stage") -> dict[str, float]:
+    """Flat MLflow metrics: <prefix>.<span>.seconds (and .peak_mb)."""
+    metrics = {}
+    for name, entry in (timings or {}).items():
+        metrics[f"{prefix}.{name}.seconds"] = entry["seconds"]
+        if "peak_mb" in entry:
+            metrics[f"{prefix}.{name}.peak_mb"] = entry["peak_mb"]
+    return metrics
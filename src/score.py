@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.cache import file_digest
+from src.data import DEFAULT_CHUNKSIZE, PICKUP, iter_raw_chunks
+from src.feature_store import features_xy, load_manifest, read_features
+from src.features import build_feature_matrix
+from src.model import LoadedModel, load_model
+from src.validator import ValidationReport, merge_reports, validate_dataframe
+
+OUTPUT_COLUMNS = ["row", PICKUP, "PULocationID", "DOLocationID", "score", "is_anomaly"]
+MARKER_DIR = "_chunks"
+
+# Set once per worker process by _init_worker
+_MODEL: Optional[LoadedModel] = None
+
+
+def _init_worker(model_dir: str, model_name: str) -> None:
+    global _MODEL
+    # Whole chunks score faster through sklearn's compiled tree walk than
+    # through the packed runtime, which is tuned for small API batches
+    _MODEL = load_model(model_dir, model_name, packed=False)
+
+
+def _marker(out_dir: Path, chunk_id: int) -> Path:
+    return out_dir / MARKER_DIR / f"part-{chunk_id:05d}.json"
+
+
+def _write_atomic(frame: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    frame.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def score_chunk(
+    chunk_id: int, raw: pd.DataFrame, out_dir: str | Path, month: Optional[str] = None
+) -> dict:
+    """
+    Validate, featurize and score one raw chunk, then write its rows to
+    out_dir/date=YYYY-MM-DD/part-<chunk_id>.parquet. The chunk's marker is
+    written last, so a chunk without a marker is simply scored again.
+    """
+    out_dir = Path(out_dir)
+    # one score per input row; chunks are scored independently (no dedup)
+    df, report = validate_dataframe(raw, month=month, copy=False, dedup=False)
+    scores = _MODEL.predict(build_feature_matrix(df)) if len(df) else []
+    frame = pd.DataFrame(
+        {
+            "row": df.index.to_numpy(),
+            PICKUP: df[PICKUP].to_numpy(),
+            "PULocationID": df["PULocationID"].to_numpy(),
+            "DOLocationID": df["DOLocationID"].to_numpy(),
+            "score": scores,
+            "is_anomaly": df["is_anomaly"].to_numpy(),
+        },
+        columns=OUTPUT_COLUMNS,
+    )
+
+    files = []
+    day = df[PICKUP].dt.floor("D").to_numpy()
+    for key, part in frame.groupby(day, sort=True):
+        path = out_dir / f"date={pd.Timestamp(key):%Y-%m-%d}" / f"part-{chunk_id:05d}.parquet"
+        _write_atomic(part, path)
+        files.append(str(path.relative_to(out_dir)))
+
+    result = {
+        "chunk": chunk_id,
+        "rows": len(raw),
+        "rows_scored": len(frame),
+        "files": files,
+        "report": asdict(report),
+    }
+    marker = _marker(out_dir, chunk_id)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    tmp = marker.with_name(f".{marker.name}.tmp")
+    tmp.write_text(json.dumps(result, default=str))
+    os.replace(tmp, marker)
+    return result
+
+
+def _check_run(out_dir: Path, run: dict) -> None:
+    # Chunk ids are only meaningful for the same input, model and chunking
+    path = out_dir / MARKER_DIR / "run.json"
+    if path.exists():
+        previous = json.loads(path.read_text())
+        if previous != run:
+            raise ValueError(
+                f"{out_dir} holds chunks from a different run "
+                f"({previous}); use a fresh --out directory"
+            )
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=2))
+
+
+def _peak_rss_mb() -> dict:
+    """Peak resident set size of this process and of its (reaped) workers."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return {}
+    scale = 1024**2 if sys.platform == "darwin" else 1024  # bytes vs KiB
+    return {
+        "parent": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "workers": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale,
+    }
+
+
+def score_month(
+    path: str | Path,
+    out_dir: str | Path,
+    model_dir: str | Path = "models",
+    model_name: str = "model",
+    month: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    workers: int = 1,  # <= 1 scores in this process
+    retries: int = 2,  # extra attempts per failing chunk within this run
+    filter_month: bool = False,
+) -> dict:
+    """
+    Stream a month through validation, features and the saved model, and
+    write day-partitioned Parquet under out_dir. Chunks that already have a
+    marker in out_dir/_chunks are skipped, so rerunning after a failure only
+    scores what is missing. Returns a summary (throughput, peak RSS, ...).
+    """
+    start = time.perf_counter()
+    out_dir = Path(out_dir)
+    model_dir = str(model_dir)
+    _check_run(
+        out_dir,
+        {
+            "source": file_digest(path),
+            "model": model_name,
+            "model_mtime": os.path.getmtime(Path(model_dir) / f"{model_name}.pkl"),
+            "month": month,
+            "filter_month": filter_month,
+            "chunksize": chunksize,
+        },
+    )
+
+    results: dict[int, dict] = {}
+    failed: dict[int, str] = {}
+    skipped = 0
+    rows_this_run = 0
+    chunks = iter_raw_chunks(
+        path, chunksize, columns="scoring", month=month if filter_month else None
+    )
+
+    def todo():
+        nonlocal skipped
+        for chunk_id, raw in enumerate(chunks):
+            marker = _marker(out_dir, chunk_id)
+            if marker.exists():
+                results[chunk_id] = json.loads(marker.read_text())
+                skipped += 1
+            else:
+                yield chunk_id, raw
+
+    if workers <= 1:
+        _init_worker(model_dir, model_name)
+        for chunk_id, raw in todo():
+            for _ in range(retries + 1):
+                try:
+                    results[chunk_id] = score_chunk(chunk_id, raw, out_dir, month)
+                    rows_this_run += len(raw)
+                    failed.pop(chunk_id, None)
+                    break
+                except Exception as exc:  # reported per chunk
+                    failed[chunk_id] = repr(exc)
+    else:
+        # Keep at most 2 chunks per worker in flight to bound parent memory
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(model_dir, model_name),
+        ) as pool:
+            pending = {}
+            source = todo()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < 2 * workers:
+                    try:
+                        chunk_id, raw = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    fut = pool.submit(score_chunk, chunk_id, raw, out_dir, month)
+                    pending[fut] = (chunk_id, raw, 0)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    chunk_id, raw, attempt = pending.pop(fut)
+                    try:
+                        results[chunk_id] = fut.result()
+                        rows_this_run += len(raw)
+                        failed.pop(chunk_id, None)
+                    except Exception as exc:  # reported per chunk
+                        failed[chunk_id] = repr(exc)
+                        if attempt < retries:
+                            retry = pool.submit(score_chunk, chunk_id, raw, out_dir, month)
+                            pending[retry] = (chunk_id, raw, attempt + 1)
+
+    seconds = time.perf_counter() - start
+    report = merge_reports(
+        ValidationReport(**results[i]["report"]) for i in sorted(results)
+    ) if results else None
+    summary = {
+        "out_dir": str(out_dir),
+        "chunks": len(results) + len(failed),
+        "chunks_skipped": skipped,
+        "failed_chunks": {str(i): err for i, err in sorted(failed.items())},
+        "rows": sum(r["rows"] for r in results.values()),
+        "rows_scored": sum(r["rows_scored"] for r in results.values()),
+        "seconds": seconds,
+        "rows_per_sec": rows_this_run / seconds if seconds > 0 else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "validation": asdict(report) if report is not None else None,
+    }
+    (out_dir / "_summary.json").write_text(json.dumps(summary, indent=2, default=str))
+    return summary
+
+
+def score_features(
+    features_dir: str | Path,
+    out_dir: str | Path,
+    model_dir: str | Path = "models",
+    model_name: str = "model",
+    months: Optional[list[str]] = None,
+) -> dict:
+    """
+    Score features materialized by src.feature_store instead of raw data.
+    Each month is scored in one pass (no validation or featurization) and
+    written to the same day-partitioned layout as score_month, as
+    out_dir/date=YYYY-MM-DD/part-<month>.parquet.
+    """
+    start = time.perf_counter()
+    out_dir = Path(out_dir)
+    model = load_model(model_dir, model_name, packed=False)
+    keys = list(months) if months else sorted(load_manifest(features_dir)["sources"])
+
+    files, rows, reports = [], 0, []
+    for key in keys:
+        features, month_reports = read_features(features_dir, months=[key])
+        reports.append(month_reports[key])
+        if features.empty:
+            continue
+        X, _ = features_xy(features)
+        frame = pd.DataFrame(
+            {
+                "row": features["row"].to_numpy(),
+                PICKUP: features[PICKUP].to_numpy(),
+                "PULocationID": features["PU_id"].astype(int).to_numpy(),
+                "DOLocationID": features["DO_id"].astype(int).to_numpy(),
+                "score": model.predict(X),
+                "is_anomaly": features["is_anomaly"].to_numpy(),
+            },
+            columns=OUTPUT_COLUMNS,
+        )
+        day = frame[PICKUP].dt.floor("D").to_numpy()
+        for stamp, part in frame.groupby(day, sort=True):
+            path = out_dir / f"date={pd.Timestamp(stamp):%Y-%m-%d}" / f"part-{key}.parquet"
+            _write_atomic(part, path)
+            files.append(str(path.relative_to(out_dir)))
+        rows += len(frame)
+
+    seconds = time.perf_counter() - start
+    summary = {
+        "out_dir": str(out_dir),
+        "features": str(features_dir),
+        "months": keys,
+        "files": len(files),
+        "rows_scored": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "validation": asdict(merge_reports(reports)) if reports else None,
+    }
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "_summary.json").write_text(json.dumps(summary, indent=2, default=str))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score one month of NYC Taxi data to day-partitioned Parquet"
+    )
+    parser.add_argument("--data", help="Path to CSV or Parquet file")
+    parser.add_argument(
+        "--features", help="Score a materialized feature store instead of --data"
+    )
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--month", help="YYYY-MM for the freshness window")
+    parser.add_argument(
+        "--filter-month",
+        action="store_true",
+        help="Drop pickups outside --month before validating",
+    )
+    parser.add_argument("--model-dir", default="models", help="Saved model directory")
+    parser.add_argument(
+        "--model-name", default="model", help="Base name of the saved model file"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="Scoring processes"
+    )
+    parser.add_argument(
+        "--retries", type=int, default=2, help="Extra attempts per failing chunk"
+    )
+    args = parser.parse_args()
+    if not (args.data or args.features):
+        parser.error("one of --data or --features is required")
+
+    if args.features:
+        summary = score_features(
+            args.features,
+            args.out,
+            model_dir=args.model_dir,
+            model_name=args.model_name,
+            months=[args.month] if args.month else None,
+        )
+        print(json.dumps(summary, indent=2, default=str))
+        return
+
+    summary = score_month(
+        args.data,
+        args.out,
+        model_dir=args.model_dir,
+        model_name=args.model_name,
+        month=args.month,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        retries=args.retries,
+        filter_month=args.filter_month and args.month is not None,
+    )
+    print(json.dumps(summary, indent=2, default=str))
+    if summary["failed_chunks"]:
+        print("Some chunks failed; rerun the same command to score only those.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
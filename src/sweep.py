@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+# Shared feature arrays, memory-mapped once per worker by _init_worker
+_DATA: dict[str, np.ndarray] = {}
+
+
+@dataclass
+class Trial:
+    """One configuration and its validation metrics per rung."""
+
+    trial_id: int
+    params: dict[str, Any]
+    rungs: list[dict] = field(default_factory=list)  # {"rows", "metrics", "fit_seconds"}
+    eliminated_at: Optional[int] = None  # rung index, None if it survived
+
+    def score(self, metric: str) -> float:
+        return self.rungs[-1]["metrics"][metric] if self.rungs else float("-inf")
+
+
+def load_space(spec: str) -> dict[str, Any]:
+    """Search space from a JSON file path or an inline JSON object."""
+    path = Path(spec)
+    return json.loads(path.read_text() if path.exists() else spec)
+
+
+def sample_configs(
+    space: dict[str, Any], n_trials: Optional[int] = None, seed: int = 42
+) -> list[dict[str, Any]]:
+    """
+    Values are either lists (choices) or ranges {"low", "high", "log": bool,
+    "int": bool}. An all-list space without n_trials is expanded as a full
+    grid; otherwise n_trials configurations are drawn at random.
+    """
+    is_grid = all(isinstance(v, list) for v in space.values())
+    if is_grid and n_trials is None:
+        keys = list(space)
+        return [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n_trials or 20):
+        config = {}
+        for key, spec in space.items():
+            if isinstance(spec, list):
+                config[key] = spec[rng.integers(len(spec))]
+                continue
+            low, high = spec["low"], spec["high"]
+            if spec.get("log"):
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+            else:
+                value = float(rng.uniform(low, high))
+            config[key] = int(round(value)) if spec.get("int") else value
+        configs.append(config)
+    # duplicates (small choice spaces) would only waste workers
+    unique = {json.dumps(c, sort_keys=True, default=str): c for c in configs}
+    return list(unique.values())
+
+
+def rung_sizes(n_configs: int, n_rows: int, eta: int = 3, min_rows: int = 1000) -> list[int]:
+    """Training rows per rung: the last rung uses all rows, each earlier one 1/eta of the next."""
+    rungs = 1 + int(math.floor(math.log(max(n_configs, 1), eta) + 1e-9))
+    sizes = [n_rows // eta**k for k in range(rungs)][::-1]
+    return [s for s in sizes if s >= min(min_rows, n_rows)] or [n_rows]
+
+
+def _init_worker(data_dir: str) -> None:
+    for name in ("X_fit", "y_fit", "X_val", "y_val"):
+        _DATA[name] = np.load(Path(data_dir) / f"{name}.npy", mmap_mode="r")
+
+
+def _run_trial(algo: str, params: dict, rows: int, random_state: int, class_weight, n_jobs: int) -> dict:
+    from src.train import compute_metrics, make_model
+
+    model = make_model(
+        params.get("algo", algo),
+        random_state=random_state,
+        class_weight=class_weight,
+        n_jobs=n_jobs,
+        **{k: v for k, v in params.items() if k != "algo"},
+    )
+    start = time.perf_counter()
+    model.fit(_DATA["X_fit"][:rows], _DATA["y_fit"][:rows])
+    fit_seconds = time.perf_counter() - start
+    y_prob = model.predict_proba(_DATA["X_val"])[:, 1]
+    return {"rows": rows, "metrics": compute_metrics(_DATA["y_val"], y_prob), "fit_seconds": fit_seconds}
+
+
+def successive_halving(
+    X_fit: np.ndarray,
+    y_fit: np.ndarray,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    configs: list[dict[str, Any]],
+    algo: str = "rf",
+    metric: str = "roc_auc",
+    eta: int = 3,
+    min_rows: int = 1000,
+    max_workers: Optional[int] = None,
+    random_state: int = 42,
+    class_weight: str | None = "balanced",
+) -> list[Trial]:
+    """
+    Evaluate every config on a small prefix of the (shuffled) fit rows, keep
+    the best 1/eta by `metric` on the validation rows, and repeat on eta
+    times more rows until the last rung trains on all of them.
+    The arrays are written once to .npy files that every worker maps
+    read-only, so features are neither rebuilt nor pickled per trial.
+    """
+    trials = [Trial(i, dict(c)) for i, c in enumerate(configs)]
+    sizes = rung_sizes(len(trials), len(X_fit), eta=eta, min_rows=min_rows)
+    # one core per trial when trials run side by side
+    n_jobs = 1 if (max_workers or 0) != 1 else -1
+
+    with tempfile.TemporaryDirectory(prefix="sweep-") as data_dir:
+        for name, arr in (("X_fit", X_fit), ("y_fit", y_fit), ("X_val", X_val), ("y_val", y_val)):
+            np.save(Path(data_dir) / f"{name}.npy", np.ascontiguousarray(arr))
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+            alive = trials
+            for rung, rows in enumerate(sizes):
+                futures = [
+                    pool.submit(_run_trial, algo, t.params, rows, random_state, class_weight, n_jobs)
+                    for t in alive
+                ]
+                for trial, fut in zip(alive, futures):
+                    trial.rungs.append(fut.result())
+                if rung == len(sizes) - 1:
+                    break
+                ranked = sorted(alive, key=lambda t: t.score(metric), reverse=True)
+                keep = max(1, math.ceil(len(ranked) / eta))
+                for trial in ranked[keep:]:
+                    trial.eliminated_at = rung
+                alive = ranked[:keep]
+    return trials
+
+
+def log_trials(trials: list[Trial], metric: str) -> None:
+    """One nested MLflow run per trial, metrics logged with step = rung."""
+    import mlflow
+
+    for trial in trials:
+        with mlflow.start_run(run_name=f"trial-{trial.trial_id}", nested=True):
+            mlflow.log_params(trial.params)
+            for step, rung in enumerate(trial.rungs):
+                mlflow.log_metrics(
+                    {**rung["metrics"], "train_rows": rung["rows"], "fit_seconds": rung["fit_seconds"]},
+                    step=step,
+                )
+            mlflow.set_tag("eliminated_at_rung", str(trial.eliminated_at))
+            mlflow.log_metric(f"final_{metric}", trial.score(metric))
+
+
+def best_trial(trials: list[Trial], metric: str) -> Trial:
+    """Best config among those that reached the last rung."""
+    finalists = [t for t in trials if t.eliminated_at is None]
+    return max(finalists, key=lambda t: t.score(metric))
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .contract_spec import COLUMNS
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+ZONE_IDS = np.arange(1, 264)  # 264/265 are the TLC "unknown" zones
+
+# Injected anomaly rate per validator rule, keyed like
+# ValidationReport.anomalies_by_rule. Bad "VendorID" and "missing_pickup"
+# rows are dropped as required-null (so they only show up in the row
+# count); "joinability_drop" rows get a zone outside ZONE_IDS and
+# "duplicate_key" rows are copies of another trip of the chunk (counted
+# with validate_dataframe(dedup=True); no _ingest_rowid, so flagged only).
+DEFAULT_ANOMALY_RATES = {
+    "VendorID": 0.001,
+    "passenger_count": 0.005,
+    "trip_distance": 0.002,
+    "RatecodeID": 0.002,
+    "store_and_fwd_flag": 0.001,
+    "payment_type": 0.001,
+    "fare_amount": 0.002,
+    "extra": 0.001,
+    "mta_tax": 0.001,
+    "tip_amount": 0.001,
+    "tolls_amount": 0.0005,
+    "improvement_surcharge": 0.0005,
+    "congestion_surcharge": 0.0005,
+    "total_amount": 0.002,
+    "duration_minutes": 0.003,
+    "missing_pickup": 0.0005,
+    "joinability_drop": 0.001,
+    "duplicate_key": 0.001,
+}
+# Value written for an injected violation of each column rule
+_BAD_VALUES = {
+    "VendorID": 5,
+    "passenger_count": 9,
+    "trip_distance": 250.0,
+    "RatecodeID": 77,
+    "store_and_fwd_flag": "Z",
+    "payment_type": 9,
+}
+_MONEY = [
+    "fare_amount",
+    "extra",
+    "mta_tax",
+    "tip_amount",
+    "tolls_amount",
+    "improvement_surcharge",
+    "congestion_surcharge",
+    "total_amount",
+]
+
+
+def _zone_weights(rng: np.random.Generator) -> np.ndarray:
+    # a few busy zones (Midtown, airports, ...) and a long tail
+    w = 1.0 / np.arange(1, len(ZONE_IDS) + 1) ** 1.1
+    return rng.permutation(w) / w.sum()
+
+
+def generate_chunk(
+    month: str,
+    rows: int,
+    seed: int = 0,
+    chunk: int = 0,
+    anomaly_rates: Optional[dict[str, float]] = None,
+) -> pd.DataFrame:
+    """
+    `rows` trips with pickups inside `month`, in COLUMNS order, following the
+    contract except for the injected anomalies. Deterministic in
+    (month, seed, chunk); zone popularity depends on the seed only.
+    """
+    rates = DEFAULT_ANOMALY_RATES if anomaly_rates is None else anomaly_rates
+    unknown = set(rates) - set(DEFAULT_ANOMALY_RATES)
+    if unknown:
+        raise ValueError(f"Unknown anomaly rules: {sorted(unknown)}")
+    zones = _zone_weights(np.random.default_rng(seed))
+    rng = np.random.default_rng((seed, chunk, int(month.replace("-", ""))))
+
+    start = pd.Timestamp(f"{month}-01")
+    seconds = int((start + pd.offsets.MonthBegin(1) - start).total_seconds())
+    pickup = start + pd.to_timedelta(np.sort(rng.integers(0, seconds, rows)), unit="s")
+    minutes = np.clip(rng.lognormal(2.5, 0.6, rows), 1.5, 180.0)
+    distance = np.round(np.clip(minutes * rng.gamma(4.0, 0.07, rows), 0.1, 120.0), 2)
+    airport = rng.random(rows) < 0.03
+    ratecode = np.where(airport, 2, rng.choice([1, 3, 4, 5, 99], rows, p=[0.975, 0.005, 0.005, 0.01, 0.005]))
+    payment = rng.choice([1, 2, 3, 4, 0], rows, p=[0.72, 0.2, 0.02, 0.01, 0.05])
+
+    fare = np.round(np.where(airport, 70.0, 3.0 + 2.5 * distance + 0.6 * minutes), 2)
+    extra = rng.choice([0.0, 1.0, 2.5], rows, p=[0.5, 0.3, 0.2])
+    mta = np.full(rows, 0.5)
+    tip = np.round(np.where(payment == 1, fare * rng.uniform(0.1, 0.3, rows), 0.0), 2)
+    tolls = np.where(rng.random(rows) < 0.05, 6.94, 0.0)
+    improvement = np.full(rows, 1.0)
+    congestion = np.where(rng.random(rows) < 0.9, 2.5, 0.0)
+    df = pd.DataFrame(
+        {
+            "VendorID": rng.choice([1, 2, 6, 7], rows, p=[0.3, 0.66, 0.02, 0.02]),
+            "tpep_pickup_datetime": pickup,
+            "tpep_dropoff_datetime": pickup + pd.to_timedelta(np.round(minutes * 60), unit="s"),
+            "PULocationID": rng.choice(ZONE_IDS, rows, p=zones),
+            "DOLocationID": rng.choice(ZONE_IDS, rows, p=zones),
+            "passenger_count": pd.array(rng.choice([0, 1, 2, 3, 4, 5, 6], rows), dtype="Int64"),
+            "trip_distance": distance,
+            "RatecodeID": ratecode,
+            "store_and_fwd_flag": np.where(rng.random(rows) < 0.005, "Y", "N"),
+            "payment_type": payment,
+            "fare_amount": fare,
+            "extra": extra,
+            "mta_tax": mta,
+            "tip_amount": tip,
+            "tolls_amount": tolls,
+            "improvement_surcharge": improvement,
+            "congestion_surcharge": congestion,
+            "total_amount": np.round(fare + extra + mta + tip + tolls + improvement + congestion, 2),
+        },
+        columns=[c.name for c in COLUMNS],
+    )
+
+    for rule, rate in rates.items():
+        hit = np.flatnonzero(rng.random(rows) < rate)
+        if not len(hit):
+            continue
+        if rule in _BAD_VALUES:
+            df.loc[hit, rule] = _BAD_VALUES[rule]
+        elif rule in _MONEY:
+            df.loc[hit, rule] = -df[rule].to_numpy()[hit] - 1.0
+        elif rule == "duration_minutes":
+            df.loc[hit, "tpep_dropoff_datetime"] = df["tpep_pickup_datetime"].to_numpy()[hit] + pd.Timedelta(hours=13)
+        elif rule == "missing_pickup":
+            df.loc[hit, "tpep_pickup_datetime"] = pd.NaT
+        elif rule == "joinability_drop":
+            df.loc[hit, "PULocationID"] = 999
+        elif rule == "duplicate_key":
+            source = np.arange(rows)
+            source[hit] = rng.integers(0, rows, len(hit))
+            df = df.take(source).reset_index(drop=True)
+    return df
+
+
+def iter_month_chunks(
+    month: str,
+    rows: int,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    anomaly_rates: Optional[dict[str, float]] = None,
+) -> Iterator[pd.DataFrame]:
+    """generate_chunk over a whole month, chunk_rows at a time (index keeps counting)."""
+    for chunk, first in enumerate(range(0, rows, chunk_rows)):
+        df = generate_chunk(month, min(chunk_rows, rows - first), seed, chunk, anomaly_rates)
+        df.index += first
+        yield df
+
+
+def write_month(
+    path: str | Path,
+    month: str,
+    rows: int,
+    seed: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    anomaly_rates: Optional[dict[str, float]] = None,
+) -> Path:
+    """
+    Write a synthetic month to CSV or Parquet (by suffix), chunk by chunk,
+    so memory is bounded by chunk_rows. Parquet gets one row group per chunk.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = iter_month_chunks(month, rows, seed, chunk_rows, anomaly_rates)
+    if path.suffix == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for df in chunks:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif path.suffix == ".csv":
+        for i, df in enumerate(chunks):
+            df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    else:
+        raise ValueError(f"Unsupported format: {path.suffix} (use .csv or .parquet)")
+    return path
+
+
+def _rate(spec: str) -> tuple[str, float]:
+    rule, _, value = spec.partition("=")
+    return rule, float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic, contract-conformant NYC taxi month"
+    )
+    parser.add_argument("--month", required=True, help="YYYY-MM")
+    parser.add_argument("--rows", type=int, required=True, help="Trips to generate")
+    parser.add_argument("--out", required=True, help="Output .csv or .parquet path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument(
+        "--anomaly-rate",
+        type=_rate,
+        action="append",
+        default=[],
+        metavar="RULE=RATE",
+        help="Override one rule's rate (repeatable), e.g. trip_distance=0.01",
+    )
+    parser.add_argument(
+        "--clean", action="store_true", help="Start from zero anomaly rates"
+    )
+    args = parser.parse_args()
+
+    rates = {} if args.clean else dict(DEFAULT_ANOMALY_RATES)
+    rates.update(dict(args.anomaly_rate))
+    path = write_month(args.out, args.month, args.rows, args.seed, args.chunk_rows, rates)
+    print(json.dumps({"path": str(path), "rows": args.rows, "anomaly_rates": rates}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,10 @@ from __future__ import annotations
 
 import argparse
 import json
+import shutil
+from dataclasses import asdict
 from pathlib import Path
+from typing import Optional
 
 import mlflow
 import mlflow.sklearn
@@ -11,13 +14,26 @@ import numpy as np
 import pandas as pd
 from joblib import dump
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import (accuracy_score, average_precision_score, f1_score,
                              precision_score, recall_score, roc_auc_score)
 from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 
-from src.data import add_label, load_month
-from src.features import build_features
+from src.cache import ValidatedCache
+from src.data import (DEFAULT_CHUNKSIZE, add_label, is_multi_month, load_month,
+                      load_months, month_range, resolve_month_paths)
+from src.drift import DriftReference, build_reference
+from src.feature_store import features_xy, read_features
+from src.features import FEATURE_NAMES, build_feature_matrix
+from src.forest import pack_forest
+from src.incremental import Reservoir, iter_xy_chunks, merge_chunk_reports
+from src.profiling import as_metrics, collect, span
+from src.sweep import (best_trial, load_space, log_trials, sample_configs,
+                       successive_halving)
+from src.validator import ValidationReport
+from src.zone_stats import ZONE_FEATURES, add_zone_features, load_zone_table
 
 
 def compute_metrics(
@@ -35,110 +51,395 @@ def compute_metrics(
     }
 
 
+def _save_artifacts(
+    model,
+    model_name: str,
+    algo: str,
+    metrics: dict,
+    counts: dict,
+    zone_table: Optional[np.ndarray] = None,
+    reference: Optional[DriftReference] = None,
+) -> None:
+    """
+    Write models/<name>.pkl (+ .forest for rf), the feature schema and the
+    eval report, and log them to the active MLflow run. Shared by every
+    training mode so the API loads all of them the same way.
+    A zone_table is saved next to the model as <name>_zones.npy, drift
+    reference histograms as <name>_reference.json.
+    """
+    feature_names = list(FEATURE_NAMES)
+    zones_path = Path("models") / f"{model_name}_zones.npy"
+    if zone_table is not None:
+        feature_names += ZONE_FEATURES
+
+    # Save model locally for API
+    Path("models").mkdir(exist_ok=True)
+    local_model_path = f"models/{model_name}.pkl"
+    dump(model, local_model_path)
+    zones_path.unlink(missing_ok=True)
+    if zone_table is not None:
+        np.save(zones_path, np.asarray(zone_table))
+        mlflow.log_artifact(str(zones_path))
+
+    # Packed node arrays for serving (the API prefers these to the pickle)
+    forest_dir = Path("models") / f"{model_name}.forest"
+    shutil.rmtree(forest_dir, ignore_errors=True)
+    if algo == "rf":
+        pack_forest(model).save(forest_dir)
+        mlflow.log_artifacts(str(forest_dir), artifact_path=forest_dir.name)
+
+    # Log model to MLflow (with feature signature as artifact)
+    mlflow.sklearn.log_model(
+        sk_model=model,
+        artifact_path="model",
+        registered_model_name=None,  # you can set a name to use the registry later
+    )
+
+    # Save & log feature schema
+    schema = {
+        "feature_names": feature_names,
+        "n_features": len(feature_names),
+        "notes": "Order matters for serving; keep in sync with src/features.py",
+    }
+    if zone_table is not None:
+        schema["zone_table"] = zones_path.name
+    schema_path = Path("models") / f"{model_name}_feature_schema.json"
+    schema_path.write_text(json.dumps(schema, indent=2))
+    mlflow.log_artifact(str(schema_path))
+
+    # Reference histograms for the API's drift monitor (api.drift)
+    reference_path = Path("models") / f"{model_name}_reference.json"
+    reference_path.unlink(missing_ok=True)
+    if reference is not None:
+        reference.save(reference_path)
+        mlflow.log_artifact(str(reference_path))
+
+    # Save & log a small evaluation report
+    report = {"counts": counts, "metrics": metrics}
+    report_path = Path("models") / f"{model_name}_eval.json"
+    report_path.write_text(json.dumps(report, indent=2))
+    mlflow.log_artifact(str(report_path))
+
+    # Also log the local model file (handy for FastAPI)
+    mlflow.log_artifact(local_model_path)
+
+    print(f"[MLflow] run_id={mlflow.active_run().info.run_id}")
+    print(f"[Saved] {local_model_path}")
+    print(f"[Metrics] {json.dumps(metrics, indent=2)}")
+
+
+def _log_validation(reports: Optional[dict[str, ValidationReport]]) -> None:
+    for month, rep in (reports or {}).items():
+        mlflow.log_dict(asdict(rep), f"validation/{month}.json")
+        mlflow.log_metrics(
+            {f"rows_{month}": rep.rows, f"anomaly_rate_{month}": rep.anomaly_rate}
+        )
+        if rep.stage_timings:
+            mlflow.log_metrics(as_metrics(rep.stage_timings, prefix=f"stage_{month}"))
+
+
+def make_model(
+    algo: str,
+    random_state: int = 42,
+    class_weight: str | None = "balanced",
+    n_jobs: int = -1,
+    **params,
+):
+    """Estimator for `algo` with the baseline settings, overridden by params."""
+    if algo == "rf":
+        defaults = dict(n_estimators=200, max_depth=None, min_samples_split=2)
+        return RandomForestClassifier(
+            **{**defaults, **params},
+            n_jobs=n_jobs,
+            random_state=random_state,
+            class_weight=class_weight,
+        )
+    if algo == "logreg":
+        defaults = dict(max_iter=200)
+        return LogisticRegression(
+            **{**defaults, **params},
+            n_jobs=n_jobs,
+            random_state=random_state,
+            class_weight=class_weight,
+        )
+    raise ValueError("algo must be 'rf' or 'logreg'")
+
+
+def build_xy(
+    df: pd.DataFrame, zone_table: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Label + feature matrix for a validated frame."""
+    df = add_label(df)
+    return build_feature_matrix(df, zone_table=zone_table), df["HIGH_TOTAL"].astype(int).values
+
+
+def _zone_table(path: Optional[str], training_months: list[str]) -> Optional[np.ndarray]:
+    """--zone-table, refused if it was built from any of the training months."""
+    return load_zone_table(path, training_months=training_months) if path else None
+
+
 def train_once(
-    df: pd.DataFrame,
+    df: Optional[pd.DataFrame],
     model_name: str,
     experiment: str,
     algo: str = "rf",
     random_state: int = 42,
     test_size: float = 0.2,
     class_weight: str | None = "balanced",
+    validation_reports: Optional[dict[str, ValidationReport]] = None,
+    params: Optional[dict] = None,  # estimator overrides, e.g. from a sweep
+    xy: Optional[tuple[np.ndarray, np.ndarray]] = None,  # prebuilt build_xy(df)
+    zone_table: Optional[np.ndarray] = None,  # src.zone_stats lookup table
 ):
     """
     Single training run with MLflow logging and model artifact.
+    validation_reports ({month: report}) are logged as validation/<month>.json
+    artifacts plus per-month row / anomaly-rate metrics.
+    Runs nested when an MLflow run is already active (e.g. a sweep).
+    With a zone_table, xy must already include the ZONE_FEATURES columns.
+    With src.profiling enabled, each phase is logged as stage.<phase>.* metrics.
     """
     mlflow.set_experiment(experiment)
 
-    # Label + features
-    df = add_label(df)
-    X = build_features(df)
-    y = df["HIGH_TOTAL"].astype(int).values
+    with collect() as timings:
+        # Label + features
+        with span("train.features"):
+            X, y = xy if xy is not None else build_xy(df, zone_table)
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X.values, y, test_size=test_size, random_state=random_state, stratify=y
-    )
+        with span("train.split"):
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=test_size, random_state=random_state, stratify=y
+            )
 
-    feature_names = list(X.columns)
+        feature_names = list(FEATURE_NAMES) + (ZONE_FEATURES if zone_table is not None else [])
 
-    with mlflow.start_run(run_name=f"baseline-{algo}"):
+        with mlflow.start_run(
+            run_name=f"baseline-{algo}", nested=mlflow.active_run() is not None
+        ):
 
-        # Choose model
-        if algo == "rf":
-            model = RandomForestClassifier(
-                n_estimators=200,
-                max_depth=None,
-                min_samples_split=2,
-                n_jobs=-1,
-                random_state=random_state,
-                class_weight=class_weight,
-            )
-        elif algo == "logreg":
-            model = LogisticRegression(
-                max_iter=200,
-                n_jobs=-1,
-                random_state=random_state,
-                class_weight=class_weight,
+            # Choose model
+            model = make_model(
+                algo, random_state=random_state, class_weight=class_weight, **(params or {})
             )
-        else:
-            raise ValueError("algo must be 'rf' or 'logreg'")
 
-        # Log params
-        mlflow.log_param("algo", algo)
-        mlflow.log_param("random_state", random_state)
-        mlflow.log_param("test_size", test_size)
-        mlflow.log_param("class_weight", str(class_weight))
-        mlflow.log_param("n_features", len(feature_names))
+            # Log params
+            mlflow.log_param("algo", algo)
+            mlflow.log_param("random_state", random_state)
+            mlflow.log_param("test_size", test_size)
+            mlflow.log_param("class_weight", str(class_weight))
+            mlflow.log_param("n_features", len(feature_names))
+            if params:
+                mlflow.log_params(params)
+            _log_validation(validation_reports)
 
-        # Fit
-        model.fit(X_train, y_train)
+            # Fit
+            with span("train.fit"):
+                model.fit(X_train, y_train)
 
-        # Evaluate
-        y_prob = model.predict_proba(X_test)[:, 1]
-        metrics = compute_metrics(y_test, y_prob, threshold=0.5)
-        mlflow.log_metrics(metrics)
+            # Evaluate
+            with span("train.evaluate"):
+                y_prob = model.predict_proba(X_test)[:, 1]
+                metrics = compute_metrics(y_test, y_prob, threshold=0.5)
+            mlflow.log_metrics(metrics)
 
-        # Save model locally for API
-        Path("models").mkdir(exist_ok=True)
-        local_model_path = f"models/{model_name}.pkl"
-        dump(model, local_model_path)
+            with span("train.artifacts"):
+                _save_artifacts(
+                    model,
+                    model_name,
+                    algo,
+                    metrics,
+                    counts={
+                        "train": int(len(y_train)),
+                        "test": int(len(y_test)),
+                        "positives_test": int(y_test.sum()),
+                        "negatives_test": int((y_test == 0).sum()),
+                    },
+                    zone_table=zone_table,
+                    reference=build_reference(X_test, y_prob),
+                )
+            if timings:
+                mlflow.log_metrics(as_metrics(timings))
 
-        # Log model to MLflow (with feature signature as artifact)
-        mlflow.sklearn.log_model(
-            sk_model=model,
-            artifact_path="model",
-            registered_model_name=None,  # you can set a name to use the registry later
+
+def train_incremental(
+    sources: list[tuple[str, Optional[str]]],
+    model_name: str,
+    experiment: str,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    epochs: int = 1,
+    holdout_rows: int = 200_000,
+    random_state: int = 42,
+    test_size: float = 0.2,
+    class_weight: str | None = "balanced",
+    filter_month: bool = False,
+    alpha: float = 1e-4,
+    zone_table: Optional[np.ndarray] = None,
+):
+    """
+    Out-of-core training over (path, month) sources streamed chunk by chunk.
+    Pass 1 fits a StandardScaler with partial_fit, counts classes and keeps a
+    bounded reservoir of held-out rows; each further pass (one per epoch)
+    feeds the train rows to an SGD logistic regression via partial_fit.
+    Memory is set by chunksize and holdout_rows, not by the number of months.
+    Logs the same metrics, schema and artifacts as train_once (algo "sgd").
+    """
+    mlflow.set_experiment(experiment)
+    stream = dict(
+        test_size=test_size,
+        chunksize=chunksize,
+        random_state=random_state,
+        filter_month=filter_month,
+        zone_table=zone_table,
+    )
+    n_features = len(FEATURE_NAMES) + (len(ZONE_FEATURES) if zone_table is not None else 0)
+
+    # Pass 1: scaler statistics, class counts, holdout sample, reports
+    scaler = StandardScaler()
+    holdout = Reservoir(holdout_rows, n_features, seed=random_state)
+    counts = np.zeros(2, dtype=np.int64)
+    chunk_reports: dict[str, list[ValidationReport]] = {}
+    for X, y, is_test in iter_xy_chunks(sources, reports=chunk_reports, **stream):
+        holdout.add(X[is_test], y[is_test])
+        if (~is_test).any():
+            scaler.partial_fit(X[~is_test])
+            counts += np.bincount(y[~is_test], minlength=2)[:2]
+    if counts.min() == 0:
+        raise ValueError(f"need both classes in the training rows, got counts {counts.tolist()}")
+
+    weights = None
+    if class_weight == "balanced":
+        weights = {c: counts.sum() / (2 * counts[c]) for c in (0, 1)}
+    clf = SGDClassifier(
+        loss="log_loss", alpha=alpha, class_weight=weights, random_state=random_state
+    )
+
+    # Passes 2..: incremental fit on scaled train rows
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        for X, y, is_test in iter_xy_chunks(sources, **stream):
+            train = np.flatnonzero(~is_test)
+            rng.shuffle(train)
+            if train.size:
+                clf.partial_fit(scaler.transform(X[train]), y[train], classes=[0, 1])
+
+    model = Pipeline([("scale", scaler), ("clf", clf)])
+    X_test, y_test = holdout.sample()
+
+    with mlflow.start_run(
+        run_name="incremental-sgd", nested=mlflow.active_run() is not None
+    ):
+        mlflow.log_params(
+            {
+                "algo": "sgd",
+                "random_state": random_state,
+                "test_size": test_size,
+                "class_weight": str(class_weight),
+                "n_features": n_features,
+                "chunksize": chunksize,
+                "epochs": epochs,
+                "holdout_rows": holdout_rows,
+                "alpha": alpha,
+            }
         )
+        _log_validation(merge_chunk_reports(chunk_reports))
+
+        y_prob = model.predict_proba(X_test)[:, 1]
+        metrics = compute_metrics(y_test, y_prob, threshold=0.5)
+        mlflow.log_metrics(metrics)
 
-        # Save & log feature schema
-        schema = {
-            "feature_names": feature_names,
-            "n_features": len(feature_names),
-            "notes": "Order matters for serving; keep in sync with src/features.py",
-        }
-        schema_path = Path("models") / f"{model_name}_feature_schema.json"
-        schema_path.write_text(json.dumps(schema, indent=2))
-        mlflow.log_artifact(str(schema_path))
-
-        # Save & log a small evaluation report
-        report = {
-            "counts": {
-                "train": int(len(y_train)),
+        _save_artifacts(
+            model,
+            model_name,
+            "sgd",
+            metrics,
+            counts={
+                "train": int(counts.sum()),
                 "test": int(len(y_test)),
+                "test_seen": int(holdout.seen),
                 "positives_test": int(y_test.sum()),
                 "negatives_test": int((y_test == 0).sum()),
             },
-            "metrics": metrics,
-        }
-        report_path = Path("models") / f"{model_name}_eval.json"
-        report_path.write_text(json.dumps(report, indent=2))
-        mlflow.log_artifact(str(report_path))
+            zone_table=zone_table,
+            reference=build_reference(X_test, y_prob),
+        )
+    return model
+
+
+def train_sweep(
+    df: Optional[pd.DataFrame],
+    model_name: str,
+    experiment: str,
+    space: dict,
+    algo: str = "rf",
+    n_trials: Optional[int] = None,
+    metric: str = "roc_auc",
+    eta: int = 3,
+    min_rows: int = 1000,
+    max_workers: Optional[int] = None,
+    random_state: int = 42,
+    test_size: float = 0.2,
+    class_weight: str | None = "balanced",
+    validation_reports: Optional[dict[str, ValidationReport]] = None,
+    xy: Optional[tuple[np.ndarray, np.ndarray]] = None,  # prebuilt build_xy(df)
+    zone_table: Optional[np.ndarray] = None,
+):
+    """
+    Successive-halving sweep over `space` (see src.sweep.sample_configs).
+    Features are built once; trials run in a process pool on the train
+    split (minus a validation slice) and are logged as nested runs. The best
+    config is then refit by train_once on the same train/test split.
+    """
+    mlflow.set_experiment(experiment)
+    X, y = xy if xy is not None else build_xy(df, zone_table)
+    # Same split train_once uses, so the test rows never influence selection
+    X_train, _, y_train, _ = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=0.2, random_state=random_state, stratify=y_train
+    )
+    configs = sample_configs(space, n_trials=n_trials, seed=random_state)
 
-        # Also log the local model file (handy for FastAPI)
-        mlflow.log_artifact(local_model_path)
+    with mlflow.start_run(run_name=f"sweep-{algo}"):
+        mlflow.log_dict(space, "sweep/space.json")
+        mlflow.log_params(
+            {"algo": algo, "n_configs": len(configs), "eta": eta, "metric": metric}
+        )
+        trials = successive_halving(
+            X_fit,
+            y_fit,
+            X_val,
+            y_val,
+            configs,
+            algo=algo,
+            metric=metric,
+            eta=eta,
+            min_rows=min_rows,
+            max_workers=max_workers,
+            random_state=random_state,
+            class_weight=class_weight,
+        )
+        log_trials(trials, metric)
+        best = best_trial(trials, metric)
+        mlflow.log_dict(best.params, "sweep/best_params.json")
+        mlflow.log_metric(f"best_val_{metric}", best.score(metric))
+        print(f"[Sweep] best trial {best.trial_id}: {json.dumps(best.params)}")
 
-        print(f"[MLflow] run_id={mlflow.active_run().info.run_id}")
-        print(f"[Saved] {local_model_path}")
-        print(f"[Metrics] {json.dumps(metrics, indent=2)}")
+        params = dict(best.params)
+        train_once(
+            df=None,
+            model_name=model_name,
+            experiment=experiment,
+            algo=params.pop("algo", algo),
+            random_state=random_state,
+            test_size=test_size,
+            class_weight=class_weight,
+            validation_reports=validation_reports,
+            params=params,
+            xy=(X, y),
+            zone_table=zone_table,
+        )
+    return trials
 
 
 def main():
@@ -146,11 +447,44 @@ def main():
         description="Train baseline model with MLflow logging."
     )
     parser.add_argument(
-        "--data", required=True, help="Path to CSV or Parquet month file"
+        "--data",
+        help="CSV/Parquet month file, a glob, or a template with {month}",
     )
     parser.add_argument(
         "--month", required=False, help="YYYY-MM expected month for freshness check"
     )
+    parser.add_argument(
+        "--months",
+        required=False,
+        help="Month range FIRST:LAST (YYYY-MM) for globs / {month} templates",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for multi-month loads and sweep trials",
+    )
+    parser.add_argument(
+        "--filter-month",
+        action="store_true",
+        help="Keep only pickups inside --month (pushed down for Parquet)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".cache/validated",
+        help="Directory for cached validated months",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Always re-read and revalidate"
+    )
+    parser.add_argument(
+        "--zone-table",
+        help="Zone-pair aggregates (src.zone_stats dir) built from months before the training data",
+    )
+    parser.add_argument(
+        "--features",
+        help="Read materialized features from this store instead of --data",
+    )
     parser.add_argument(
         "--experiment", default="nyc-taxi-high-total", help="MLflow experiment name"
     )
@@ -160,17 +494,126 @@ def main():
     parser.add_argument(
         "--model-name", default="model", help="Base name for saved model file"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Stream chunks into an SGD model instead of loading everything",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Rows per chunk for --incremental",
+    )
+    parser.add_argument(
+        "--epochs", type=int, default=1, help="Passes over the data for --incremental"
+    )
+    parser.add_argument(
+        "--holdout-rows",
+        type=int,
+        default=200_000,
+        help="Max held-out rows kept for --incremental evaluation",
+    )
+    parser.add_argument(
+        "--sweep",
+        help="Search space (JSON file or inline JSON) for a successive-halving sweep",
+    )
+    parser.add_argument(
+        "--sweep-trials",
+        type=int,
+        default=None,
+        help="Random configs to draw (default: full grid for list-only spaces)",
+    )
+    parser.add_argument(
+        "--sweep-metric", default="roc_auc", help="Validation metric to rank trials"
+    )
+    parser.add_argument(
+        "--eta", type=int, default=3, help="Keep 1/eta of trials per rung"
+    )
+    parser.add_argument(
+        "--min-rows", type=int, default=1000, help="Training rows in the first rung"
+    )
     args = parser.parse_args()
+    if not (args.data or args.features):
+        parser.error("one of --data or --features is required")
+    if args.incremental and not args.data:
+        parser.error("--incremental streams raw chunks and needs --data")
+
+    if args.incremental:
+        if is_multi_month(args.data):
+            months = month_range(*args.months.split(":")) if args.months else None
+            sources = resolve_month_paths(args.data, months)
+        else:
+            sources = [(args.data, args.month)]
+        zone_table = _zone_table(args.zone_table, [month or Path(path).stem for path, month in sources])
+        train_incremental(
+            sources,
+            model_name=args.model_name,
+            experiment=args.experiment,
+            chunksize=args.chunksize,
+            epochs=args.epochs,
+            holdout_rows=args.holdout_rows,
+            filter_month=args.filter_month,
+            zone_table=zone_table,
+        )
+        return
 
-    # Load & validate month (freshness if provided)
-    df = load_month(args.data, month=args.month)
+    xy = None
+    if args.features:
+        # Features + validation reports as materialized by src.feature_store
+        months = month_range(*args.months.split(":")) if args.months else None
+        frame, reports = read_features(
+            args.features, months=months or ([args.month] if args.month else None)
+        )
+        df, (X, y) = None, features_xy(frame)
+        zone_table = _zone_table(args.zone_table, list(reports))
+        xy = (X if zone_table is None else add_zone_features(X, zone_table), y)
+    else:
+        # Load & validate month(s) (freshness if provided)
+        load_kwargs = dict(
+            columns="training",
+            filter_month=args.filter_month,
+            cache=None if args.no_cache else ValidatedCache(args.cache_dir),
+        )
+        if is_multi_month(args.data):
+            months = month_range(*args.months.split(":")) if args.months else None
+            df, reports = load_months(
+                args.data, months=months, max_workers=args.workers, **load_kwargs
+            )
+        else:
+            load_kwargs["filter_month"] = args.filter_month and args.month is not None
+            df, report = load_month(
+                args.data, month=args.month, return_report=True, **load_kwargs
+            )
+            reports = {args.month or Path(args.data).stem: report}
+        zone_table = _zone_table(args.zone_table, list(reports))
 
     # Train + log
+    if args.sweep:
+        train_sweep(
+            df=df,
+            model_name=args.model_name,
+            experiment=args.experiment,
+            space=load_space(args.sweep),
+            algo=args.algo,
+            n_trials=args.sweep_trials,
+            metric=args.sweep_metric,
+            eta=args.eta,
+            min_rows=args.min_rows,
+            max_workers=args.workers,
+            validation_reports=reports,
+            xy=xy,
+            zone_table=zone_table,
+        )
+        return
     train_once(
         df=df,
         model_name=args.model_name,
         experiment=args.experiment,
         algo=args.algo,
+        validation_reports=reports,
+        xy=xy,
+        zone_table=zone_table,
     )
 
 
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .contract_spec import ColumnRule
+
+NUMERIC = ("int", "float", "decimal")
+TEXT = ("char", "string")
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """One ColumnRule lowered to array operations (built by compile_plan)."""
+
+    rule: ColumnRule
+    kind: str  # "int" | "float" | "text" | "timestamp"
+    allowed_lut: Optional[np.ndarray] = None  # bool table indexed by int code
+    allowed_values: Optional[np.ndarray] = None  # fallback for non-code sets
+
+    @property
+    def name(self) -> str:
+        return self.rule.name
+
+    def _in_allowed(self, values: np.ndarray) -> np.ndarray:
+        if self.allowed_lut is not None:
+            top = len(self.allowed_lut) - 1
+            in_range = (values >= 0) & (values <= top)
+            return in_range & self.allowed_lut[np.clip(values, 0, top).astype(np.intp)]
+        return np.isin(values, self.allowed_values)
+
+    def run(self, series: pd.Series) -> tuple[Optional[pd.Series], np.ndarray]:
+        """
+        Same semantics as contract_spec.apply_rule, on plain arrays.
+        Returns (new series or None if unchanged, violation mask).
+        """
+        rule = self.rule
+        if self.kind == "timestamp":
+            return None, np.zeros(len(series), dtype=bool)
+        if self.kind == "text":
+            return self._run_text(series)
+
+        if self.kind == "int":
+            null = series.isna().to_numpy()
+            values = series.to_numpy(dtype="int64", na_value=0)
+        elif self.kind == "float":
+            values = series.to_numpy(dtype="float64", copy=True)
+            null = np.isnan(values)
+
+        changed = False
+        violations = np.zeros(len(values), dtype=bool)
+
+        if rule.default_if_null is not None and null.any():
+            values[null] = rule.default_if_null
+            null = np.zeros_like(null)
+            changed = True
+
+        for bound, is_bad in (
+            (rule.min_val, np.less),
+            (rule.max_val, np.greater),
+        ):
+            if bound is None:
+                continue
+            bad = ~null & is_bad(values, bound)
+            if not bad.any():
+                continue
+            violations |= bad
+            if rule.on_bad in ("coerce_null", "flag"):
+                null = null | bad
+                changed = True
+            elif rule.on_bad == "cap":
+                values[bad] = bound
+                changed = True
+
+        if rule.allowed is not None:
+            bad = ~null & ~self._in_allowed(values)
+            if bad.any():
+                violations |= bad
+                if rule.on_bad in ("coerce_null", "flag"):
+                    null = null | bad
+                    changed = True
+
+        if not changed:
+            return None, violations
+
+        if self.kind == "int":
+            out = pd.arrays.IntegerArray(values, null)
+        else:
+            values[null] = np.nan
+            out = values
+        return pd.Series(out, index=series.index, name=series.name), violations
+
+    def _run_text(self, series: pd.Series) -> tuple[Optional[pd.Series], np.ndarray]:
+        # Work on factorized codes: checks run once per distinct value and the
+        # result is gathered back with a single take(). NA is code -1.
+        rule = self.rule
+        codes, uniques = pd.factorize(series.array)
+        changed = False
+        violations = np.zeros(len(codes), dtype=bool)
+
+        if rule.default_if_null is not None and (codes < 0).any():
+            uniques = pd.array([*uniques, rule.default_if_null], dtype=series.dtype)
+            codes[codes < 0] = len(uniques) - 1
+            changed = True
+
+        if rule.allowed is not None:
+            ok = np.append(np.isin(np.asarray(uniques, dtype=object), self.allowed_values), True)
+            bad = ~ok[codes]  # codes == -1 hits the trailing True
+            if bad.any():
+                violations |= bad
+                if rule.on_bad in ("coerce_null", "flag"):
+                    codes[bad] = -1
+                    changed = True
+
+        if not changed:
+            return None, violations
+        out = uniques.take(codes, allow_fill=True)
+        return pd.Series(out, index=series.index, name=series.name), violations
+
+
+@dataclass(frozen=True)
+class ValidationPlan:
+    """COLUMNS compiled once; apply() runs every rule in a single pass."""
+
+    rules: tuple[CompiledRule, ...]
+
+    def apply(
+        self, df: pd.DataFrame
+    ) -> tuple[pd.DataFrame, np.ndarray, Dict[str, int]]:
+        """
+        Apply all column rules to a dtype-coerced frame.
+        Returns (frame without rows whose required columns are null,
+        is_anomaly for the kept rows, anomalies_by_rule).
+        Counts follow the reference engine: a column's count covers the rows
+        still alive after that column's own required-null drop.
+        """
+        n = len(df)
+        alive = np.ones(n, dtype=bool)
+        is_anomaly = np.zeros(n, dtype=bool)
+        anomalies_by_rule: Dict[str, int] = {}
+        replaced: Dict[str, pd.Series] = {}
+
+        for compiled in self.rules:
+            if compiled.name not in df.columns:
+                continue
+            new, violations = compiled.run(df[compiled.name])
+            if new is not None:
+                replaced[compiled.name] = new
+            if compiled.rule.required:
+                current = new if new is not None else df[compiled.name]
+                alive &= current.notna().to_numpy()
+            count_bad = int(np.count_nonzero(violations & alive))
+            if count_bad > 0:
+                is_anomaly |= violations
+                anomalies_by_rule[compiled.name] = count_bad
+
+        if replaced:
+            df = df.assign(**replaced)
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            df = df.take(keep)
+            is_anomaly = is_anomaly[keep]
+        return df, is_anomaly, anomalies_by_rule
+
+
+def compile_rule(rule: ColumnRule) -> CompiledRule:
+    if rule.dtype == "timestamp":
+        if any(v is not None for v in (rule.min_val, rule.max_val, rule.allowed)):
+            raise ValueError(f"{rule.name}: range/allowed checks on timestamps")
+        return CompiledRule(rule, "timestamp")
+    if rule.dtype in TEXT or rule.dtype not in NUMERIC:
+        if rule.min_val is not None or rule.max_val is not None:
+            raise ValueError(f"{rule.name}: range checks on a text column")
+        allowed = None
+        if rule.allowed is not None:
+            allowed = np.array(list(rule.allowed), dtype=object)
+        return CompiledRule(rule, "text", allowed_values=allowed)
+
+    kind = "int" if rule.dtype == "int" else "float"
+    if rule.allowed is None:
+        return CompiledRule(rule, kind)
+    codes = list(rule.allowed)
+    if all(isinstance(v, (int, np.integer)) and 0 <= v < 4096 for v in codes):
+        lut = np.zeros(max(codes) + 1, dtype=bool)
+        lut[codes] = True
+        if kind == "int":
+            return CompiledRule(rule, kind, allowed_lut=lut)
+    return CompiledRule(rule, kind, allowed_values=np.array(codes))
+
+
+def compile_plan(columns: Sequence[ColumnRule]) -> ValidationPlan:
+    """Lower the contract's ColumnRules into a ValidationPlan."""
+    return ValidationPlan(tuple(compile_rule(c) for c in columns))
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
 
 import pandas as pd
 
-from .contract_spec import COLUMNS, REQUIRED, apply_rule, coerce_dtype
+from .contract_spec import (COLUMNS, REQUIRED, apply_rule, coerce_dtype,
+                            compact_dtypes, to_storage)
+from .dedup import KeySet, duplicate_keys, has_full_key
+from .profiling import collect, merge_timings, span
+from .validation_plan import compile_plan
+
+# COLUMNS compiled once at import; see validation_plan.py
+PLAN = compile_plan(COLUMNS)
+# Storage of the columns validate_dataframe derives; contract columns use
+# ColumnRule.storage
+DERIVED_STORAGE = {"duration_minutes": "Int32", "is_anomaly": "int8"}
 
 
 @dataclass
@@ -17,32 +27,25 @@ class ValidationReport:
     anomalies_by_rule: Dict[str, int]
     freshness_ok: Optional[bool] = None
     latest_dropoff: Optional[str] = None
+    # exact count behind anomaly_rate, so merged chunk reports match a full
+    # pass (None in reports saved before it existed)
+    anomalous_rows: Optional[int] = None
+    # {stage: {"seconds", "calls"[, "peak_mb"]}} when src.profiling is enabled;
+    # wall times of this run, so not part of report equality
+    stage_timings: Optional[Dict[str, dict]] = field(default=None, compare=False)
 
 
-def validate_dataframe(
-    df: pd.DataFrame,
-    month: Optional[str] = None,  # e.g., "2025-03"
-    taxi_zone_ids: Optional[set[int]] = None,  # pass known IDs if you have them
-) -> tuple[pd.DataFrame, ValidationReport]:
-    """
-    Returns (validated_df_with_derivatives, report).
-    Adds: duration_minutes (Int64), is_anomaly (0/1).
-    Drops rows only when required columns are missing or joinability fails.
-    """
-    df = df.copy()
-    len(df)
+def month_window(month: str) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """[start, end) of a "YYYY-MM" month in UTC."""
+    y, m = month.split("-")
+    start = pd.Timestamp(f"{y}-{m}-01", tz="UTC")
+    return start, start + pd.offsets.MonthBegin(1)
 
-    # 1) Required columns present
-    missing = [c for c in REQUIRED if c not in df.columns]
-    if missing:
-        raise ValueError(f"Missing required columns: {missing}")
 
-    # 2) Coerce dtypes per contract
-    for col in COLUMNS:
-        if col.name in df.columns:
-            df[col.name] = coerce_dtype(df, col)
-
-    # 3) Per-column rules & anomaly flags
+def _apply_rules(
+    df: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.Series, Dict[str, int]]:
+    """Reference engine: contract_spec.apply_rule column by column."""
     is_anomaly = pd.Series(False, index=df.index)
     anomalies_by_rule: Dict[str, int] = {}
 
@@ -65,46 +68,141 @@ def validate_dataframe(
             is_anomaly = is_anomaly.reindex(df.index, fill_value=False) | badmask
             anomalies_by_rule[col.name] = count_bad
 
-    # 4) Joinability checks (if zone set supplied)
-    if taxi_zone_ids is not None:
-        pu_bad = ~df["PULocationID"].isin(taxi_zone_ids)
-        do_bad = ~df["DOLocationID"].isin(taxi_zone_ids)
-        drop_mask = pu_bad | do_bad
-        if drop_mask.any():
-            df = df.loc[~drop_mask].copy()
-            anomalies_by_rule["joinability_drop"] = int(drop_mask.sum())
-            is_anomaly = is_anomaly.loc[df.index]
-
-    # 5) Duration + additional rules
-    dur = (
-        df["tpep_dropoff_datetime"] - df["tpep_pickup_datetime"]
-    ).dt.total_seconds() / 60.0
-    df["duration_minutes"] = pd.to_numeric(dur, errors="coerce").round().astype("Int64")
-    dur_bad = (
-        df["duration_minutes"].isna()
-        | (df["duration_minutes"] < 1)
-        | (df["duration_minutes"] > 720)
-    )
-    if dur_bad.any():
-        is_anomaly = is_anomaly | dur_bad
-        anomalies_by_rule["duration_minutes"] = int(dur_bad.sum())
+    return df, is_anomaly, anomalies_by_rule
 
-    df["is_anomaly"] = is_anomaly.astype(int)
 
-    # 6) Freshness check (optional, based on month)
+def freshness(df: pd.DataFrame, month: Optional[str]) -> tuple[Optional[bool], Optional[str]]:
+    """(freshness_ok, latest_dropoff) of a validated frame."""
     freshness_ok = None
     latest_dropoff = None
     if "tpep_dropoff_datetime" in df.columns and not df.empty:
         latest_dropoff = str(df["tpep_dropoff_datetime"].max())
         if month:
             # consider fresh if any dropoff falls within that YYYY-MM month window
-            y, m = month.split("-")
-            start = pd.Timestamp(f"{y}-{m}-01", tz="UTC")
-            end = start + pd.offsets.MonthBegin(1)
+            start, end = month_window(month)
             in_window = (df["tpep_dropoff_datetime"] >= start) & (
                 df["tpep_dropoff_datetime"] < end
             )
             freshness_ok = bool(in_window.any())
+    return freshness_ok, latest_dropoff
+
+
+def validate_dataframe(
+    df: pd.DataFrame,
+    month: Optional[str] = None,  # e.g., "2025-03"
+    taxi_zone_ids: Optional[set[int]] = None,  # pass known IDs if you have them
+    copy: bool = True,  # False when the caller owns df (e.g. a streamed chunk)
+    engine: str = "plan",  # "plan" (compiled) | "rules" (reference, per column)
+    compact: bool = True,  # cast to the contract's storage dtypes (compact_frame)
+    dedup: bool = False,  # check for repeated primary keys (src.dedup)
+    keys: Optional[KeySet] = None,  # keys seen in earlier chunks / months
+) -> tuple[pd.DataFrame, ValidationReport]:
+    """
+    Returns (validated_df_with_derivatives, report).
+    Adds: duration_minutes and is_anomaly (0/1), as Int32 and int8 with
+    compact (DERIVED_STORAGE) or Int64 and int64 without.
+    Drops rows only when required columns are missing or joinability fails.
+    With compact (default) the frame is returned in the storage dtypes; the
+    checks themselves always run on the wide coerced dtypes.
+    With dedup, rows whose primary key (dedup.PRIMARY_KEY) was already seen,
+    in this frame or in `keys` when streaming, are counted as
+    "duplicate_key" and `keys` is updated in place. They are dropped only
+    when the frame has the full key (_ingest_rowid included); with the
+    partial key they are flagged as anomalies and kept.
+    With src.profiling enabled, report.stage_timings holds each step's span.
+    """
+    with collect() as timings:
+        if not dedup:
+            keys = None
+        elif keys is None:
+            keys = KeySet()
+        df, report = _validate(df, month, taxi_zone_ids, copy, engine, keys)
+        if compact:
+            with span("validate.compact"):
+                df = compact_frame(df)
+    report.stage_timings = timings or None
+    return df, report
+
+
+def _validate(
+    df: pd.DataFrame,
+    month: Optional[str],
+    taxi_zone_ids: Optional[set[int]],
+    copy: bool,
+    engine: str,
+    keys: Optional[KeySet],
+) -> tuple[pd.DataFrame, ValidationReport]:
+    if copy:
+        df = df.copy()
+
+    # 1) Required columns present
+    with span("validate.required"):
+        missing = [c for c in REQUIRED if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    # 2) Coerce dtypes per contract
+    with span("validate.coerce"):
+        for col in COLUMNS:
+            if col.name in df.columns:
+                df[col.name] = coerce_dtype(df, col)
+
+    # 3) Per-column rules & anomaly flags
+    with span("validate.rules"):
+        if engine == "plan":
+            df, flags, anomalies_by_rule = PLAN.apply(df)
+            is_anomaly = pd.Series(flags, index=df.index)
+        elif engine == "rules":
+            df, is_anomaly, anomalies_by_rule = _apply_rules(df)
+        else:
+            raise ValueError("engine must be 'plan' or 'rules'")
+
+    # 4) Joinability checks (if zone set supplied)
+    with span("validate.joinability"):
+        if taxi_zone_ids is not None:
+            pu_bad = ~df["PULocationID"].isin(taxi_zone_ids)
+            do_bad = ~df["DOLocationID"].isin(taxi_zone_ids)
+            drop_mask = pu_bad | do_bad
+            if drop_mask.any():
+                df = df.loc[~drop_mask].copy()
+                anomalies_by_rule["joinability_drop"] = int(drop_mask.sum())
+                is_anomaly = is_anomaly.loc[df.index]
+
+        # rows dropped above may not have been carried into is_anomaly yet
+        is_anomaly = is_anomaly.reindex(df.index, fill_value=False)
+
+    # 4b) Primary-key dedup across the frame (and earlier chunks / months)
+    if keys is not None:
+        with span("validate.dedup"):
+            duplicate = duplicate_keys(df, keys)
+            if duplicate.any():
+                anomalies_by_rule["duplicate_key"] = int(duplicate.sum())
+                if has_full_key(df):
+                    df = df.loc[~duplicate]
+                    is_anomaly = is_anomaly.loc[df.index]
+                else:
+                    is_anomaly = is_anomaly | pd.Series(duplicate, index=df.index)
+
+    # 5) Duration + additional rules
+    with span("validate.duration"):
+        dur = (
+            df["tpep_dropoff_datetime"] - df["tpep_pickup_datetime"]
+        ).dt.total_seconds() / 60.0
+        df["duration_minutes"] = pd.to_numeric(dur, errors="coerce").round().astype("Int64")
+        dur_bad = (
+            df["duration_minutes"].isna()
+            | (df["duration_minutes"] < 1)
+            | (df["duration_minutes"] > 720)
+        )
+        if dur_bad.any():
+            is_anomaly = is_anomaly | dur_bad
+            anomalies_by_rule["duration_minutes"] = int(dur_bad.sum())
+
+        df["is_anomaly"] = is_anomaly.astype(int)
+
+    # 6) Freshness check (optional, based on month)
+    with span("validate.freshness"):
+        freshness_ok, latest_dropoff = freshness(df, month)
 
     report = ValidationReport(
         rows=len(df),
@@ -114,10 +212,83 @@ def validate_dataframe(
         anomalies_by_rule=anomalies_by_rule,
         freshness_ok=freshness_ok,
         latest_dropoff=latest_dropoff,
+        anomalous_rows=int(df["is_anomaly"].sum()),
     )
     return df, report
 
 
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """A validated frame in ColumnRule.storage / DERIVED_STORAGE dtypes."""
+    df = compact_dtypes(df)
+    derived = {c: to_storage(df[c], dtype) for c, dtype in DERIVED_STORAGE.items() if c in df.columns}
+    return df.assign(**derived)
+
+
+def validate_chunks(
+    chunks: Iterable[pd.DataFrame],
+    month: Optional[str] = None,
+    taxi_zone_ids: Optional[set[int]] = None,
+    dedup: bool = False,
+    keys: Optional[KeySet] = None,
+) -> Iterable[tuple[pd.DataFrame, ValidationReport]]:
+    """
+    Streaming mode: validate raw chunks one at a time with the same rules as
+    validate_dataframe and yield (clean_chunk, chunk_report).
+    Every rule is row-local and the dedup key set is shared by all chunks
+    (or passed in as `keys`, e.g. across months), so merge_reports() over
+    the chunk reports gives the same month report as validating the
+    concatenated frame.
+    """
+    if dedup and keys is None:
+        keys = KeySet()
+    for chunk in chunks:
+        yield validate_dataframe(
+            chunk, month=month, taxi_zone_ids=taxi_zone_ids, copy=False, dedup=dedup, keys=keys
+        )
+
+
+def merge_reports(reports: Iterable[ValidationReport]) -> ValidationReport:
+    """
+    Combine per-chunk reports into one report.
+    Counts (anomalous_rows included) are summed and anomaly_rate is
+    recomputed from them, freshness is OR-ed across chunks, latest_dropoff
+    is the max over chunks and stage_timings are summed per stage.
+    """
+    rows = 0
+    anomalous = 0
+    anomalies_by_rule: Dict[str, int] = {}
+    freshness: list[bool] = []
+    latest: Optional[pd.Timestamp] = None
+    timings: list[Optional[dict]] = []
+
+    for rep in reports:
+        rows += rep.rows
+        if rep.anomalous_rows is not None:
+            anomalous += rep.anomalous_rows
+        else:
+            anomalous += int(round(rep.anomaly_rate * rep.rows))
+        for rule, count in rep.anomalies_by_rule.items():
+            anomalies_by_rule[rule] = anomalies_by_rule.get(rule, 0) + count
+        if rep.freshness_ok is not None:
+            freshness.append(rep.freshness_ok)
+        if rep.latest_dropoff is not None:
+            ts = pd.Timestamp(rep.latest_dropoff)
+            latest = ts if latest is None else max(latest, ts)
+        timings.append(rep.stage_timings)
+
+    return ValidationReport(
+        rows=rows,
+        required_columns_present=True,
+        missing_columns=[],
+        anomaly_rate=anomalous / rows if rows else 0.0,
+        anomalies_by_rule=anomalies_by_rule,
+        freshness_ok=any(freshness) if freshness else None,
+        latest_dropoff=str(latest) if latest is not None else None,
+        anomalous_rows=anomalous,
+        stage_timings=merge_timings(*timings),
+    )
+
+
 # --- CLI entrypoint (optional) ---
 if __name__ == "__main__":
     import argparse
@@ -128,14 +299,25 @@ if __name__ == "__main__":
     )
     parser.add_argument("path", help="CSV or Parquet file")
     parser.add_argument("--month", help="YYYY-MM expected month window", default=None)
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Validate in chunks of this many rows (bounded memory)",
+    )
     args = parser.parse_args()
 
-    if args.path.lower().endswith(".parquet"):
-        data = pd.read_parquet(args.path)
-    else:
-        data = pd.read_csv(args.path)
+    from .data import iter_raw_chunks
 
-    valid_df, rep = validate_dataframe(data, month=args.month)
+    if args.chunksize:
+        chunks = iter_raw_chunks(args.path, chunksize=args.chunksize)
+        rep = merge_reports(r for _, r in validate_chunks(chunks, month=args.month))
+    else:
+        if args.path.lower().endswith(".parquet"):
+            data = pd.read_parquet(args.path)
+        else:
+            data = pd.read_csv(args.path)
+        valid_df, rep = validate_dataframe(data, month=args.month)
     print(json.dumps(rep.__dict__, indent=2))
     # Optionally save outputs:
     # valid_df.to_parquet("validated.parquet")
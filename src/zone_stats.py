@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+# TLC zone IDs are 1..265 (264/265 = unknown); row/column 0 stays empty
+N_ZONES = 266
+FORMAT_VERSION = 1
+ZONE_FEATURES = [
+    "pair_trips",
+    "pair_median_distance",
+    "pair_median_minutes",
+    "pair_high_total_rate",
+]
+# Fixed histogram bins (lower edges; the last bin is open) for the medians
+DISTANCE_EDGES = np.array(
+    [0, 0.5, 1, 1.5, 2, 2.5, 3, 4, 5, 6, 7, 8, 10, 12, 15, 18, 21, 25, 30, 40, 50, 75, 100, 200],
+    dtype=np.float64,
+)
+MINUTES_EDGES = np.array(
+    [0, 2, 4, 6, 8, 10, 12, 15, 18, 21, 25, 30, 35, 40, 50, 60, 75, 90, 120, 180, 240, 360, 720],
+    dtype=np.float64,
+)
+# Pseudo-trips pulling sparse pairs' high-total rate toward the global rate
+RATE_PRIOR_TRIPS = 10.0
+_STATE = ("trips", "high", "distance_hist", "minutes_hist")
+
+
+def _pair_index(pu: np.ndarray, do: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Flat (PU, DO) cell per row and a mask of rows with IDs inside the table."""
+    pu = np.asarray(pu, dtype=np.int64)
+    do = np.asarray(do, dtype=np.int64)
+    ok = (pu >= 0) & (pu < N_ZONES) & (do >= 0) & (do < N_ZONES)
+    return np.where(ok, pu * N_ZONES + do, 0), ok
+
+
+def _bin(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    return np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 1)
+
+
+def _hist_median(hist: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Median per cell from (..., bins) counts, interpolated inside its bin."""
+    total = hist.sum(axis=-1)
+    cum = np.cumsum(hist, axis=-1)
+    half = total / 2.0
+    k = np.minimum((cum < half[..., None]).sum(axis=-1), len(edges) - 1)
+    below = np.take_along_axis(cum, k[..., None], -1)[..., 0] - np.take_along_axis(hist, k[..., None], -1)[..., 0]
+    inside = np.take_along_axis(hist, k[..., None], -1)[..., 0]
+    upper = np.append(edges[1:], edges[-1])  # open last bin: report its edge
+    frac = np.divide(half - below, inside, out=np.zeros(half.shape), where=inside > 0)
+    median = edges[k] + frac * (upper[k] - edges[k])
+    return np.where(total > 0, median, 0.0)
+
+
+class ZoneStats:
+    """
+    Additive per-(PU, DO) state: trip and high-total counts plus fixed-bin
+    histograms of distance and duration. Months are added with update();
+    table() turns the state into the dense lookup table.
+    """
+
+    def __init__(self):
+        self.trips = np.zeros((N_ZONES, N_ZONES), dtype=np.int64)
+        self.high = np.zeros((N_ZONES, N_ZONES), dtype=np.int64)
+        self.distance_hist = np.zeros((N_ZONES, N_ZONES, len(DISTANCE_EDGES)), dtype=np.uint32)
+        self.minutes_hist = np.zeros((N_ZONES, N_ZONES, len(MINUTES_EDGES)), dtype=np.uint32)
+        self.sources: dict[str, str] = {}  # month key -> file digest
+
+    def update(self, df) -> None:
+        """Add the trips of a validated, labeled frame (see add_label)."""
+        cell, ok = _pair_index(df["PULocationID"].to_numpy(), df["DOLocationID"].to_numpy())
+        cell = cell[ok]
+        cells = N_ZONES * N_ZONES
+        self.trips += np.bincount(cell, minlength=cells).reshape(N_ZONES, N_ZONES)
+        high = df["HIGH_TOTAL"].to_numpy()[ok]
+        self.high += np.bincount(cell, weights=high, minlength=cells).astype(np.int64).reshape(N_ZONES, N_ZONES)
+
+        distance = df["trip_distance"].astype("float64").to_numpy(na_value=np.nan)[ok]
+        minutes = df["duration_minutes"].astype("float64").to_numpy(na_value=np.nan)[ok]
+        for values, edges, hist in (
+            (distance, DISTANCE_EDGES, self.distance_hist),
+            (minutes, MINUTES_EDGES, self.minutes_hist),
+        ):
+            known = ~np.isnan(values)
+            flat = cell[known] * len(edges) + _bin(values[known], edges)
+            hist += np.bincount(flat, minlength=hist.size).reshape(hist.shape).astype(np.uint32)
+
+    def table(self) -> np.ndarray:
+        """(N_ZONES, N_ZONES, len(ZONE_FEATURES)) float32 lookup table."""
+        trips = self.trips.astype(np.float64)
+        prior = self.high.sum() / max(trips.sum(), 1.0)
+        out = np.zeros((N_ZONES, N_ZONES, len(ZONE_FEATURES)), dtype=np.float32)
+        out[..., 0] = trips
+        out[..., 1] = _hist_median(self.distance_hist, DISTANCE_EDGES)
+        out[..., 2] = _hist_median(self.minutes_hist, MINUTES_EDGES)
+        out[..., 3] = (self.high + RATE_PRIOR_TRIPS * prior) / (trips + RATE_PRIOR_TRIPS)
+        return out
+
+    def save(self, path: str | Path) -> None:
+        """state.npz (for later updates), table.npy (for lookups), meta.json."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.savez(path / ".state.tmp.npz", **{name: getattr(self, name) for name in _STATE})
+        os.replace(path / ".state.tmp.npz", path / "state.npz")
+        np.save(path / ".table.tmp.npy", self.table())
+        os.replace(path / ".table.tmp.npy", path / "table.npy")
+        meta = {"format_version": FORMAT_VERSION, "features": ZONE_FEATURES, "sources": self.sources}
+        (path / "meta.json").write_text(json.dumps(meta, indent=2, sort_keys=True))
+
+
+def load_zone_stats(path: str | Path) -> ZoneStats:
+    """State saved by ZoneStats.save, or an empty ZoneStats if there is none."""
+    path = Path(path)
+    stats = ZoneStats()
+    if not (path / "meta.json").exists():
+        return stats
+    meta = json.loads((path / "meta.json").read_text())
+    if meta["format_version"] != FORMAT_VERSION:
+        raise ValueError(f"{path} has format {meta['format_version']}, expected {FORMAT_VERSION}")
+    with np.load(path / "state.npz") as state:
+        for name in _STATE:
+            setattr(stats, name, state[name])
+    stats.sources = meta["sources"]
+    return stats
+
+
+def load_zone_table(
+    path: str | Path,
+    mmap: bool = True,
+    training_months: Optional[Sequence[str]] = None,
+) -> np.ndarray:
+    """
+    The lookup table (a zone_stats dir or a .npy file), memory-mapped read-only.
+    pair_high_total_rate is built from labels, so a table that includes any
+    of training_months would leak them into training: that is refused, as is
+    a bare .npy whose source months are not recorded.
+    """
+    path = Path(path)
+    if path.is_dir():
+        path = path / "table.npy"
+    if training_months is not None:
+        meta = path.parent / "meta.json"
+        if path.name != "table.npy" or not meta.exists():
+            raise ValueError(f"{path} has no recorded source months; pass its zone_stats directory")
+        overlap = sorted(set(json.loads(meta.read_text())["sources"]) & set(training_months))
+        if overlap:
+            raise ValueError(
+                f"{path.parent} was built from training months {overlap}; "
+                "rebuild it from months before the training window"
+            )
+    table = np.load(path, mmap_mode="r" if mmap else None)
+    if table.shape != (N_ZONES, N_ZONES, len(ZONE_FEATURES)):
+        raise ValueError(f"{path} has shape {table.shape}, expected a zone-pair table")
+    return table
+
+
+def zone_features(table: np.ndarray, pu: np.ndarray, do: np.ndarray) -> np.ndarray:
+    """(n, len(ZONE_FEATURES)) lookups; unknown zone IDs get all zeros."""
+    cell, ok = _pair_index(pu, do)
+    out = table.reshape(N_ZONES * N_ZONES, -1)[cell]
+    out[~ok] = 0
+    return out
+
+
+def add_zone_features(X: np.ndarray, table: np.ndarray, pu_col: int = 4, do_col: int = 5) -> np.ndarray:
+    """X (FEATURE_NAMES order) with the ZONE_FEATURES columns appended."""
+    extra = zone_features(table, X[:, pu_col], X[:, do_col])
+    return np.hstack([X, extra.astype(X.dtype, copy=False)])
+
+
+def update_zone_stats(
+    sources: Sequence[tuple[str | Path, Optional[str]]],
+    path: str | Path = "zone_stats",
+    filter_month: bool = False,
+) -> dict:
+    """
+    Fold validated months into the state at `path` and rewrite the table.
+    Months already included (same file digest) are skipped. The counts are
+    additive, so a changed month (a backfill) cannot be swapped in place:
+    rebuild from an empty directory in that case.
+    """
+    from .cache import file_digest
+    from .data import add_label, load_month
+
+    stats = load_zone_stats(path)
+    added, skipped = [], []
+    for source, month in sources:
+        key = month or Path(source).stem
+        digest = file_digest(source)
+        if key in stats.sources:
+            if stats.sources[key] != digest:
+                raise ValueError(f"{key} changed since it was added to {path}; rebuild the zone stats")
+            skipped.append(key)
+            continue
+        df = load_month(
+            source, month=month, columns="training", filter_month=filter_month and month is not None
+        )
+        stats.update(add_label(df))
+        stats.sources[key] = digest
+        added.append(key)
+    if added or not (Path(path) / "table.npy").exists():
+        stats.save(path)
+    return {"added": added, "skipped": skipped, "months": sorted(stats.sources)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build or extend the PU/DO zone-pair aggregate table"
+    )
+    parser.add_argument(
+        "--data",
+        required=True,
+        help="CSV/Parquet month file, a glob, or a template with {month}",
+    )
+    parser.add_argument("--month", help="YYYY-MM for a single file")
+    parser.add_argument("--months", help="Month range FIRST:LAST for globs / templates")
+    parser.add_argument("--out", default="zone_stats", help="Zone stats directory")
+    parser.add_argument(
+        "--filter-month",
+        action="store_true",
+        help="Drop pickups outside each month before validating",
+    )
+    args = parser.parse_args()
+
+    from .data import is_multi_month, month_range, resolve_month_paths
+
+    if is_multi_month(args.data):
+        months = month_range(*args.months.split(":")) if args.months else None
+        sources = resolve_month_paths(args.data, months)
+    else:
+        sources = [(args.data, args.month)]
+    print(json.dumps(update_zone_stats(sources, args.out, filter_month=args.filter_month), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from joblib import dump
+from sklearn.ensemble import RandomForestClassifier
+
+from src.features import FEATURE_NAMES
+
+
+@pytest.fixture
+def messy_df():
+    return pd.DataFrame(
+        {
+            "VendorID": [2, 2, 1, 6, 7, 2, 1],
+            "tpep_pickup_datetime": [
+                "2025-03-01T08:00:00Z",
+                "2025-03-01T08:10:00Z",
+                "not-a-date",
+                "2025-03-04T20:30:00Z",
+                "2025-03-05T07:10:00Z",
+                "2025-03-06T13:05:00Z",
+                "2025-02-28T23:50:00Z",
+            ],
+            "tpep_dropoff_datetime": [
+                "2025-03-01T08:05:00Z",
+                "2025-03-01T20:10:00Z",
+                "2025-03-03T10:25:00Z",
+                "2025-03-04T20:30:30Z",
+                "2025-03-05T07:40:00Z",
+                "2025-03-06T13:50:00Z",
+                "2025-03-01T00:20:00Z",
+            ],
+            "PULocationID": [142, 100, 142, 130, 236, 148, 999],
+            "DOLocationID": [236, 236, 236, 236, 140, 236, 236],
+            "passenger_count": [1, -5, 2, None, 2, 9, 1],
+            "trip_distance": [3.2, -1.0, 7.5, 5.0, 250.0, 18.0, 1.1],
+            "RatecodeID": [1, 77, None, 1, 2, 3, 99],
+            "store_and_fwd_flag": ["N", "Z", " y", None, "N", "N", "N"],
+            "payment_type": [1, 9, 1, 1, None, 1, 2],
+            "fare_amount": [12.5, -2.0, 28.0, 15.0, 28.5, 32.0, 7.0],
+            "extra": [0.5, 0.0, 0.5, 0.5, -0.5, 0.5, 0.0],
+            "mta_tax": [0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5],
+            "tip_amount": [2.0, 0.0, 5.0, 3.0, 6.0, 8.0, 0.0],
+            "tolls_amount": [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+            "improvement_surcharge": [0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.3],
+            "congestion_surcharge": [2.75, 2.75, 2.75, 2.75, 2.75, 2.75, 2.75],
+            "total_amount": [18.05, -1.0, 40.05, 21.05, 38.55, 44.05, 10.55],
+        }
+    )
+
+
+@pytest.fixture
+def trip():
+    """One /predict payload (every request-time field set)."""
+    return {
+        "VendorID": 2,
+        "tpep_pickup_datetime": "2025-03-01T08:00:00Z",
+        "PULocationID": 142,
+        "DOLocationID": 236,
+        "passenger_count": 1,
+        "trip_distance": 3.2,
+        "RatecodeID": 1,
+        "payment_type": 1,
+    }
+
+
+@pytest.fixture
+def write_model(tmp_path):
+    """write_model(name, seed): a tiny forest saved as <tmp>/<name>.pkl plus its feature schema."""
+
+    def write(name="test", seed=0):
+        rng = np.random.default_rng(seed)
+        X = rng.random((200, len(FEATURE_NAMES))).astype(np.float32)
+        y = (X[:, seed % 4] > 0.5).astype(int)
+        model = RandomForestClassifier(n_estimators=5, random_state=seed).fit(X, y)
+        dump(model, tmp_path / f"{name}.pkl")
+        schema = {"feature_names": FEATURE_NAMES, "n_features": len(FEATURE_NAMES)}
+        (tmp_path / f"{name}_feature_schema.json").write_text(json.dumps(schema))
+        return model
+
+    return write
+
+
+@pytest.fixture
+def model_dir(tmp_path, write_model):
+    """The "test" model from write_model: (<tmp>, fitted forest)."""
+    return tmp_path, write_model()
+
+
+@pytest.fixture
+def client(model_dir, monkeypatch):
+    """TestClient for api.main serving the model_dir model."""
+    import api.main as api_main
+    from fastapi.testclient import TestClient
+
+    path, _ = model_dir
+    monkeypatch.setattr(api_main, "MODEL_DIR", str(path))
+    monkeypatch.setattr(api_main, "MODEL_NAME", "test")
+    with TestClient(api_main.app) as c:
+        yield c
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as api_main
+from api.batching import MicroBatcher
+from src.features import build_feature_vector
+
+
+def test_health_reports_loaded_model(client):
+    body = client.get("/health").json()
+    assert body["model_loaded"] is True
+    assert body["model_name"] == "test"
+    assert body["model_format"] == "pickle"
+    assert body["load_seconds"] > 0 and body["load_error"] is None
+
+
+def test_api_import_does_not_pull_in_pandas_or_sklearn():
+    code = "import sys, api.main; print(sorted(m for m in ('pandas', 'pyarrow', 'sklearn') if m in sys.modules))"
+    root = Path(__file__).resolve().parents[1]
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root)
+    assert out.stdout.strip() == "[]"
+
+
+def test_predict_scores_with_the_loaded_model(client, model_dir, trip):
+    _, model = model_dir
+    resp = client.post("/predict", json=trip)
+    assert resp.status_code == 200
+    expected = model.predict_proba(build_feature_vector(trip)[None, :])[0, 1]
+    assert resp.json()["score"] == pytest.approx(expected)
+    assert b"predict_batch_size" in client.get("/metrics").content
+
+
+def test_predict_without_model_is_503(tmp_path, monkeypatch, trip):
+    monkeypatch.setattr(api_main, "MODEL_DIR", str(tmp_path))
+    with TestClient(api_main.app) as c:
+        health = c.get("/health").json()
+        assert health["model_loaded"] is False and health["load_error"]
+        assert c.post("/predict", json=trip).status_code == 503
+
+
+def test_micro_batcher_gathers_concurrent_requests():
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return X[:, 0] * 2
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_s=0.05)
+        await batcher.start()
+        rows = [np.array([float(i), 0.0]) for i in range(20)]
+        scores = await asyncio.gather(*(batcher.submit(r) for r in rows))
+        await batcher.stop()
+        return scores
+
+    scores = asyncio.run(scenario())
+    assert scores == [2.0 * i for i in range(20)]
+    assert calls == [8, 8, 4]
+
+
+def test_micro_batcher_propagates_errors():
+    def predict(X):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_wait_s=0.001)
+        await batcher.start()
+        try:
+            with pytest.raises(RuntimeError):
+                await batcher.submit(np.zeros(2))
+        finally:
+            await batcher.stop()
+
+    asyncio.run(scenario())
+
+
+def _bulk_records(trip):
+    rows = []
+    for i in range(7):
+        row = dict(trip, trip_distance=float(i), tpep_dropoff_datetime="2025-03-01T08:20:00Z")
+        rows.append(row)
+    rows[4]["VendorID"] = None  # required -> dropped by validation
+    return rows
+
+
+def _expected_scores(model, rows):
+    from src.features import build_feature_matrix
+    from src.validator import validate_dataframe
+
+    import pandas as pd
+
+    valid, _ = validate_dataframe(pd.DataFrame(rows), dedup=False)
+    return dict(zip(valid.index, model.predict_proba(build_feature_matrix(valid))[:, 1]))
+
+
+def test_predict_batch_ndjson_streams_one_line_per_row(client, model_dir, monkeypatch, trip):
+    _, model = model_dir
+    monkeypatch.setattr(api_main, "BULK_CHUNK_ROWS", 3)
+    rows = _bulk_records(trip)
+    body = "\n".join(json.dumps(r) for r in rows)
+    resp = client.post("/predict_batch", content=body, headers={"content-type": "application/x-ndjson"})
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["row"] for line in lines] == list(range(len(rows)))
+    expected = _expected_scores(model, rows)
+    for line in lines:
+        if line["row"] == 4:
+            assert line["score"] is None and "error" in line
+        else:
+            assert line["score"] == pytest.approx(expected[line["row"]])
+
+
+def test_predict_batch_arrow_stream(client, model_dir, monkeypatch, trip):
+    import pandas as pd
+    import pyarrow as pa
+
+    _, model = model_dir
+    monkeypatch.setattr(api_main, "BULK_CHUNK_ROWS", 2)
+    rows = [r for r in _bulk_records(trip) if r["VendorID"] is not None]
+    table = pa.Table.from_pandas(pd.DataFrame(rows), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=4):
+            writer.write_batch(batch)
+    resp = client.post(
+        "/predict_batch",
+        content=sink.getvalue().to_pybytes(),
+        headers={"content-type": "application/vnd.apache.arrow.stream"},
+    )
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    expected = _expected_scores(model, rows)
+    assert [line["score"] for line in lines] == pytest.approx([expected[i] for i in range(len(rows))])
+
+
+def test_predict_batch_accepts_predict_payloads(client, trip):
+    required_only = {k: trip[k] for k in ("VendorID", "tpep_pickup_datetime", "PULocationID", "DOLocationID")}
+    trips = [trip, required_only]  # no dropoff, as /predict takes them
+    singles = [client.post("/predict", json=t).json()["score"] for t in trips]
+    body = "\n".join(json.dumps(t) for t in trips)
+    resp = client.post("/predict_batch", content=body, headers={"content-type": "application/x-ndjson"})
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["score"] for line in lines] == pytest.approx(singles)
+    assert [line["is_anomaly"] for line in lines] == [0, 0]
+
+    bad = client.post("/predict_batch", content=b"{not json", headers={"content-type": "application/x-ndjson"})
+    assert bad.status_code == 400
+
+
+def test_arrow_chunks_decode_before_the_body_ends():
+    import anyio
+    import pandas as pd
+    import pyarrow as pa
+
+    from api.bulk import iter_arrow_chunks
+
+    table = pa.Table.from_pandas(pd.DataFrame({"x": range(30)}), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=10):
+            writer.write_batch(batch)
+    payload = sink.getvalue().to_pybytes()
+    sent = []
+
+    async def body():
+        for start in range(0, len(payload), 64):
+            sent.append(start)
+            yield payload[start:start + 64]
+
+    async def first_chunk_then_rest():
+        chunks = iter_arrow_chunks(body(), chunk_rows=4)
+        first = await chunks.__anext__()
+        consumed = len(sent)
+        rest = [df async for df in chunks]
+        return first, consumed, rest
+
+    first, consumed, rest = anyio.run(first_chunk_then_rest)
+    assert first["x"].tolist() == [0, 1, 2, 3] and consumed < len(sent)
+    assert pd.concat([first, *rest])["x"].tolist() == list(range(30))
+
+
+def test_predict_batch_rejects_unknown_content_type(client):
+    assert client.post("/predict_batch", content=b"{}", headers={"content-type": "text/csv"}).status_code == 415
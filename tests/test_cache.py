@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+
+from src.cache import ValidatedCache, contract_fingerprint
+from src.contract_spec import COLUMNS, ColumnRule
+from src.data import load_month
+
+
+def test_second_load_is_served_from_cache(tmp_path, messy_df, monkeypatch):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    cache = ValidatedCache(tmp_path / "cache")
+
+    first, first_rep = load_month(path, month="2025-03", cache=cache, return_report=True)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr("src.data.validate_dataframe", fail)
+    second, second_rep = load_month(path, month="2025-03", cache=cache, return_report=True)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert first_rep == second_rep
+
+
+def test_file_or_contract_change_misses(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    cache = ValidatedCache(tmp_path / "cache")
+    load_month(path, cache=cache)
+    key = cache.key(path, month=None, taxi_zone_ids=None, columns=None, filter_month=False)
+    assert cache.get(key) is not None
+
+    messy_df.iloc[:3].to_csv(path, index=False)
+    assert cache.key(path, month=None, taxi_zone_ids=None, columns=None, filter_month=False) != key
+
+    changed = [*COLUMNS[:-1], ColumnRule("total_amount", False, "decimal", True, min_val=1.0)]
+    assert contract_fingerprint(changed) != contract_fingerprint()
+    new_contract = ValidatedCache(tmp_path / "cache", fingerprint=contract_fingerprint(changed))
+    assert new_contract.get(key) is None
+    assert not (tmp_path / "cache" / key).exists()
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path, messy_df):
+    cache = ValidatedCache(tmp_path / "cache")
+    df, rep = load_month(_write(tmp_path, "a", messy_df), return_report=True)
+    cache.put("a", df, rep)
+    cache.put("b", df, rep)
+    entry_size = sum(f.stat().st_size for f in (tmp_path / "cache" / "a").iterdir())
+    os.utime(tmp_path / "cache" / "a" / "meta.json", (1, 1))
+    os.utime(tmp_path / "cache" / "b" / "meta.json", (2, 2))
+    assert cache.get("a") is not None  # "a" becomes most recent
+
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+    cache.put("c", df, rep)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def _write(tmp_path, name, df):
+    path = tmp_path / f"{name}.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_scan_skips_entries_removed_by_another_process(tmp_path, messy_df):
+    cache = ValidatedCache(tmp_path / "cache", max_bytes=0)
+    df, rep = load_month(_write(tmp_path, "a", messy_df), return_report=True)
+    in_progress = tmp_path / "cache" / ".b.tmp"
+    in_progress.mkdir(parents=True)
+    (in_progress / "meta.json").write_text("{}")
+
+    listed = cache._entries
+    cache._entries = lambda: listed() + [tmp_path / "cache" / "gone"]  # evicted after the listing
+    cache.put("a", df, rep)  # prune_stale + evict over the vanished entry
+    assert in_progress.exists()  # another writer's entry is not ours to evict
+    assert cache.get("gone") is None
@@ -0,0 +1,59 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import api.main as api_main
+from api.capture import RequestCapture, capture_files, iter_captures
+from benchmarks.replay import replay
+
+TRIP = {
+    "VendorID": 2,
+    "tpep_pickup_datetime": "2025-03-01T08:00:00Z",
+    "PULocationID": 142,
+    "DOLocationID": 236,
+}
+
+
+def test_capture_rotates_and_keeps_newest(tmp_path):
+    capture = RequestCapture(tmp_path, sample_rate=1.0, max_bytes=2000, max_files=3)
+    for i in range(100):
+        capture.offer({"i": i}, 0.5, 0.001, "m")
+    capture.close()
+    files = capture_files(tmp_path)
+    assert len(files) == 3
+    seen = [r["payload"]["i"] for r in iter_captures(tmp_path)]
+    assert seen == list(range(100 - len(seen), 100))  # oldest files rotated away
+
+    none = RequestCapture(tmp_path / "off", sample_rate=0.0)
+    none.offer({"i": 0}, 0.5, 0.001)
+    none.close()
+    assert not (tmp_path / "off").exists()
+
+
+def test_api_captures_requests_for_replay(model_dir, monkeypatch, tmp_path):
+    path, _ = model_dir
+    monkeypatch.setattr(api_main, "MODEL_DIR", str(path))
+    monkeypatch.setattr(api_main, "MODEL_NAME", "test")
+    monkeypatch.setattr(api_main, "CAPTURE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(api_main, "CAPTURE_DIR", str(tmp_path))
+    with TestClient(api_main.app) as client:
+        scores = [client.post("/predict", json={**TRIP, "PULocationID": pu}).json()["score"] for pu in (1, 2, 3)]
+    records = list(iter_captures(tmp_path))  # the writer is flushed on shutdown
+    assert [r["payload"]["PULocationID"] for r in records] == [1, 2, 3]
+    assert [r["score"] for r in records] == scores
+    assert records[0]["model"] == "test" and records[0]["payload"]["passenger_count"] is None
+
+
+def test_replay_reports_percentiles_and_errors():
+    async def send(payload):
+        await asyncio.sleep(0.002)
+        return payload["ok"]
+
+    payloads = [{"ok": True}] * 9 + [{"ok": False}]
+    result = asyncio.run(replay(payloads, send, requests=40, concurrency=4, rate=0))
+    assert result["errors"] == 4
+    assert 2 <= result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert result["meets_target"]
+
+    paced = asyncio.run(replay(payloads, send, requests=20, concurrency=4, rate=200))
+    assert paced["seconds"] >= 19 / 200
@@ -1,7 +1,12 @@
+import json
+
+import numpy as np
 import pandas as pd
+import pytest
+from pydantic import BaseModel
 
 from src.data import add_label
-from src.features import build_features
+from src.features import FEATURE_NAMES, build_feature_matrix, build_feature_vector, build_features
 
 
 def _sample_df():
@@ -70,3 +75,76 @@ def test_label_and_features_shapes_and_types():
     assert all(str(t).startswith(("int", "float", "Int64")) for t in X.dtypes)
     # No NaNs
     assert X.isna().sum().sum() == 0
+
+
+def test_feature_matrix_matches_build_features_and_schema():
+    df = _sample_df()
+    df.loc[1, "VendorID"] = 3  # outside the vocab -> all-zero vendor block
+    df.loc[0, "RatecodeID"] = None
+    X = build_features(df)
+
+    schema = json.loads(open("models/churn_baseline_feature_schema.json").read())
+    assert list(X.columns) == FEATURE_NAMES == schema["feature_names"]
+
+    dense = build_feature_matrix(df)
+    assert dense.dtype == np.float32 and dense.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(dense, X.to_numpy(dtype=np.float32))
+    assert dense[1, FEATURE_NAMES.index("vendor_2")] == 0
+    assert dense[0, FEATURE_NAMES.index("rate_1")] == 0
+
+    sparse = build_feature_matrix(df, sparse=True)
+    np.testing.assert_array_equal(sparse.toarray(), dense)
+    assert dense[0, FEATURE_NAMES.index("PU_id")] == 142
+    assert dense[0, FEATURE_NAMES.index("trip_distance")] == np.float32(3.2)
+    # small ints would wrap zone IDs (142 -> -114) and truncate distances
+    with pytest.raises(ValueError, match="floating"):
+        build_feature_matrix(df, dtype=np.int8, sparse=True)
+
+
+def test_null_inputs_fill_the_same_in_both_paths():
+    df = _sample_df()
+    df["passenger_count"] = pd.Series([None, 3], dtype="Int64")
+    df["PULocationID"] = pd.Series([None, 100], dtype="Int64")
+    df.loc[1, "tpep_pickup_datetime"] = None
+    X = build_features(df)
+    dense = build_feature_matrix(df)
+    assert not np.isnan(dense).any()
+    np.testing.assert_array_equal(dense, X.to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(build_feature_matrix(df, sparse=True).toarray(), dense)
+    assert dense[0, FEATURE_NAMES.index("passenger_count")] == 0 and dense[0, FEATURE_NAMES.index("PU_id")] == 0
+
+
+def test_feature_vector_matches_matrix_rows():
+    rng = np.random.default_rng(7)
+    n = 300
+    records = [
+        {
+            "VendorID": int(rng.choice([1, 2, 3, 6, 7])),
+            "tpep_pickup_datetime": str(
+                (pd.Timestamp("2025-03-01", tz="UTC") + pd.Timedelta(seconds=int(s))).strftime("%Y-%m-%dT%H:%M:%SZ")
+            ),
+            "PULocationID": int(rng.integers(1, 266)),
+            "DOLocationID": int(rng.integers(1, 266)),
+            "passenger_count": None if rng.random() < 0.1 else int(rng.integers(-2, 11)),
+            "trip_distance": None if rng.random() < 0.1 else float(rng.normal(5, 80)),
+            "RatecodeID": None if rng.random() < 0.1 else int(rng.choice([1, 2, 5, 77, 99])),
+            "payment_type": int(rng.integers(-1, 8)),
+        }
+        for s in rng.integers(0, 31 * 86400, n)
+    ]
+    matrix = build_feature_matrix(pd.DataFrame(records))
+    out = np.empty(len(FEATURE_NAMES), dtype=np.float32)
+    for i, record in enumerate(records):
+        np.testing.assert_array_equal(build_feature_vector(record, out=out), matrix[i])
+
+    class Trip(BaseModel):
+        VendorID: int
+        tpep_pickup_datetime: str
+        PULocationID: int
+        DOLocationID: int
+        passenger_count: int | None = None
+        trip_distance: float | None = None
+        RatecodeID: int | None = None
+        payment_type: int | None = None
+
+    np.testing.assert_array_equal(build_feature_vector(Trip(**records[0])), matrix[0])
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from src.data import iter_month, load_month, load_months
+from src.dedup import KeySet, key_hashes
+from src.synthetic import generate_chunk
+from src.validator import merge_reports, validate_dataframe
+
+
+def test_keyset_matches_a_python_set():
+    rng = np.random.default_rng(0)
+    keys, seen = KeySet(), set()
+    for _ in range(40):
+        batch = rng.integers(0, 5_000, 300).astype(np.uint64)
+        expected = []
+        for h in batch.tolist():
+            expected.append(h in seen)
+            seen.add(h)
+        np.testing.assert_array_equal(keys.add(batch), expected)
+    assert len(keys) == len(seen) and keys.nbytes == 8 * len(seen)
+    assert len(keys._runs) <= 12  # merged like a binary counter, not one run per batch
+
+
+def test_key_hash_ignores_storage_width_and_unit(messy_df):
+    wide, _ = validate_dataframe(messy_df, compact=False, dedup=False)
+    compact, _ = validate_dataframe(messy_df, dedup=False)
+    assert str(wide["PULocationID"].dtype) != str(compact["PULocationID"].dtype)
+    micro = compact.assign(tpep_pickup_datetime=compact["tpep_pickup_datetime"].dt.as_unit("ns"))
+    np.testing.assert_array_equal(key_hashes(wide), key_hashes(compact))
+    np.testing.assert_array_equal(key_hashes(micro), key_hashes(compact))
+
+
+def _write_months(tmp_path, messy_df, rowid=True):
+    # rows 0 and 1 of March repeat in the same month; the April file
+    # re-delivers March row 5 and, unshifted, row 6's late-February trip
+    if rowid:
+        messy_df = messy_df.assign(_ingest_rowid=range(len(messy_df)))
+    march = pd.concat([messy_df, messy_df.iloc[[0, 1]]], ignore_index=True)
+    april = messy_df.copy()
+    april["tpep_pickup_datetime"] = april["tpep_pickup_datetime"].str.replace("2025-03", "2025-04")
+    april["tpep_dropoff_datetime"] = april["tpep_dropoff_datetime"].str.replace("2025-03", "2025-04")
+    if rowid:  # the shifted trips are new deliveries
+        april.loc[april["tpep_pickup_datetime"].str.startswith("2025-04"), "_ingest_rowid"] += 100
+    april = pd.concat([april, messy_df.iloc[[5]]], ignore_index=True)
+    march.to_csv(tmp_path / "yellow_2025-03.csv", index=False)
+    april.to_csv(tmp_path / "yellow_2025-04.csv", index=False)
+
+
+def test_full_key_duplicates_dropped_across_chunks_and_months(tmp_path, messy_df):
+    _write_months(tmp_path, messy_df)
+    march = tmp_path / "yellow_2025-03.csv"
+
+    full, report = load_month(march, month="2025-03", return_report=True, dedup=True)
+    chunked = merge_reports(r for _, r in iter_month(march, "2025-03", chunksize=3, dedup=True))
+    assert report.anomalies_by_rule["duplicate_key"] == 2
+    assert chunked == report and len(full) == report.rows
+
+    df, reports = load_months(str(tmp_path / "yellow_*.csv"), max_workers=1, dedup=True)
+    assert reports["2025-03"] == report
+    assert reports["2025-04"].anomalies_by_rule["duplicate_key"] == 2
+    assert len(df) == reports["2025-03"].rows + reports["2025-04"].rows
+
+    _, kept = load_month(march, month="2025-03", return_report=True)  # dedup is opt-in
+    assert "duplicate_key" not in kept.anomalies_by_rule and kept.rows == report.rows + 2
+
+
+def test_partial_key_duplicates_are_flagged_not_dropped(tmp_path, messy_df):
+    _write_months(tmp_path, messy_df, rowid=False)
+    plain, plain_report = load_month(tmp_path / "yellow_2025-03.csv", month="2025-03", return_report=True)
+    df, report = load_month(tmp_path / "yellow_2025-03.csv", month="2025-03", return_report=True, dedup=True)
+    assert report.anomalies_by_rule["duplicate_key"] == 2 and report.rows == plain_report.rows
+    assert report.anomaly_rate > plain_report.anomaly_rate
+    assert df["is_anomaly"].to_numpy()[-2:].tolist() == [1, 1]  # the repeats, not the originals
+
+    df, reports = load_months(str(tmp_path / "yellow_*.csv"), max_workers=1, dedup=True)
+    assert reports["2025-03"] == report
+    assert reports["2025-04"].anomalies_by_rule["duplicate_key"] == 2
+    assert len(df) == len(plain) + reports["2025-04"].rows
+
+
+def test_clean_synthetic_month_has_no_duplicate_keys():
+    # distinct trips share (vendor, pickup second, zone) in busy zones, so
+    # without the row id nothing may be dropped
+    raw = generate_chunk("2025-03", 200_000, seed=1, anomaly_rates={})
+    clean, report = validate_dataframe(raw, month="2025-03")
+    assert "duplicate_key" not in report.anomalies_by_rule and report.rows == len(clean) == len(raw)
+    _, flagged = validate_dataframe(raw, month="2025-03", dedup=True)
+    assert flagged.rows == len(raw)
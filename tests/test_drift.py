@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from api.drift import DriftMonitor
+from src.drift import build_reference, js_divergence, load_reference
+from src.features import FEATURE_NAMES
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _rows(n, seed=0, shift=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, len(FEATURE_NAMES))).astype(np.float32)
+    X[:, 0] += shift  # trip_distance
+    X[:, 6:] = X[:, 6:] > 0.5  # one-hot style columns
+    return X
+
+
+def test_reference_round_trip_and_js(tmp_path):
+    X = _rows(5000)
+    ref = build_reference(X, np.random.default_rng(1).random(5000))
+    ref.save(tmp_path / "ref.json")
+    loaded = load_reference(tmp_path / "ref.json")
+    np.testing.assert_array_equal(loaded.counts, ref.counts)
+    np.testing.assert_array_equal(loaded.edges, ref.edges)
+    assert ref.counts.sum(axis=1).tolist() == [5000] * len(FEATURE_NAMES)
+    assert (ref.counts[6:, 2:] == 0).all()  # binary features use two bins
+    for j in (0, 6):
+        assert ref.bin_row(X[0])[j] == np.searchsorted(ref.edges[j], X[0, j], side="right")
+
+    assert js_divergence([5, 5], [5, 5]) < 1e-9
+    assert abs(js_divergence([10, 0], [0, 10]) - 1.0) < 1e-6
+
+
+def test_monitor_window_drift_and_expiry():
+    clock = FakeClock()
+    model = SimpleNamespace(reference=build_reference(_rows(5000), np.full(5000, 0.2)))
+    monitor = DriftMonitor(window_s=100, buckets=4, flush_rows=64, clock=clock)
+    record = SimpleNamespace(passenger_count=None, trip_distance=1.0)
+
+    for x in _rows(1000, seed=1):
+        monitor.observe(model, x, 0.2, record)
+    same = monitor.refresh()
+    assert max(same.values()) < 0.05
+    assert monitor.window()["nulls"].tolist() == [1000, 0, 1000, 1000]
+
+    clock.now = 150  # first slices expire, new traffic is shifted
+    for x in _rows(1000, seed=2, shift=5.0):
+        monitor.observe(model, x, 0.9, record)
+    drifted = monitor.refresh()
+    assert monitor.window()["rows"] == 1000
+    assert drifted["trip_distance"] > 0.5 and drifted["score"] > 0.5
+    assert drifted["pickup_hour"] < 0.05
+
+    other = SimpleNamespace(reference=build_reference(_rows(100), np.zeros(100)))
+    monitor.observe(other, _rows(1)[0], 0.1)  # hot swap restarts the window
+    assert monitor.window()["rows"] == 1
+
+
+def test_api_exports_drift_metrics(client):
+    trip = {
+        "VendorID": 2,
+        "tpep_pickup_datetime": "2025-03-01T08:00:00Z",
+        "PULocationID": 142,
+        "DOLocationID": 236,
+    }
+    assert client.post("/predict", json=trip).status_code == 200
+    body = client.get("/metrics").text
+    assert 'input_null_rate{feature="passenger_count"} 1.0' in body
+    assert "score_histogram_bucket" in body
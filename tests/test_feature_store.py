@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from src.data import PICKUP, load_month
+from src.feature_store import features_xy, materialize, read_features
+from src.score import score_features, score_month
+from src.train import build_xy
+
+
+def test_backfill_rematerializes_only_changed_days(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    store = tmp_path / "features"
+
+    first = materialize([(path, "2025-03")], store)
+    assert first["days_written"] and not first["sources_skipped"]
+    assert (store / "month=2025-03" / "day=2025-03-01" / "part.parquet").exists()
+    assert materialize([(path, "2025-03")], store)["sources_skipped"] == ["2025-03"]
+
+    frame, reports = read_features(store)
+    X, y = features_xy(frame)
+    df, report = load_month(path, month="2025-03", return_report=True, columns="training")
+    order = np.argsort(frame["row"].to_numpy())  # store is in day order
+    X_raw, y_raw = build_xy(df)
+    np.testing.assert_array_equal(X[order], X_raw)
+    np.testing.assert_array_equal(y[order], y_raw)
+    assert reports["2025-03"] == report
+
+    backfill = messy_df.copy()
+    backfill.loc[5, "trip_distance"] = 19.0  # one trip on 2025-03-06
+    backfill.to_csv(path, index=False)
+    again = materialize([(path, "2025-03")], store)
+    assert again["days_written"] == ["2025-03/2025-03-06"]
+    assert again["days_unchanged"] == len(first["days_written"]) - 1
+
+
+def test_backfill_inserting_rows_rewrites_only_that_day(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    store = tmp_path / "features"
+    first = materialize([(path, "2025-03")], store)
+    later = store / "month=2025-03" / "day=2025-03-06" / "part.parquet"
+    before = later.stat().st_mtime_ns
+
+    # a late trip on 2025-03-01 lands mid-file: every later row id shifts
+    late = messy_df.iloc[[0]].assign(tpep_pickup_datetime="2025-03-01T09:00:00Z",
+                                     tpep_dropoff_datetime="2025-03-01T09:30:00Z")
+    backfill = pd.concat([messy_df.iloc[:1], late, messy_df.iloc[1:]], ignore_index=True)
+    backfill.to_csv(path, index=False)
+    again = materialize([(path, "2025-03")], store)
+    assert again["days_written"] == ["2025-03/2025-03-01"]
+    assert len(again["days_reindexed"]) == len(first["days_written"]) - 1
+    assert later.stat().st_mtime_ns == before  # features untouched, only row ids refreshed
+
+    frame, _ = read_features(store)
+    df = load_month(path, month="2025-03", columns="training")
+    assert sorted(frame["row"]) == sorted(df.index)
+    stored = frame.set_index("row").sort_index()
+    np.testing.assert_array_equal(stored[PICKUP].to_numpy(), df[PICKUP].sort_index().to_numpy())
+
+
+def test_score_features_matches_raw_scoring(tmp_path, messy_df, model_dir):
+    model_dir, _ = model_dir
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    materialize([(path, "2025-03")], tmp_path / "features")
+
+    raw = score_month(path, tmp_path / "raw", model_dir=model_dir, model_name="test", month="2025-03")
+    stored = score_features(tmp_path / "features", tmp_path / "stored", model_dir=model_dir, model_name="test")
+
+    assert stored["rows_scored"] == raw["rows_scored"]
+    a = pd.read_parquet(tmp_path / "raw").sort_values("row", ignore_index=True)
+    b = pd.read_parquet(tmp_path / "stored").sort_values("row", ignore_index=True)
+    pd.testing.assert_frame_equal(a.drop(columns="date"), b.drop(columns="date"), check_dtype=False)
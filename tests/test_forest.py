@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from src.forest import load_forest, pack_forest
+from src.model import load_model
+
+
+def _data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, 6)).astype(np.float32)
+    X[:, 5] = rng.integers(0, 3, n)  # ties on thresholds
+    y = ((X[:, 0] + 0.4 * rng.random(n)) > 0.6).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        RandomForestClassifier(n_estimators=30, random_state=0, class_weight="balanced"),
+        ExtraTreesClassifier(n_estimators=10, max_leaf_nodes=40, random_state=0),  # best-first layout
+    ],
+)
+def test_packed_forest_matches_predict_proba(model, tmp_path):
+    X, y = _data()
+    model.fit(X, y)
+    X_test, _ = _data(3000, seed=1)
+
+    packed = pack_forest(model)
+    expected = model.predict_proba(X_test)
+    np.testing.assert_allclose(packed.predict_proba(X_test), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(packed.predict_positive(X_test[:1]), expected[:1, 1], atol=1e-12)
+
+    loaded = load_forest(packed.save(tmp_path / "m.forest"))
+    assert not loaded.threshold.flags.writeable  # read-only memory map
+    np.testing.assert_array_equal(loaded.predict_positive(X_test), packed.predict_positive(X_test))
+
+
+def test_load_model_prefers_packed_forest(model_dir):
+    path, model = model_dir
+    X = np.random.default_rng(2).random((50, model.n_features_in_)).astype(np.float32)
+    assert load_model(path, "test").kind == "pickle"
+
+    pack_forest(model).save(path / "test.forest")
+    packed = load_model(path, "test")
+    assert packed.kind == "packed"
+    np.testing.assert_allclose(packed.predict(X), model.predict_proba(X)[:, 1], atol=1e-12)
+    assert load_model(path, "test", packed=False).kind == "pickle"
@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.data import load_month
+from src.incremental import Reservoir, iter_xy_chunks, merge_chunk_reports
+
+
+def test_reservoir_is_bounded_and_uniform():
+    counts = np.zeros(1000)
+    for seed in range(200):
+        res = Reservoir(50, 1, seed=seed)
+        for start in range(0, 1000, 64):
+            ids = np.arange(start, min(start + 64, 1000))
+            res.add(ids[:, None].astype(np.float32), ids)
+        X, y = res.sample()
+        assert len(X) == 50 and res.seen == 1000
+        assert len(set(y.tolist())) == 50
+        np.testing.assert_array_equal(X[:, 0], y)
+        counts[y] += 1
+    # every row kept with p = 0.05: early and late rows equally often
+    assert abs(counts[:500].sum() - counts[500:].sum()) < 0.1 * counts.sum()
+
+
+def test_chunk_stream_splits_the_same_way_every_pass(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    sources = [(str(path), "2025-03"), (str(path), "2025-03")]
+
+    reports = {}
+    first = list(iter_xy_chunks(sources, test_size=0.5, chunksize=2, reports=reports, dedup=True))
+    second = list(iter_xy_chunks(sources, test_size=0.5, chunksize=2, dedup=True))
+
+    assert len(first) == len(second) > 0
+    for (X1, y1, t1), (X2, y2, t2) in zip(first, second):
+        np.testing.assert_array_equal(X1, X2)
+        np.testing.assert_array_equal(t1, t2)
+    _, full = load_month(path, month="2025-03", return_report=True)
+    # the second copy of the month repeats every (partial) primary key:
+    # flagged, not dropped
+    merged = merge_chunk_reports(reports)["2025-03"]
+    assert merged.rows == 2 * full.rows
+    assert merged.anomalies_by_rule["duplicate_key"] == full.rows
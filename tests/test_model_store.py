@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import api.main as api_main
+from api.model_store import ModelSlot
+from api.shadow import ShadowScorer
+from src.features import FEATURE_NAMES, build_feature_vector
+
+
+def _bump_mtime(path, name):
+    # make sure the rewrite is visible even on coarse-mtime filesystems
+    for f in path.glob(f"{name}*"):
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_slot_swaps_only_settled_valid_artifacts(tmp_path, write_model):
+    first = write_model("m", seed=0)
+    slot = ModelSlot(tmp_path, "m")
+    assert slot.reload()
+    old = slot.model
+    assert old.model.get_params() == first.get_params()
+    assert not slot.poll() and not slot.poll()  # nothing changed
+
+    write_model("m", seed=1)
+    _bump_mtime(tmp_path, "m")
+    assert not slot.poll()  # changed since the last poll: wait one more
+    assert slot.poll()
+    assert slot.model is not old and slot.model.model.random_state == 1
+
+    # A broken schema keeps the current model and is not retried until it changes
+    current = slot.model
+    (tmp_path / "m_feature_schema.json").write_text(json.dumps({"feature_names": ["nope"]}))
+    _bump_mtime(tmp_path, "m")
+    slot.poll()
+    assert not slot.poll()
+    assert slot.model is current and "nope" in slot.load_error
+    assert not slot.poll()
+
+
+def test_api_hot_swaps_model_from_watched_dir(tmp_path, monkeypatch, write_model, trip):
+    write_model("m", seed=0)
+    monkeypatch.setattr(api_main, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(api_main, "MODEL_NAME", "m")
+    monkeypatch.setattr(api_main, "MODEL_POLL_SECONDS", 0.02)
+    with TestClient(api_main.app) as client:
+        loaded_at = client.get("/health").json()["loaded_at"]
+        new = write_model("m", seed=1)
+        _bump_mtime(tmp_path, "m")
+        deadline = time.time() + 5
+        while client.get("/health").json()["loaded_at"] == loaded_at:
+            assert time.time() < deadline, "model was not swapped"
+            time.sleep(0.02)
+        expected = new.predict_proba(build_feature_vector(trip)[None, :])[0, 1]
+        assert client.post("/predict", json=trip).json()["score"] == pytest.approx(expected)
+
+
+def test_shadow_scorer_exports_agreement(tmp_path, write_model):
+    shadow_model = write_model("cand", seed=3)
+    slot = ModelSlot(tmp_path, "cand", label="shadow")
+    slot.reload()
+
+    def count(outcome):
+        return REGISTRY.get_sample_value("shadow_rows_total", {"outcome": outcome}) or 0.0
+
+    before = {k: count(k) for k in ("agree", "disagree")}
+    X = np.random.default_rng(0).random((40, len(FEATURE_NAMES))).astype(np.float32)
+    primary = np.full(len(X), 0.9)
+    scorer = ShadowScorer(slot, sample_rate=1.0, seed=0)
+    scorer.offer(X, primary)
+    scorer.close()
+
+    agree = int(np.count_nonzero(shadow_model.predict_proba(X)[:, 1] >= 0.5))
+    assert count("agree") - before["agree"] == agree
+    assert count("disagree") - before["disagree"] == len(X) - agree
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+import src.data
+from src.data import load_month, load_months, month_range, resolve_month_paths
+
+
+def _write_months(tmp_path, messy_df, months):
+    for month in months:
+        part = messy_df.copy()
+        part["tpep_pickup_datetime"] = f"{month}-10T08:00:00Z"
+        part["tpep_dropoff_datetime"] = f"{month}-10T08:20:00Z"
+        part.to_csv(tmp_path / f"yellow_{month}.csv", index=False)
+
+
+def test_month_range_and_path_resolution(tmp_path, messy_df):
+    _write_months(tmp_path, messy_df, ["2025-01", "2025-02", "2025-03"])
+    assert month_range("2024-11", "2025-02") == ["2024-11", "2024-12", "2025-01", "2025-02"]
+
+    globbed = resolve_month_paths(str(tmp_path / "yellow_*.csv"), months=["2025-02", "2025-03"])
+    assert [m for _, m in globbed] == ["2025-02", "2025-03"]
+
+    templated = resolve_month_paths(str(tmp_path / "yellow_{month}.csv"), ["2025-01"])
+    assert templated == [(str(tmp_path / "yellow_2025-01.csv"), "2025-01")]
+
+    with pytest.raises(FileNotFoundError):
+        resolve_month_paths(str(tmp_path / "green_*.csv"))
+
+
+def test_parallel_load_matches_sequential(tmp_path, messy_df, monkeypatch):
+    months = ["2025-01", "2025-02", "2025-03"]
+    _write_months(tmp_path, messy_df, months)
+
+    df, reports = load_months(str(tmp_path / "yellow_*.csv"), max_workers=2)
+
+    expected = []
+    for month in months:
+        frame, report = load_month(tmp_path / f"yellow_{month}.csv", month=month, return_report=True)
+        assert reports[month] == report
+        assert report.freshness_ok is True
+        expected.append(frame)
+    pd.testing.assert_frame_equal(df, pd.concat(expected, ignore_index=True))
+
+    via_load_month = load_month(str(tmp_path / "yellow_{month}.csv"), month="2025-01:2025-03")
+    pd.testing.assert_frame_equal(df, via_load_month)
+
+    # a single month selects just that file, from a glob or a template
+    march = load_month(tmp_path / "yellow_2025-03.csv", month="2025-03")
+    for pattern in ("yellow_*.csv", "yellow_{month}.csv"):
+        pd.testing.assert_frame_equal(load_month(str(tmp_path / pattern), month="2025-03"), march)
+
+    seen = {}
+    monkeypatch.setattr(src.data, "load_months", lambda *a, **kw: seen.update(kw) or (df, reports))
+    load_month(str(tmp_path / "yellow_*.csv"), max_workers=1)
+    assert seen["max_workers"] == 1
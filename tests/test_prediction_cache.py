@@ -0,0 +1,72 @@
+import numpy as np
+from prometheus_client import REGISTRY
+
+from api.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _count(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _vec(i):
+    return np.full(4, i, dtype=np.float32)
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(max_entries=2, ttl_s=10, clock=clock)
+    model = object()
+    size_before = _count("prediction_cache_evictions_total", reason="size")
+
+    assert cache.get(model, _vec(1)) is None
+    cache.put(model, _vec(1), 0.1)
+    cache.put(model, _vec(2), 0.2)
+    assert cache.get(model, _vec(1)) == 0.1  # 1 is now most recent
+    cache.put(model, _vec(3), 0.3)  # evicts 2
+    assert cache.get(model, _vec(2)) is None
+    assert cache.get(model, _vec(3)) == 0.3
+    assert _count("prediction_cache_evictions_total", reason="size") - size_before == 1
+
+    clock.now = 11
+    ttl_before = _count("prediction_cache_evictions_total", reason="ttl")
+    assert cache.get(model, _vec(1)) is None
+    assert _count("prediction_cache_evictions_total", reason="ttl") - ttl_before == 1
+    assert len(cache) == 1
+
+
+def test_model_change_invalidates():
+    cache = PredictionCache()
+    old, new = object(), object()
+    cache.put(old, _vec(1), 0.5)  # no lookup yet for `old`: not current, ignored
+    assert cache.get(old, _vec(1)) is None
+    cache.put(old, _vec(1), 0.5)
+    assert cache.get(old, _vec(1)) == 0.5
+
+    assert cache.get(new, _vec(1)) is None
+    assert len(cache) == 0
+    cache.put(old, _vec(1), 0.5)  # late result from the swapped-out model
+    assert len(cache) == 0
+
+
+def test_api_serves_repeated_trips_from_cache(client):
+    trip = {
+        "VendorID": 2,
+        "tpep_pickup_datetime": "2025-03-01T08:00:00Z",
+        "PULocationID": 142,
+        "DOLocationID": 236,
+    }
+    hits = _count("prediction_cache_requests_total", result="hit")
+    batched = _count("predict_batch_size_count")
+    first = client.post("/predict", json=trip).json()
+    second = client.post("/predict", json=trip).json()
+    assert first == second
+    assert _count("prediction_cache_requests_total", result="hit") - hits == 1
+    assert _count("predict_batch_size_count") - batched == 1  # scored once
@@ -0,0 +1,91 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from src import profiling
+from src.cache import ValidatedCache
+from src.data import load_month
+from src.features import build_feature_matrix
+from src.validator import merge_reports, validate_dataframe
+
+VALIDATE_STAGES = {
+    "validate.required",
+    "validate.coerce",
+    "validate.rules",
+    "validate.joinability",
+    "validate.dedup",
+    "validate.duration",
+    "validate.freshness",
+    "validate.compact",
+}
+
+
+@pytest.fixture
+def profiled(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", True)
+    monkeypatch.setattr(profiling, "TRACE_MEMORY", True)
+    yield
+    tracemalloc.stop()
+
+
+def test_disabled_is_a_shared_noop(messy_df, monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", False)  # even under NYC_PROFILE=1
+    assert profiling.span("a") is profiling.span("b")
+    with profiling.collect() as timings:
+        _, report = validate_dataframe(messy_df, month="2025-03")
+    assert timings is None and report.stage_timings is None
+
+
+def test_report_stage_timings_and_merge(profiled, messy_df):
+    with profiling.collect() as outer:
+        clean, report = validate_dataframe(
+            messy_df, month="2025-03", taxi_zone_ids={100, 130, 142, 148, 236}, dedup=True
+        )
+        build_feature_matrix(clean)
+    assert set(report.stage_timings) == VALIDATE_STAGES
+    assert all(t["calls"] == 1 and t["seconds"] >= 0 and "peak_mb" in t for t in report.stage_timings.values())
+    # the enclosing collector sees the validation steps plus the feature stages
+    assert VALIDATE_STAGES | {"features.numeric", "features.one_hot", "features.assemble"} <= set(outer)
+
+    merged = merge_reports([report, report])
+    rules = merged.stage_timings["validate.rules"]
+    assert rules["calls"] == 2
+    assert rules["seconds"] == pytest.approx(2 * report.stage_timings["validate.rules"]["seconds"])
+    assert profiling.as_metrics(report.stage_timings)["stage.validate.rules.seconds"] >= 0
+
+
+def test_timings_do_not_affect_report_equality(profiled, messy_df, tmp_path):
+    _, first = validate_dataframe(messy_df, month="2025-03")
+    _, second = validate_dataframe(messy_df, month="2025-03")
+    assert first.stage_timings != second.stage_timings and first == second
+
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    cache = ValidatedCache(tmp_path / "cache")
+    _, filled = load_month(path, month="2025-03", return_report=True, cache=cache)
+    _, hit = load_month(path, month="2025-03", return_report=True, cache=cache)
+    assert filled.stage_timings and hit.stage_timings is None and hit == filled
+
+
+def test_nested_peak_reaches_parent(profiled):
+    with profiling.collect() as timings:
+        with profiling.span("outer"):
+            with profiling.span("inner"):
+                block = np.ones(2_000_000)  # ~15 MB
+            del block
+    assert timings["inner"]["peak_mb"] > 10
+    assert timings["outer"]["peak_mb"] >= timings["inner"]["peak_mb"]
+
+
+def test_api_stage_histogram(profiled, client):
+    trip = {
+        "VendorID": 2,
+        "tpep_pickup_datetime": "2025-03-01T08:00:00Z",
+        "PULocationID": 142,
+        "DOLocationID": 236,
+    }
+    assert client.post("/predict", json=trip).status_code == 200
+    body = client.get("/metrics").text
+    for stage in ("api.features", "api.batch", "model.predict"):
+        assert f'stage_latency_seconds_count{{stage="{stage}"}}' in body
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+import src.score as score
+from src.features import build_feature_matrix
+from src.validator import validate_dataframe
+
+
+def _expected(messy_df, model):
+    valid, _ = validate_dataframe(messy_df, month="2025-03")
+    return pd.Series(model.predict_proba(build_feature_matrix(valid))[:, 1], index=valid.index)
+
+
+def _scores(out_dir):
+    parts = sorted(out_dir.glob("date=*/part-*.parquet"))
+    return pd.concat([pd.read_parquet(p) for p in parts]).sort_values("row")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_month_writes_day_partitions(tmp_path, messy_df, model_dir, workers):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    models, model = model_dir
+    out = tmp_path / "scores"
+
+    summary = score.score_month(
+        path, out, model_dir=models, model_name="test", month="2025-03", chunksize=3, workers=workers
+    )
+
+    assert summary["failed_chunks"] == {}
+    assert summary["chunks"] == 3 and summary["rows"] == len(messy_df)
+    assert summary["peak_rss_mb"]["parent"] > 0
+    scored = _scores(out)
+    expected = _expected(messy_df, model)
+    assert list(scored["row"]) == list(expected.index)
+    assert scored["score"].to_numpy() == pytest.approx(expected.to_numpy())
+    assert {p.name for p in out.glob("date=*")} == {
+        "date=2025-02-28", "date=2025-03-01", "date=2025-03-04", "date=2025-03-05", "date=2025-03-06",
+    }
+
+
+def test_failed_chunk_is_rescored_on_rerun(tmp_path, messy_df, model_dir, monkeypatch):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    models, model = model_dir
+    out = tmp_path / "scores"
+    kwargs = dict(model_dir=models, model_name="test", month="2025-03", chunksize=3)
+
+    real = score.build_feature_matrix
+    calls = []
+
+    def flaky(df):
+        calls.append(df.index[0])
+        if 3 in df.index:
+            raise RuntimeError("boom")
+        return real(df)
+
+    monkeypatch.setattr(score, "build_feature_matrix", flaky)
+    first = score.score_month(path, out, retries=1, **kwargs)
+    assert list(first["failed_chunks"]) == ["1"]
+    assert calls.count(3) == 2  # one retry inside the run
+
+    monkeypatch.setattr(score, "build_feature_matrix", real)
+    second = score.score_month(path, out, **kwargs)
+    assert second["failed_chunks"] == {}
+    assert second["chunks_skipped"] == 2
+    assert second["rows"] == len(messy_df)
+    scored = _scores(out)
+    assert list(scored["row"]) == list(_expected(messy_df, model).index)
+
+
+def test_rerun_with_other_chunking_is_refused(tmp_path, messy_df, model_dir):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    models, _ = model_dir
+    out = tmp_path / "scores"
+    score.score_month(path, out, model_dir=models, model_name="test", chunksize=3)
+    with pytest.raises(ValueError, match="different run"):
+        score.score_month(path, out, model_dir=models, model_name="test", chunksize=4)
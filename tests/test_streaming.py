@@ -0,0 +1,88 @@
+import pandas as pd
+
+from src.data import COLUMN_SETS, load_month, read_parquet, select_row_groups
+from src.validator import ValidationReport, merge_reports
+
+
+def test_chunked_csv_matches_full_load(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+
+    full, full_rep = load_month(path, month="2025-03", return_report=True)
+    streamed, streamed_rep = load_month(
+        path, month="2025-03", chunksize=2, return_report=True
+    )
+
+    pd.testing.assert_frame_equal(full, streamed)
+    assert streamed_rep == full_rep
+    assert streamed_rep.anomalous_rows == int(full["is_anomaly"].sum())
+
+    # the exact count is summed, not re-derived from the (float) rate
+    chunk = ValidationReport(3, True, [], 0.34, {}, anomalous_rows=1)
+    merged = merge_reports([chunk] * 3)
+    assert merged.anomalous_rows == 3 and merged.anomaly_rate == 3 / 9
+
+
+def test_chunked_parquet_matches_full_load(tmp_path, messy_df):
+    path = tmp_path / "month.parquet"
+    messy_df.to_parquet(path, index=False, row_group_size=3)
+
+    full, full_rep = load_month(
+        path, month="2025-03", taxi_zone_ids=set(range(1, 266)), return_report=True
+    )
+    streamed, streamed_rep = load_month(
+        path,
+        month="2025-03",
+        taxi_zone_ids=set(range(1, 266)),
+        chunksize=3,
+        return_report=True,
+    )
+
+    pd.testing.assert_frame_equal(full, streamed)
+    assert streamed_rep == full_rep
+    assert streamed_rep.anomalies_by_rule["joinability_drop"] == 1
+
+
+def _three_month_parquet(path, messy_df):
+    # one row group per month so the March window can prune Feb and Apr
+    frames = []
+    for month in ("2025-02", "2025-03", "2025-04"):
+        part = messy_df.copy()
+        part["tpep_pickup_datetime"] = pd.Timestamp(f"{month}-10 08:00")
+        part["tpep_dropoff_datetime"] = pd.Timestamp(f"{month}-10 08:20")
+        frames.append(part)
+    df = pd.concat(frames, ignore_index=True)
+    df.to_parquet(path, index=False, row_group_size=len(messy_df))
+    return df
+
+
+def test_parquet_pushdown_prunes_row_groups_and_projects(tmp_path, messy_df):
+    import pyarrow.parquet as pq
+
+    path = tmp_path / "three_months.parquet"
+    raw = _three_month_parquet(path, messy_df)
+
+    assert select_row_groups(pq.ParquetFile(path), "2025-03") == [1]
+
+    got = read_parquet(path, columns="training", month="2025-03", max_workers=2)
+    march = raw.iloc[len(messy_df): 2 * len(messy_df)].reset_index(drop=True)
+    expected = march[[c for c in COLUMN_SETS["training"] if c in march.columns]]
+    pd.testing.assert_frame_equal(got, expected)
+    assert "tip_amount" not in got.columns
+
+
+def test_filter_month_same_frame_for_csv_parquet_and_chunks(tmp_path, messy_df):
+    pq_path = tmp_path / "three_months.parquet"
+    raw = _three_month_parquet(pq_path, messy_df)
+    csv_path = tmp_path / "three_months.csv"
+    raw.to_csv(csv_path, index=False)
+
+    kwargs = dict(month="2025-03", filter_month=True, columns="training", return_report=True)
+    pq_df, pq_rep = load_month(pq_path, **kwargs)
+    chunk_df, chunk_rep = load_month(pq_path, chunksize=4, **kwargs)
+    csv_df, csv_rep = load_month(csv_path, **kwargs)
+
+    pd.testing.assert_frame_equal(pq_df, chunk_df)
+    assert pq_rep == chunk_rep == csv_rep
+    assert len(pq_df) == len(csv_df) > 0
+    assert (pq_df["tpep_pickup_datetime"].dt.month == 3).all()
@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.sweep import best_trial, rung_sizes, sample_configs, successive_halving
+
+
+def test_sample_configs_grid_and_random():
+    grid = sample_configs({"max_depth": [2, 8], "n_estimators": [5, 10, 20]})
+    assert len(grid) == 6 and {"max_depth": 8, "n_estimators": 20} in grid
+
+    space = {"max_depth": [2, 8], "min_samples_leaf": {"low": 1, "high": 50, "log": True, "int": True}}
+    drawn = sample_configs(space, n_trials=10, seed=0)
+    assert drawn == sample_configs(space, n_trials=10, seed=0)
+    assert all(1 <= c["min_samples_leaf"] <= 50 and isinstance(c["min_samples_leaf"], int) for c in drawn)
+
+
+def test_rung_sizes_grow_by_eta_and_end_on_all_rows():
+    assert rung_sizes(9, 9000, eta=3, min_rows=100) == [1000, 3000, 9000]
+    assert rung_sizes(9, 9000, eta=3, min_rows=2000) == [3000, 9000]
+    assert rung_sizes(1, 500, eta=3) == [500]
+
+
+def test_successive_halving_eliminates_weak_configs():
+    rng = np.random.default_rng(0)
+    X = rng.random((3000, 5)).astype(np.float32)
+    y = (X[:, 0] + 0.2 * rng.random(3000) > 0.6).astype(int)
+    configs = [{"n_estimators": 10, "max_depth": d} for d in (1, 2, 4, 8, 12, 16, 20, 24, 28)]
+
+    trials = successive_halving(
+        X[:2400], y[:2400], X[2400:], y[2400:], configs, eta=3, min_rows=100, max_workers=2
+    )
+
+    rungs = [len(t.rungs) for t in trials]
+    assert sorted(rungs) == [1] * 6 + [2] * 2 + [3]  # 9 -> 3 -> 1
+    assert [r["rows"] for r in max(trials, key=lambda t: len(t.rungs)).rungs] == [266, 800, 2400]
+    best = best_trial(trials, "roc_auc")
+    assert best.eliminated_at is None
+    # survivors of each rung ranked at least as high as the trials cut there
+    for rung in range(2):
+        cut = [t.rungs[rung]["metrics"]["roc_auc"] for t in trials if t.eliminated_at == rung]
+        kept = [t.rungs[rung]["metrics"]["roc_auc"] for t in trials if len(t.rungs) > rung + 1]
+        assert min(kept) >= max(cut)
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from src.data import load_month
+from src.synthetic import DEFAULT_ANOMALY_RATES, generate_chunk, write_month
+from src.validator import validate_dataframe
+
+
+def test_generator_is_seeded_and_injects_requested_rates():
+    rates = {rule: 0.02 for rule in DEFAULT_ANOMALY_RATES}
+    df = generate_chunk("2025-03", 20_000, seed=7, anomaly_rates=rates)
+    pd.testing.assert_frame_equal(df, generate_chunk("2025-03", 20_000, seed=7, anomaly_rates=rates))
+
+    clean, report = validate_dataframe(df, month="2025-03", taxi_zone_ids=set(range(1, 266)), dedup=True)
+    dropped = {"VendorID", "missing_pickup"}  # required-null: removed, not counted
+    for rule in set(rates) - dropped:
+        assert 300 < report.anomalies_by_rule[rule] < 500, rule
+    kept = report.rows + report.anomalies_by_rule["joinability_drop"]  # duplicate keys are flagged only
+    assert 0.03 < 1 - kept / len(df) < 0.05
+    assert report.freshness_ok
+
+    _, clean_report = validate_dataframe(generate_chunk("2025-03", 5_000, anomaly_rates={}))
+    assert clean_report.anomalies_by_rule == {} and clean_report.rows == 5_000
+
+
+def test_write_month_csv_and_parquet_agree(tmp_path):
+    csv = write_month(tmp_path / "m.csv", "2025-03", 2_500, seed=3, chunk_rows=1_000)
+    parquet = write_month(tmp_path / "m.parquet", "2025-03", 2_500, seed=3, chunk_rows=1_000)
+    a, rep_a = load_month(csv, month="2025-03", return_report=True)
+    b, rep_b = load_month(parquet, month="2025-03", return_report=True)
+    assert rep_a == rep_b and len(a) == rep_a.rows
+    pd.testing.assert_series_equal(a["total_amount"], b["total_amount"])
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from src.contract_spec import ColumnRule, apply_rule, coerce_dtype
+from src.validation_plan import compile_rule
+from src.validator import validate_dataframe
+
+
+def _random_month(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    pickup = pd.Timestamp("2025-03-01", tz="UTC") + pd.to_timedelta(
+        rng.integers(0, 31 * 24 * 3600, n), unit="s"
+    )
+    dropoff = pickup + pd.to_timedelta(rng.integers(-120, 50_000, n), unit="s")
+    pickup_str = pickup.strftime("%Y-%m-%dT%H:%M:%SZ").to_numpy(dtype=object)
+    pickup_str[rng.random(n) < 0.01] = None
+
+    def with_nulls(values, rate=0.05):
+        values = np.asarray(values, dtype=object)
+        values[rng.random(n) < rate] = None
+        return values
+
+    return pd.DataFrame(
+        {
+            "VendorID": with_nulls(rng.choice([1, 2, 3, 6, 7], n), 0.01),
+            "tpep_pickup_datetime": pickup_str,
+            "tpep_dropoff_datetime": dropoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "PULocationID": rng.integers(1, 266, n),
+            "DOLocationID": with_nulls(rng.integers(1, 266, n), 0.01),
+            "passenger_count": with_nulls(rng.integers(-1, 10, n)),
+            "trip_distance": with_nulls(rng.normal(5, 60, n)),
+            "RatecodeID": with_nulls(rng.choice([1, 2, 5, 77, 99], n)),
+            "store_and_fwd_flag": with_nulls(rng.choice(["N", "Y", " y", "Z"], n)),
+            "payment_type": with_nulls(rng.integers(-1, 9, n)),
+            "fare_amount": with_nulls(rng.normal(15, 10, n)),
+            "extra": rng.normal(1, 1, n),
+            "mta_tax": rng.choice([0.5, -0.5], n),
+            "tip_amount": rng.normal(2, 2, n),
+            "tolls_amount": rng.normal(0, 1, n),
+            "improvement_surcharge": rng.choice([0.3, 1.0], n),
+            "congestion_surcharge": rng.choice([0.0, 2.5, -2.5], n),
+            "total_amount": rng.normal(30, 20, n),
+        }
+    )
+
+
+def test_plan_matches_reference_engine():
+    for seed in range(3):
+        raw = _random_month(seed=seed)
+        zones = set(range(1, 264))
+        ref_df, ref_rep = validate_dataframe(
+            raw, month="2025-03", taxi_zone_ids=zones, engine="rules"
+        )
+        plan_df, plan_rep = validate_dataframe(
+            raw, month="2025-03", taxi_zone_ids=zones, engine="plan"
+        )
+        pd.testing.assert_frame_equal(ref_df, plan_df)
+        assert ref_rep == plan_rep
+
+
+def test_plan_matches_reference_on_fixture(messy_df):
+    ref_df, ref_rep = validate_dataframe(messy_df, engine="rules")
+    plan_df, plan_rep = validate_dataframe(messy_df, engine="plan")
+    pd.testing.assert_frame_equal(ref_df, plan_df)
+    assert ref_rep == plan_rep
+
+
+def test_compiled_rule_matches_apply_rule_for_each_on_bad():
+    raw = pd.DataFrame({"x": [-3, 0, 4, 12, None, 7, 99]})
+    for on_bad in ("flag", "coerce_null", "cap", "drop"):
+        for dtype in ("int", "float"):
+            rule = ColumnRule(
+                "x",
+                False,
+                dtype,
+                True,
+                min_val=0,
+                max_val=10,
+                allowed=[0, 4, 7, 10],
+                default_if_null=4,
+                on_bad=on_bad,
+            )
+            s = coerce_dtype(raw, rule)
+            expected, expected_bad = apply_rule(s, rule)
+            new, bad = compile_rule(rule).run(s)
+            got = s if new is None else new
+            pd.testing.assert_series_equal(expected, got)
+            np.testing.assert_array_equal(expected_bad.to_numpy(), bad)
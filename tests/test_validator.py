@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 
+from src.contract_spec import to_storage
+from src.features import build_feature_matrix, build_features
 from src.validator import validate_dataframe
 
 
@@ -34,3 +37,53 @@ def test_basic_validation_pipeline():
     assert "duration_minutes" in valid.columns
     assert "is_anomaly" in valid.columns
     assert rep.freshness_ok is True
+
+
+def test_fast_timestamp_paths_match_generic_parse():
+    import warnings
+
+    from src.contract_spec import to_utc
+
+    layouts = [
+        ["2025-03-01T08:00:00Z", "2025-02-30T01:00:00Z", None, "2025-03-01T09:00:00+01:00", "junk"],
+        ["2025-03-01 08:00:00", "2024-02-29 23:59:59", None, "2025-13-01 00:00:00", "junk"],
+        ["2025-03-01T08:00:00", "2025-03-01T23:59:59", None, "junk"],
+        ["03/01/2025 08:00:00 PM", "03/01/2025 12:30:00 AM", None, "junk"],
+    ]
+    for values in layouts:
+        raw = pd.Series(values)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = pd.to_datetime(raw, errors="coerce", utc=True)
+        pd.testing.assert_series_equal(to_utc(raw), expected)
+
+
+def test_to_utc_does_not_reparse_datetimes():
+    from src.contract_spec import to_utc
+
+    aware = pd.Series(pd.to_datetime(["2025-03-01 08:00:00"], utc=True))
+    assert to_utc(aware) is aware
+    naive = pd.Series(pd.to_datetime(["2025-03-01 08:00:00"]))
+    pd.testing.assert_series_equal(to_utc(naive), aware)
+
+
+def test_compact_storage_keeps_outputs(messy_df):
+    wide, wide_rep = validate_dataframe(messy_df, month="2025-03", compact=False)
+    compact, rep = validate_dataframe(messy_df, month="2025-03")
+    assert rep.anomalies_by_rule == wide_rep.anomalies_by_rule and rep.rows == wide_rep.rows
+    assert str(compact["PULocationID"].dtype) == "int16"  # 999 fits
+    assert str(compact["passenger_count"].dtype) == "Int8"
+    assert str(compact["store_and_fwd_flag"].dtype) == "category"
+    assert compact["is_anomaly"].dtype == np.int8
+    assert compact.memory_usage(index=False, deep=True).sum() < wide.memory_usage(index=False, deep=True).sum() / 2
+    np.testing.assert_array_equal(build_feature_matrix(compact), build_feature_matrix(wide))
+    features = build_features(compact)
+    pd.testing.assert_frame_equal(features, build_features(wide))
+    # the baseline dtypes: float64 distance, int64 everything else
+    assert features.dtypes.to_dict() == {
+        name: np.float64 if name == "trip_distance" else np.int64 for name in features.columns
+    }
+
+    s = pd.Series([1, 40_000], dtype="Int64")
+    assert to_storage(s, "int16") is s  # never wrapped
+    assert str(to_storage(pd.Series([1, None], dtype="Int64"), "int8").dtype) == "Int8"
@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from joblib import dump
+from sklearn.ensemble import RandomForestClassifier
+
+from src.data import add_label, load_month
+from src.features import FEATURE_NAMES, build_feature_matrix, build_features
+from src.model import load_model
+from src.zone_stats import (N_ZONES, ZONE_FEATURES, ZoneStats, add_zone_features, load_zone_table,
+                            update_zone_stats, zone_features)
+
+
+def _trips(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "PULocationID": rng.integers(1, 6, n),
+            "DOLocationID": rng.integers(1, 6, n),
+            "trip_distance": rng.uniform(0, 12, n),
+            "duration_minutes": pd.array(rng.integers(1, 60, n), dtype="Int64"),
+            "HIGH_TOTAL": rng.integers(0, 2, n),
+        }
+    )
+
+
+def test_updates_are_incremental_and_lookups_o1(tmp_path):
+    trips = _trips(2000)
+    whole, halves = ZoneStats(), ZoneStats()
+    whole.update(trips)
+    halves.update(trips.iloc[:700])
+    halves.update(trips.iloc[700:])
+    np.testing.assert_array_equal(whole.table(), halves.table())
+
+    pair = trips[(trips.PULocationID == 2) & (trips.DOLocationID == 3)]
+    cell = whole.table()[2, 3]
+    assert cell[0] == len(pair)
+    assert abs(cell[1] - pair.trip_distance.median()) < 1.0  # within one distance bin
+    assert 0 < cell[3] < 1
+
+    whole.save(tmp_path / "zones")
+    table = load_zone_table(tmp_path / "zones")
+    assert isinstance(table, np.memmap) and table.shape == (N_ZONES, N_ZONES, len(ZONE_FEATURES))
+    looked_up = zone_features(table, np.array([2, 999]), np.array([3, 3]))
+    np.testing.assert_array_equal(looked_up[0], cell)
+    assert not looked_up[1].any()  # unknown zone
+
+
+def test_update_zone_stats_skips_known_months_and_rejects_changes(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    assert update_zone_stats([(path, "2025-03")], tmp_path / "zones")["added"] == ["2025-03"]
+    assert update_zone_stats([(path, "2025-03")], tmp_path / "zones")["skipped"] == ["2025-03"]
+
+    messy_df.assign(trip_distance=1.0).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="rebuild"):
+        update_zone_stats([(path, "2025-03")], tmp_path / "zones")
+
+
+def test_zone_table_built_from_training_months_is_rejected(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    update_zone_stats([(path, "2025-02")], tmp_path / "zones")
+
+    assert load_zone_table(tmp_path / "zones", training_months=["2025-03"]).shape[0] == N_ZONES
+    with pytest.raises(ValueError, match="training months"):
+        load_zone_table(tmp_path / "zones", training_months=["2025-02", "2025-03"])
+    np.save(tmp_path / "bare.npy", np.asarray(load_zone_table(tmp_path / "zones")))
+    with pytest.raises(ValueError, match="no recorded source months"):
+        load_zone_table(tmp_path / "bare.npy", training_months=["2025-03"])
+
+
+def test_zone_features_in_training_and_serving(tmp_path, messy_df):
+    path = tmp_path / "month.csv"
+    messy_df.to_csv(path, index=False)
+    update_zone_stats([(path, "2025-03")], tmp_path / "zones")
+    table = load_zone_table(tmp_path / "zones")
+
+    df = add_label(load_month(path, month="2025-03", columns="training"))
+    X = build_feature_matrix(df, zone_table=table)
+    assert X.shape[1] == len(FEATURE_NAMES) + len(ZONE_FEATURES)
+    np.testing.assert_array_equal(X, build_features(df, zone_table=table).to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(X, add_zone_features(build_feature_matrix(df), table))
+    np.testing.assert_array_equal(
+        build_feature_matrix(df, sparse=True, zone_table=table).toarray(), X
+    )
+
+    # a saved model with zone features looks them up itself at predict time
+    model = RandomForestClassifier(n_estimators=3, random_state=0).fit(X, df["HIGH_TOTAL"])
+    models = tmp_path / "models"
+    models.mkdir()
+    dump(model, models / "zoned.pkl")
+    np.save(models / "zoned_zones.npy", np.asarray(table))
+    (models / "zoned_feature_schema.json").write_text(
+        json.dumps({"feature_names": FEATURE_NAMES + ZONE_FEATURES, "zone_table": "zoned_zones.npy"})
+    )
+    loaded = load_model(models, "zoned")
+    np.testing.assert_allclose(loaded.predict(build_feature_matrix(df)), model.predict_proba(X)[:, 1])